@@ -6,6 +6,7 @@ import os
 import bookdbtool.estimate_tools as et
 import bookdbtool.book_db_tools as rt
 import bookdbtool.isbn_lookup_tools as isbn
+from bookdbtool.isbn_cache import ISBNCache
 import bookdbtool.ai_tools as ai
 import bookdbtool.manual as manual
 
@@ -42,7 +43,8 @@ def history():
 
 scope_vars = {"bc": rt.BCTool(*book_service_conf),
               "est": et.ESTTool(*book_service_conf),
-              "isbn": isbn.ISBNLookup(isbn_conf),
+              "isbn": isbn.ISBNLookup(isbn_conf, cache=ISBNCache.from_env(default=True),
+                                      book_service=book_service_conf),
               "ai": ai.OllamaAgent(ai_conf),
               "history": history,
               "man": manual}
@@ -7,24 +7,51 @@ Filename Convention:
     Images should be named with the book ID as the first characters before an underscore.
     Example: "124_image_of_book_cover.png" -> book_id = 124
 
+Files are uploaded and registered by a pool of ``--workers`` threads sharing one
+keep-alive session; connection errors, timeouts and 429/5xx answers are retried with
+exponential backoff.  Registering (``/add_image``) adds a row on every call, so it is
+only retried when the request never reached the server or got a 429.
+
+Resuming:
+    The content hash, status, server filename and image id of every file are kept in a
+    manifest (``.upload_manifest.jsonl`` in the directory).  A rerun skips files already
+    uploaded and associated, and only associates files whose upload succeeded before.
+    A file with the same content as one recorded as uploaded in this manifest is not sent
+    again; its book is associated with the uploaded copy.  Duplicates are only detected
+    against the manifest, not against images already on the server.
+
 Usage:
     python upload_images.py <directory_path>
     python upload_images.py <directory_path> --recursive
     python upload_images.py <directory_path> --extensions jpg,png,gif
+    python upload_images.py <directory_path> --workers 8 --retries 5
+    python upload_images.py <directory_path> --manifest /path/to/manifest.jsonl
 """
 
 import argparse
+import hashlib
 import json
 import os
 import re
 import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date
 from pathlib import Path
 from urllib.parse import quote
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
 
 CONFIG_PATH = "/book_service/config/configuration.json"  # root is "tools"
+REQUEST_TIMEOUT = 30  # seconds per request
+RETRY_STATUSES = (429, 500, 502, 503, 504)  # answers worth another attempt
+PROGRESS_SECONDS = 5  # seconds between progress lines
+MANIFEST_NAME = ".upload_manifest.jsonl"  # default manifest, in the image directory
 
 
 def get_config():
@@ -95,7 +122,85 @@ def get_image_files(directory, recursive=False, extensions=None):
     return sorted(image_files)
 
 
-def upload_image(endpoint, api_key, file_path, custom_filename=None):
+def make_session(pool_size=1):
+    """
+    Create a keep-alive session for the upload and registration requests.
+
+    Args:
+        pool_size: Connections kept open to the endpoint; one per worker thread
+
+    Returns:
+        requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _not_sent(error):
+    """Whether a requests exception shows the request never reached the server."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0] if error.args else None, "reason", None)
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+def post_with_retries(url, session=None, retries=0, backoff=1.0, idempotent=True, **kwargs):
+    """
+    POST to url, retrying connection errors, timeouts and 429/5xx answers.
+
+    Attempt n waits backoff * 2 ** (n - 1) seconds first. Request bodies must be
+    bytes or dicts, not open files, so they can be sent again.
+
+    A request that is not idempotent may have taken effect when its answer is a
+    5xx or is lost to a read timeout or a dropped connection, so it is only retried
+    when it was not sent (the connection could not be opened) or was refused
+    with 429.
+
+    Args:
+        url: URL to post to
+        session: Optional requests.Session; requests.post is used without one
+        retries: Attempts made after the first one fails
+        backoff: Seconds before the first retry
+        idempotent: False for a request that must not be repeated once it may have
+            reached the server
+        kwargs: Passed to post (json, files, data, headers)
+
+    Returns:
+        requests.Response of the last attempt
+
+    Raises:
+        requests.exceptions.RequestException: if the last attempt failed to connect
+    """
+    post = session.post if session is not None else requests.post
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff * 2 ** (attempt - 1))
+        try:
+            response = post(url, timeout=REQUEST_TIMEOUT, **kwargs)
+        except requests.exceptions.RequestException as e:
+            if attempt == retries or not (idempotent or _not_sent(e)):
+                raise
+            continue
+        retry_statuses = RETRY_STATUSES if idempotent else (429,)
+        if response.status_code not in retry_statuses or attempt == retries:
+            return response
+
+
+def _result(response):
+    """(success, response_data) of an API response; a 200 carrying an error is a failure."""
+    try:
+        body = response.json() if response.text else {}
+    except ValueError:
+        body = {}
+    if response.status_code == 200 and "error" not in body:
+        return True, body
+    return False, body if "error" in body else {"error": f"HTTP {response.status_code}"}
+
+
+def upload_image(endpoint, api_key, file_path, custom_filename=None, session=None, retries=0, backoff=1.0):
     """
     Upload a single image file to the API endpoint.
 
@@ -104,6 +209,9 @@ def upload_image(endpoint, api_key, file_path, custom_filename=None):
         api_key: API key for authentication
         file_path: Path to the image file
         custom_filename: Optional custom filename for the uploaded file
+        session: Optional requests.Session to reuse connections
+        retries: Attempts made after a failed one (see post_with_retries)
+        backoff: Seconds before the first retry
 
     Returns:
         Tuple of (success: bool, response_data: dict)
@@ -112,18 +220,14 @@ def upload_image(endpoint, api_key, file_path, custom_filename=None):
     headers = {'x-api-key': api_key}
 
     try:
-        with open(file_path, 'rb') as f:
-            files = {'file': (file_path.name, f, f'image/{file_path.suffix.lstrip(".")}')}
-            data = {}
-            if custom_filename:
-                data['filename'] = custom_filename
-
-            response = requests.post(url, files=files, data=data, headers=headers, timeout=30)
+        # read once, so that a retry can send the same bytes again
+        files = {'file': (file_path.name, file_path.read_bytes(), f'image/{file_path.suffix.lstrip(".")}')}
+        data = {}
+        if custom_filename:
+            data['filename'] = custom_filename
 
-            if response.status_code == 200:
-                return True, response.json()
-            else:
-                return False, response.json() if response.text else {"error": f"HTTP {response.status_code}"}
+        response = post_with_retries(url, session, retries, backoff, files=files, data=data, headers=headers)
+        return _result(response)
 
     except requests.exceptions.RequestException as e:
         return False, {"error": str(e)}
@@ -223,7 +327,7 @@ def is_safe_filename(filename):
     return True, None
 
 
-def add_image_to_book(endpoint, api_key, book_id, filename):
+def add_image_to_book(endpoint, api_key, book_id, filename, session=None, retries=0, backoff=1.0):
     """
     Add image metadata to the book's image collection.
 
@@ -232,6 +336,9 @@ def add_image_to_book(endpoint, api_key, book_id, filename):
         api_key: API key for authentication
         book_id: The book collection ID
         filename: The image filename (should be pre-validated with is_safe_filename)
+        session: Optional requests.Session to reuse connections
+        retries: Attempts made after a failed one (see post_with_retries)
+        backoff: Seconds before the first retry
 
     Returns:
         Tuple of (success: bool, response_data: dict)
@@ -256,12 +363,10 @@ def add_image_to_book(endpoint, api_key, book_id, filename):
     }
 
     try:
-        response = requests.post(url, json=data, headers=headers, timeout=30)
-
-        if response.status_code == 200:
-            return True, response.json()
-        else:
-            return False, response.json() if response.text else {"error": f"HTTP {response.status_code}"}
+        # every call adds an images row; do not repeat one that may have been stored
+        response = post_with_retries(url, session, retries, backoff, idempotent=False, json=data,
+                                     headers=headers)
+        return _result(response)
 
     except requests.exceptions.RequestException as e:
         return False, {"error": str(e)}
@@ -269,6 +374,281 @@ def add_image_to_book(endpoint, api_key, book_id, filename):
         return False, {"error": f"Unexpected error: {str(e)}"}
 
 
+def process_file(endpoint, api_key, file_path, session=None, retries=0, backoff=1.0, remote_name=None):
+    """
+    Upload one image and associate it with the book named by its filename.
+
+    Args:
+        endpoint: API endpoint URL
+        api_key: API key for authentication
+        file_path: Path to the image file
+        session: Optional requests.Session to reuse connections
+        retries: Attempts made after a failed request (see post_with_retries)
+        backoff: Seconds before the first retry
+        remote_name: Filename of the same image already on the server; the file
+            is then only associated, not uploaded again
+
+    Returns:
+        dict with file, bytes, uploaded, reused, remote_name, upload_response, book_id,
+        associated, image_id, assoc_response and skip_reason (why the image was not
+        associated, or None)
+    """
+    result = {"file": file_path, "bytes": 0, "uploaded": False, "reused": remote_name is not None,
+              "remote_name": remote_name, "upload_response": None, "book_id": None, "associated": False,
+              "image_id": None, "assoc_response": None, "skip_reason": None}
+    if remote_name is None:
+        success, response_data = upload_image(endpoint, api_key, file_path, session=session,
+                                              retries=retries, backoff=backoff)
+        result["upload_response"] = response_data
+        if not success:
+            return result
+        result["bytes"] = file_path.stat().st_size
+        result["remote_name"] = response_data.get("upload_image", {}).get("filename", file_path.name)
+    result["uploaded"] = True
+
+    # Validate filename for URL safety before associating
+    is_valid, error_msg = is_safe_filename(result["remote_name"])
+    if not is_valid:
+        result["skip_reason"] = f"unsafe filename: {error_msg}"
+        return result
+
+    # Try to extract book ID and associate image with book
+    book_id = extract_book_id(file_path.name)
+    if not book_id:
+        result["skip_reason"] = "no book ID found in filename"
+        return result
+    result["book_id"] = book_id
+    result["associated"], result["assoc_response"] = add_image_to_book(
+        endpoint, api_key, book_id, result["remote_name"], session=session, retries=retries, backoff=backoff)
+    if result["associated"]:
+        result["image_id"] = result["assoc_response"].get("add_image", {}).get("id")
+    return result
+
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    """Hex SHA-256 of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    Upload state of each file of a directory, so that an interrupted run can be resumed.
+
+    One entry per file, keyed by its path relative to the directory: sha256, size and
+    mtime_ns of the content, status ("failed", "uploaded" when the association is still
+    to be made, or "done"), remote_name on the server, book_id, image_id and error.
+
+    Each change is appended to the JSON Lines file as the file's whole entry (the last
+    line of a file wins), so a crash loses at most the line being written, and a torn
+    last line is ignored.  Loading and closing rewrite the file with one line per file
+    through a temporary file and os.replace, so it is never left half-written.
+
+    Args:
+        path: Manifest file
+        root: The image directory the entry paths are relative to
+    """
+
+    def __init__(self, path, root):
+        self.path = Path(path)
+        self.root = Path(root)
+        self.entries = {}
+        self._remote_by_hash = {}
+        self._file = None
+
+    def load(self):
+        """Read the manifest, if there is one, and compact it; returns the number of entries."""
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.entries[entry["path"]] = entry
+                    except (ValueError, KeyError, TypeError):
+                        continue  # torn line of an interrupted run
+        for entry in self.entries.values():
+            self._index(entry)
+        self.compact()
+        return len(self.entries)
+
+    def key(self, file_path):
+        return Path(file_path).relative_to(self.root).as_posix()
+
+    def get(self, file_path):
+        return self.entries.get(self.key(file_path))
+
+    def sha256(self, file_path):
+        """Content hash of a file, reused from its entry while its size and mtime are unchanged."""
+        stat = Path(file_path).stat()
+        entry = self.entries.setdefault(self.key(file_path), {"path": self.key(file_path)})
+        if entry.get("sha256") is None or (entry.get("size"), entry.get("mtime_ns")) != (stat.st_size,
+                                                                                        stat.st_mtime_ns):
+            sha256 = file_sha256(file_path)
+            if sha256 != entry.get("sha256"):
+                # new content: the state recorded for the old content does not apply
+                entry.clear()
+                entry["path"] = self.key(file_path)
+            entry.update(sha256=sha256, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        return entry["sha256"]
+
+    def remote_name(self, sha256):
+        """Filename on the server of an uploaded file with this content, or None."""
+        return self._remote_by_hash.get(sha256)
+
+    def associated(self, sha256, book_id):
+        """True if an image with this content is already associated with the book."""
+        return any(e.get("sha256") == sha256 and e.get("book_id") == book_id and e.get("image_id") is not None
+                   for e in self.entries.values())
+
+    def record(self, file_path, **fields):
+        """Update a file's entry and append it to the manifest."""
+        entry = self.entries.setdefault(self.key(file_path), {"path": self.key(file_path)})
+        entry.update(fields)
+        self._index(entry)
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def compact(self):
+        """Rewrite the manifest atomically with one line per file."""
+        if self._file is not None:
+            self._file.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=self.path.name, suffix=".tmp", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def close(self):
+        self.compact()
+        self._file.close()
+        self._file = None
+
+    def _index(self, entry):
+        if entry.get("status") in ("uploaded", "done") and entry.get("remote_name") and entry.get("sha256"):
+            self._remote_by_hash.setdefault(entry["sha256"], entry["remote_name"])
+
+
+def record_result(manifest, result):
+    """Write the outcome of process_file to the manifest."""
+    if not result["uploaded"]:
+        manifest.record(result["file"], status="failed",
+                        error=result["upload_response"].get("error", "Unknown error"))
+        return
+    fields = {"remote_name": result["remote_name"], "book_id": result["book_id"], "error": None}
+    if result["book_id"] is not None and not result["associated"]:
+        fields.update(status="uploaded", error=result["assoc_response"].get("error", "Unknown error"))
+    else:
+        fields.update(status="done", image_id=result["image_id"])
+    manifest.record(result["file"], **fields)
+
+
+class Progress:
+    """Thread-safe count of processed files and bytes, printing throughput every few seconds."""
+
+    def __init__(self, total, interval=PROGRESS_SECONDS):
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.bytes = 0
+        self.start = time.monotonic()
+        self._last = self.start
+        self._lock = threading.Lock()
+
+    def add(self, n_bytes):
+        """Count one processed file; returns its 1-based position."""
+        with self._lock:
+            self.done += 1
+            self.bytes += n_bytes
+            now = time.monotonic()
+            if now - self._last >= self.interval and self.done < self.total:
+                self._last = now
+                print(f"  -- {self.report()}")
+            return self.done
+
+    def report(self):
+        elapsed = max(time.monotonic() - self.start, 1e-9)
+        rate = self.done / elapsed
+        eta = (self.total - self.done) / rate if rate else 0
+        return (f"{self.done}/{self.total} files in {elapsed:.1f}s, {rate:.1f} files/s, "
+                f"{self.bytes / elapsed / 1e6:.2f} MB/s, ETA {eta:.0f}s")
+
+
+def plan_uploads(manifest, image_files):
+    """
+    Decide what to do with each file, from the manifest.
+
+    Files already done are left out.  A file whose content the manifest records as
+    uploaded is only associated (or, with no book to associate, marked done), without
+    sending it.  Of files with the same content, only the first is uploaded now; the
+    others are returned to be planned again once it is on the server.
+
+    Args:
+        manifest: Manifest of the directory
+        image_files: Paths of the files
+
+    Returns:
+        Tuple of (tasks: list of (file_path, remote_name or None) to pass to process_file,
+        later: list of file paths, done: number of files already done,
+        duplicates: list of file paths marked done without sending them)
+    """
+    tasks, later, done, duplicates = [], [], 0, []
+    first_uploads = set()
+    for file_path in image_files:
+        sha256 = manifest.sha256(file_path)
+        if manifest.get(file_path).get("status") == "done":
+            done += 1
+            continue
+        remote_name = manifest.remote_name(sha256)
+        book_id = extract_book_id(file_path.name)
+        if remote_name is not None and (book_id is None or manifest.associated(sha256, book_id)):
+            manifest.record(file_path, status="done", remote_name=remote_name, book_id=book_id, error=None,
+                            duplicate=True)
+            duplicates.append(file_path)
+        elif remote_name is None and sha256 in first_uploads:
+            later.append(file_path)
+        else:
+            if remote_name is None:
+                first_uploads.add(sha256)
+            tasks.append((file_path, remote_name))
+    return tasks, later, done, duplicates
+
+
+def print_result(result, idx, total, verbose=False):
+    """Print the outcome of process_file for one file."""
+    name = result["file"].name
+    sent = " (already on server as " + result["remote_name"] + ")" if result["reused"] else ""
+    if not result["uploaded"]:
+        print(f"[{idx}/{total}] {name} ✗")
+        print(f"    ERROR: {result['upload_response'].get('error', 'Unknown error')}")
+        return
+    if result["book_id"] is None:
+        print(f"[{idx}/{total}] {name} ✓{sent}")
+        if result["skip_reason"].startswith("unsafe"):
+            print(f"    ⚠ Skipping association ({result['skip_reason']})")
+        elif verbose:
+            print(f"    Skipping association ({result['skip_reason']})")
+    elif result["associated"]:
+        print(f"[{idx}/{total}] {name} ✓{sent}  book ID {result['book_id']} ✓")
+    else:
+        print(f"[{idx}/{total}] {name} ✓{sent}  book ID {result['book_id']} ✗")
+        print(f"      Association ERROR: {result['assoc_response'].get('error', 'Unknown error')}")
+    if verbose:
+        print(f"    Response: {result['upload_response']}")
+        if result["assoc_response"] is not None:
+            print(f"      Association response: {result['assoc_response']}")
+
+
 def main():
     """Main function to process command-line arguments and upload images."""
     parser = argparse.ArgumentParser(
@@ -280,6 +660,7 @@ Examples:
   %(prog)s /path/to/images --recursive
   %(prog)s /path/to/images --extensions jpg,png
   %(prog)s /path/to/images --recursive --extensions jpg,png,gif --verbose
+  %(prog)s /path/to/images --workers 8 --retries 5
         """
     )
 
@@ -287,11 +668,24 @@ Examples:
     parser.add_argument('-r', '--recursive', action='store_true',
                         help='Search subdirectories recursively')
     parser.add_argument('-e', '--extensions', type=str,
-                        help='Comma-separated list of file extensions (default: jpg,jpeg,png,gif,bmp,webp,tiff)')
+                        help='Comma-separated list of file extensions '
+                             '(default: jpg,jpeg,png,gif,bmp,webp,tiff)')
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='Print detailed output for each file')
     parser.add_argument('--dry-run', action='store_true',
                         help='List files that would be uploaded without actually uploading')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='Files uploaded and registered concurrently (default: 1)')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Retries of a request failing with a connection error, timeout or 429/5xx '
+                             '(default: 3)')
+    parser.add_argument('--backoff', type=float, default=1.0,
+                        help='Seconds before the first retry, doubled for each further one (default: 1.0)')
+    parser.add_argument('-m', '--manifest', type=str,
+                        help=f'Manifest recording each file\'s upload, for resuming '
+                             f'(default: <directory>/{MANIFEST_NAME})')
+    parser.add_argument('--no-manifest', action='store_true',
+                        help='Upload every file without reading or writing a manifest')
 
     args = parser.parse_args()
 
@@ -326,71 +720,84 @@ Examples:
         sys.exit(0)
 
     # Upload images
-    print("\nUploading images...")
+    workers = max(1, args.workers)
+    session = make_session(workers)
+    counts = Counter()
+    manifest = None
+    pending = image_files
+    if not args.no_manifest:
+        manifest = Manifest(args.manifest or Path(args.directory) / MANIFEST_NAME, args.directory)
+        print(f"\nManifest: {manifest.path} ({manifest.load()} entries)")
+
+    print(f"\nUploading images with {workers} worker(s)...")
     print("-" * 70)
 
-    success_count = 0
-    error_count = 0
-    associated_count = 0
-    skipped_count = 0
-    unsafe_filename_count = 0
-
-    for idx, file_path in enumerate(image_files, 1):
-        print(f"[{idx}/{len(image_files)}] Uploading: {file_path.name}", end="")
-
-        success, response_data = upload_image(endpoint, api_key, file_path)
-
-        if success:
-            success_count += 1
-            print(" ✓")
-            if args.verbose:
-                print(f"    Response: {response_data}")
-
-            # Validate filename for URL safety before associating
-            is_valid, error_msg = is_safe_filename(file_path.name)
-
-            if not is_valid:
-                unsafe_filename_count += 1
-                skipped_count += 1
-                print(f"    ⚠ Skipping association (unsafe filename: {error_msg})")
-                continue
-
-            # Try to extract book ID and associate image with book
-            book_id = extract_book_id(file_path.name)
-
-            if book_id:
-                print(f"    Associating with book ID {book_id}...", end="")
-                assoc_success, assoc_response = add_image_to_book(
-                    endpoint, api_key, book_id, file_path.name
-                )
-
-                if assoc_success:
-                    associated_count += 1
-                    print(" ✓")
-                    if args.verbose:
-                        print(f"      Association response: {assoc_response}")
-                else:
-                    print(" ✗")
-                    print(f"      Association ERROR: {assoc_response.get('error', 'Unknown error')}")
+    progress = None
+    futures, recorded = [], set()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload")
+    try:
+        while pending:
+            if manifest is None:
+                tasks, pending, duplicates = [(file_path, None) for file_path in pending], [], []
             else:
-                skipped_count += 1
-                if args.verbose:
-                    print(f"    Skipping association (no book ID found in filename)")
-        else:
-            error_count += 1
-            print(" ✗")
-            print(f"    ERROR: {response_data.get('error', 'Unknown error')}")
+                tasks, pending, done, duplicates = plan_uploads(manifest, pending)
+                counts["already_done"] += done
+                counts["duplicate"] += len(duplicates)
+                for file_path in duplicates:
+                    print(f"    = {file_path.name}: same content already uploaded from this manifest, "
+                          "not sent")
+            if progress is None:
+                progress = Progress(len(tasks) + len(pending))
+                if counts["already_done"]:
+                    print(f"    Skipping {counts['already_done']} file(s) already done in an earlier run")
+            else:
+                progress.total -= len(duplicates)
+
+            futures = [executor.submit(process_file, endpoint, api_key, file_path, session, args.retries,
+                                       args.backoff, remote_name) for file_path, remote_name in tasks]
+            for future in as_completed(futures):
+                result = future.result()
+                recorded.add(future)
+                if manifest is not None:
+                    record_result(manifest, result)
+                idx = progress.add(result["bytes"])
+                print_result(result, idx, progress.total, args.verbose)
+                if not result["uploaded"]:
+                    counts["failed"] += 1
+                    continue
+                counts["reused" if result["reused"] else "uploaded"] += 1
+                if result["associated"]:
+                    counts["associated"] += 1
+                elif result["book_id"] is None:
+                    counts["skipped"] += 1
+                    if result["skip_reason"].startswith("unsafe"):
+                        counts["unsafe"] += 1
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if manifest is not None:
+            # on an interrupt, keep the files that were in flight from being uploaded again
+            for future in futures:
+                if (future not in recorded and future.done() and not future.cancelled()
+                        and not future.exception()):
+                    record_result(manifest, future.result())
+            manifest.close()
+
+    error_count = counts["failed"]
 
     # Print summary
     print("-" * 70)
     print(f"\nSummary:")
     print(f"  Total files:           {len(image_files)}")
-    print(f"  Successfully uploaded: {success_count}")
+    if manifest is not None:
+        print(f"  Already done:          {counts['already_done']}")
+        print(f"  Already on server:     {counts['duplicate'] + counts['reused']}")
+    print(f"  Successfully uploaded: {counts['uploaded']}")
     print(f"  Failed uploads:        {error_count}")
-    print(f"  Associated with books: {associated_count}")
-    print(f"  Skipped association:   {skipped_count}")
-    if unsafe_filename_count > 0:
-        print(f"    (Unsafe filenames:   {unsafe_filename_count})")
+    print(f"  Associated with books: {counts['associated']}")
+    print(f"  Skipped association:   {counts['skipped']}")
+    if counts["unsafe"] > 0:
+        print(f"    (Unsafe filenames:   {counts['unsafe']})")
+    print(f"  Throughput:            {progress.report()}")
 
     if error_count > 0:
         sys.exit(1)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the reading completion estimate.
+
+Compares the previous ``_estimate_values`` (a Python loop over consecutive daily page
+records that recomputes ``np.max`` on every step, kept below as ``legacy``) with the
+vectorized ``_estimate_values`` on long page histories, and a loop of single estimates
+with one ``estimate_values_batch`` call over many readings.  Every result is checked to
+be identical to the legacy one.  Histories are synthetic, with some repeated page counts
+(zero-denominator pairs); no database connection is made.
+
+Importing ``booksdb.api_util`` reads the configuration file, so point BOOKDB_CONFIG at one.
+
+Usage:
+    cd tools/book_service
+    BOOKDB_CONFIG=config/configuration.json python benchmarks/bench_estimates.py
+    BOOKDB_CONFIG=config/configuration.json python benchmarks/bench_estimates.py --points 100000 --readings 2000
+"""
+
+import argparse
+import logging
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from booksdb import api_util
+
+
+def legacy(x_values, y_values, target_x):
+    """``_estimate_values`` before vectorization (without its logging)."""
+    slope, _ = np.polyfit(x_values, y_values, 1)
+    most_likely_y = slope * (target_x - np.max(x_values)) + np.max(y_values)
+    estimated_range = [float('inf'), -float('inf')]
+    for i in range(len(x_values) - 1):
+        denom = x_values[i + 1] - x_values[i]
+        if denom == 0:
+            continue
+        slope = (y_values[i + 1] - y_values[i]) / denom
+        estimated_y = slope * (target_x - np.max(x_values)) + np.max(y_values)
+        estimated_range[0] = min(estimated_range[0], estimated_y)
+        estimated_range[1] = max(estimated_range[1], estimated_y)
+    return [int(x) for x in [most_likely_y, estimated_range[0], estimated_range[1]]]
+
+
+def make_history(rng, n):
+    """Page reached (x) and day number (y) of ``n`` daily page records, as ``estimate_completion_dates`` passes them."""
+    pages = np.cumsum(rng.integers(0, 40, n)).astype(np.float64)  # 0 pages some days
+    days = np.cumsum(rng.integers(1, 3, n)).astype(np.float64) - 1
+    return pages, days, float(pages[-1] + rng.integers(1, 500))
+
+
+def best(fn, repeat):
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--points", type=int, default=20000, help="daily page records in the long history (default 20000)")
+    parser.add_argument("--readings", type=int, default=500, help="readings in the batch comparison (default 500)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed repetitions, best is reported (default 3)")
+    args = parser.parse_args()
+    logging.getLogger("flask.app").setLevel(logging.CRITICAL)  # one line per repeated page count otherwise
+    rng = np.random.default_rng(1)
+
+    print(f"best of {args.repeat}")
+    for n in (100, args.points // 10, args.points):
+        x, y, target = make_history(rng, n)
+        assert api_util._estimate_values(x, y, target) == legacy(x, y, target)
+        t_legacy = best(lambda: legacy(x, y, target), args.repeat)
+        t_new = best(lambda: api_util._estimate_values(x, y, target), args.repeat)
+        print(f"  one history of {n:>7} records  legacy {t_legacy * 1000:9.2f} ms  "
+              f"vectorized {t_new * 1000:7.2f} ms  ({t_legacy / t_new:6.1f}x)")
+
+    histories = [make_history(rng, int(n)) for n in rng.integers(2, 120, args.readings)]
+    xs, ys, targets = zip(*histories)
+    batch = api_util.estimate_values_batch(xs, ys, targets)
+    for h, row in zip(histories, batch):
+        if np.isfinite(row).all():
+            assert [int(v) for v in row] == legacy(*h)
+        else:  # no two records with different page counts; legacy fails on int(inf)
+            try:
+                legacy(*h)
+            except OverflowError:
+                pass
+            else:
+                raise AssertionError("batch found no usable pair where legacy did")
+    t_legacy = best(lambda: [legacy(*h) for h in histories], args.repeat)
+    t_single = best(lambda: [api_util._estimate_values(*h) for h in histories], args.repeat)
+    t_batch = best(lambda: api_util.estimate_values_batch(xs, ys, targets), args.repeat)
+    print(f"  {args.readings} readings of 2-120 records  legacy {t_legacy * 1000:7.2f} ms  "
+          f"single {t_single * 1000:7.2f} ms  batch {t_batch * 1000:7.2f} ms  ({t_legacy / t_batch:6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Cold-start cost of importing the service modules.
+
+Each measurement runs in a fresh interpreter and reports the wall time of the import
+statement, the peak RSS of the process afterwards, and which of numpy, pandas and
+matplotlib ended up loaded.  The "eager" rows first import the scientific stack the way
+``books/api.py`` and ``booksdb/api_util.py`` used to at module level, which is what every
+uWSGI worker and the MCP server paid before the imports were deferred.
+
+Importing ``booksdb.api_util`` reads the configuration file, so point BOOKDB_CONFIG at one;
+no database connection is made.
+
+Usage:
+    cd tools/book_service
+    BOOKDB_CONFIG=config/configuration.json python benchmarks/bench_import.py
+    BOOKDB_CONFIG=config/configuration.json python benchmarks/bench_import.py --repeat 10
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+# module-level imports removed from api.py / api_util.py
+EAGER_IMPORTS = "import numpy, pandas, matplotlib.pylab"
+
+TARGETS = [
+    ("booksdb.api_util", "import booksdb.api_util"),
+    ("books/api.py", "import api"),
+]
+
+PROBE = """
+import resource, sys, time, json
+t = time.perf_counter()
+{prelude}
+{statement}
+elapsed = time.perf_counter() - t
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "loaded": [m for m in ("numpy", "pandas", "matplotlib") if m in sys.modules],
+}}))
+"""
+
+
+def probe(statement, prelude=""):
+    """Run one import in a fresh interpreter and return its measurements."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(SERVICE_DIR), str(SERVICE_DIR / "books"), str(SERVICE_DIR.parent),
+                                         env.get("PYTHONPATH", "")])
+    out = subprocess.run([sys.executable, "-c", PROBE.format(prelude=prelude, statement=statement)],
+                         env=env, cwd=SERVICE_DIR, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per row, best is reported (default 5)")
+    args = parser.parse_args()
+
+    print(f"best of {args.repeat} fresh interpreters")
+    print(f"  {'module':<18} {'imports':<7} {'time':>9} {'peak RSS':>10}  loaded")
+    for name, statement in TARGETS:
+        for label, prelude in (("eager", EAGER_IMPORTS), ("lazy", "")):
+            runs = [probe(statement, prelude) for _ in range(args.repeat)]
+            seconds = min(r["seconds"] for r in runs)
+            rss_mb = min(r["max_rss_kb"] for r in runs) / 1024
+            loaded = ", ".join(runs[0]["loaded"]) or "-"
+            print(f"  {name:<18} {label:<7} {seconds * 1000:7.0f} ms {rss_mb:7.1f} MB  {loaded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark of ISBN list lookups against the stand-in ISBN server.
+
+Looks the same ISBN list up with the previous one-at-a-time loop (a new ``requests.get``
+per ISBN, kept below as ``legacy``) and with ``isbn_com.Endpoint``.  The endpoint is run
+one request at a time, concurrently, and with a cold and then a warm ``ISBNCache``.  It is
+then run against a server answering 429 above ``--rate-limit``: without a limit, at that
+rate and at 90% of it.  The lookups go to ``fake_isbn_server.FakeISBNServer`` on
+localhost, so no network or ISBNdb key is needed; its latency stands in for the round
+trip to ISBNdb.
+
+Usage:
+    cd tools/book_service
+    python benchmarks/bench_isbn_lookup.py
+    python benchmarks/bench_isbn_lookup.py --isbns 200 --latency 0.2 --workers 8 --rate-limit 20
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "books"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # tools, for bookdbtool
+
+from bookdbtool.isbn_cache import ISBNCache
+from fake_isbn_server import FakeISBNServer
+from isbn_com import Endpoint
+
+KEY = "bench-key"
+
+
+def legacy(conf, isbn_list):
+    """The ``/books_by_isbn`` loop before concurrent lookups: one new connection per ISBN."""
+    res = {}
+    for isbn in isbn_list:
+        try:
+            res[isbn] = requests.get(conf["url_isbn"].format(isbn), headers={"Authorization": conf["key"]}).json()
+        except Exception as e:
+            res[isbn] = {"error": str(e)}
+    return res
+
+
+def run(label, server, fn, isbn_list):
+    before = server.statuses.copy()
+    start = time.perf_counter()
+    res = fn(isbn_list)
+    elapsed = time.perf_counter() - start
+    statuses = dict(server.statuses - before)
+    found = sum(1 for r in res.values() if "book" in r)
+    print(f"  {label:<34} {elapsed:7.2f} s  {len(isbn_list) / elapsed:8.1f} ISBN/s  "
+          f"found {found:>4}  server {statuses}")
+    return res
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--isbns", type=int, default=100, help="ISBNs looked up (default 100)")
+    parser.add_argument("--latency", type=float, default=0.1, help="server seconds per response (default 0.1)")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent requests (default 4)")
+    parser.add_argument("--rate-limit", type=float, default=10.0,
+                        help="requests per second of the rate-limited run (default 10)")
+    parser.add_argument("--not-found-rate", type=float, default=0.1, help="share of unknown ISBNs (default 0.1)")
+    args = parser.parse_args()
+    isbn_list = [f"{9780000000000 + 7919 * i}" for i in range(args.isbns)]
+
+    with FakeISBNServer(latency=args.latency, not_found_rate=args.not_found_rate, key=KEY) as server:
+        conf = {"url_isbn": server.url, "key": KEY}
+        print(f"{args.isbns} ISBNs, {args.latency * 1000:.0f} ms server latency")
+        run("legacy loop", server, lambda isbns: legacy(conf, isbns), isbn_list)
+        run("endpoint, 1 at a time", server,
+            Endpoint(conf, max_concurrency=1, rate_limit=0, cache=False).get_books_by_isbn_list, isbn_list)
+        run(f"endpoint, {args.workers} concurrent", server,
+            Endpoint(conf, max_concurrency=args.workers, rate_limit=0, cache=False).get_books_by_isbn_list,
+            isbn_list)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ISBNCache(str(Path(tmp) / "isbn_cache.sqlite"))
+            endpoint = Endpoint(conf, max_concurrency=args.workers, rate_limit=0, cache=cache)
+            run(f"endpoint, {args.workers} concurrent, cold cache", server, endpoint.get_books_by_isbn_list, isbn_list)
+            run(f"endpoint, {args.workers} concurrent, warm cache", server, endpoint.get_books_by_isbn_list, isbn_list)
+            cache.close()
+
+    with FakeISBNServer(latency=args.latency, rate_limit=args.rate_limit, key=KEY) as server:
+        conf = {"url_isbn": server.url, "key": KEY}
+        print(f"server limited to {args.rate_limit:g} requests/s")
+        run(f"endpoint, {args.workers} concurrent, no limit", server,
+            Endpoint(conf, max_concurrency=args.workers, rate_limit=0, cache=False).get_books_by_isbn_list,
+            isbn_list)
+        # at exactly the quota, uneven arrival of concurrent requests still trips the window
+        for rate in (args.rate_limit, 0.9 * args.rate_limit):
+            time.sleep(1)  # let the server's window clear
+            run(f"endpoint, {args.workers} concurrent, {rate:g}/s", server,
+                Endpoint(conf, max_concurrency=args.workers, rate_limit=rate, cache=False).get_books_by_isbn_list,
+                isbn_list)
+
+
+if __name__ == "__main__":
+    main()
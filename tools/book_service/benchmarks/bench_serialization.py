@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of result-set JSON serialization.
+
+Compares the per-cell conversion path (``_create_serializeable_result_dict`` followed by
+``json.dumps``) with ``serialized_result_dict`` on the standard library encoder and, if
+installed, on orjson.  Rows are synthetic and shaped like ``/books_search`` rows (ints,
+strings, datetimes, dates and Decimals); no database connection is made.
+
+Importing ``booksdb.api_util`` reads the configuration file, so point BOOKDB_CONFIG at one.
+
+Usage:
+    cd tools/book_service
+    BOOKDB_CONFIG=config/configuration.json python benchmarks/bench_serialization.py
+    BOOKDB_CONFIG=config/configuration.json python benchmarks/bench_serialization.py --rows 50000 --repeat 5
+"""
+
+import argparse
+import datetime
+import importlib.util
+import json
+import sys
+import timeit
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from booksdb import api_util, serializer
+
+
+def make_rows(n):
+    """Synthetic rows with the column types of ``table_header + ["ReadDate"]`` plus a Decimal."""
+    rows = []
+    for i in range(n):
+        rows.append((i, f"Title number {i}", f"Author, {i % 97}", datetime.datetime(1950 + i % 70, 1, 1),
+                     f"{1000000000 + i}", f"Publisher {i % 13}", "Soft", 100 + i % 900, "Fiction",
+                     "A short note about the book", 0, "Main Collection", f"978{1000000000 + i}",
+                     datetime.date(2000 + i % 25, 1 + i % 12, 1 + i % 28), Decimal(i % 500)))
+    return rows
+
+
+def legacy(rows, header):
+    return json.dumps(api_util._create_serializeable_result_dict(rows, header))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=20000, help="rows per result set (default 20000)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed repetitions, best is reported (default 3)")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    header = api_util.table_header + ["ReadDate", "Pages2"]
+    reference = json.loads(legacy(rows, header))
+
+    print(f"{args.rows} rows x {len(header)} columns, best of {args.repeat}")
+    baseline = None
+    for name in ("legacy",) + serializer.JSON_ENCODERS:
+        if name == "legacy":
+            label, fn = "convert + json.dumps (legacy)", lambda: legacy(rows, header)
+        else:
+            if importlib.util.find_spec(name) is None:
+                print(f"  {name} not installed; skipped")
+                continue
+            serializer.set_json_encoder(name)
+            label, fn = f"serialized_result_dict [{name}]", lambda: api_util.serialized_result_dict(rows, header)
+            if json.loads(fn()) != reference:
+                raise SystemExit(f"{name} output differs from the legacy serialization")
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        baseline = baseline or best
+        print(f"  {label:<40} {best * 1000:9.1f} ms   {baseline / best:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the ISBNdb book endpoint, for offline load tests of the ISBN lookup path.
+
+Serves ``GET /book/<isbn>`` with a synthetic book in ISBNdb's response shape.  The book
+is derived from a hash of the ISBN, so the same ISBN always returns the same record,
+and ISBN-10 and ISBN-13 forms of a book return the same book.  The server can add
+latency, answer a share of ISBNs with 404 (always the same ISBNs), fail a random share
+of requests with 503, and answer 429 above a request rate, as ISBNdb does when a plan's
+quota is exceeded.  With ``key`` set, requests without that ``Authorization`` header get
+401.
+
+Point ``isbn_com.url_isbn`` in the configuration at ``http://<host>:<port>/book/{}`` to run
+the API or the REPL against it, or use ``FakeISBNServer`` in-process, as
+``bench_isbn_lookup.py`` and ``test_books/test_fake_isbn_server.py`` do.
+
+Usage:
+    cd tools/book_service
+    python benchmarks/fake_isbn_server.py --port 8099 --latency 0.2 --rate-limit 1
+    python benchmarks/fake_isbn_server.py --port 8099 --error-rate 0.05 --not-found-rate 0.1 --key test-key
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # tools, for bookdbtool
+
+from bookdbtool.isbn_cache import isbn10, normalize_isbn
+
+WORDS = ("River", "Winter", "Garden", "Silent", "Empire", "Night", "Salt", "Iron", "Harbor", "Glass",
+         "Orchard", "Signal", "Atlas", "Lantern", "Copper", "Meadow", "Storm", "Paper", "Falcon", "Ember")
+SURNAMES = ("Abbott", "Baker", "Chen", "Dubois", "Eriksen", "Fuentes", "Garcia", "Haddad", "Ito", "Jensen",
+            "Kowalski", "Larsen", "Moreau", "Novak", "Okafor", "Patel", "Quinn", "Rossi", "Sato", "Tanaka")
+PUBLISHERS = ("Harbor Press", "Northfield Books", "Lantern House", "Copperline", "Meadowlark Editions")
+BINDINGS = ("Paperback", "Hardcover", "Kindle Edition")
+
+
+def synthetic_book(isbn):
+    """
+    ISBNdb-shaped record of ``isbn``, and whether the ISBN is to be "not found".
+
+    Returns
+    -------
+    tuple
+        ``(record, fraction)``: the ``{"book": {...}}`` record and a number in [0, 1)
+        fixed per ISBN, compared with the not-found rate.
+    """
+    key = normalize_isbn(isbn)
+    digest = hashlib.sha256(key.encode()).digest()
+    book = {
+        "title": f"The {WORDS[digest[0] % len(WORDS)]} {WORDS[digest[1] % len(WORDS)]}",
+        "authors": [f"{SURNAMES[digest[2] % len(SURNAMES)]}, {chr(65 + digest[3] % 26)}."],
+        "isbn": isbn10(key) or key,
+        "isbn13": key,
+        "pages": 80 + int.from_bytes(digest[4:6], "big") % 1100,
+        "date_published": str(1900 + digest[6] % 125) if digest[7] % 2 else
+        f"{1900 + digest[6] % 125}-{1 + digest[8] % 12:02d}-{1 + digest[9] % 28:02d}",
+        "binding": BINDINGS[digest[10] % len(BINDINGS)],
+    }
+    if digest[11] % 5:  # some ISBNdb records have no publisher
+        book["publisher"] = PUBLISHERS[digest[11] % len(PUBLISHERS)]
+    book["title_long"] = book["title"]
+    return {"book": book}, int.from_bytes(digest[12:16], "big") / 2 ** 32
+
+
+class FakeISBNServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering like ISBNdb's ``/book/<isbn>``.
+
+    Parameters
+    ----------
+    host, port : str, int
+        Address to listen on; port 0 picks a free port (see ``url``).
+    latency : float
+        Seconds added to every response.
+    jitter : float
+        Up to this many more seconds, drawn at random per request.
+    error_rate : float
+        Share of requests answered with 503, drawn at random per request.
+    not_found_rate : float
+        Share of ISBNs answered with 404; the same ISBNs on every request.
+    rate_limit : float
+        Requests per second answered before 429 is returned; 0 for no limit.
+    key : str, optional
+        Required ``Authorization`` header value.
+    seed : int
+        Seed of the random latency and errors.
+    clock, sleep : callable, optional
+        ``time.monotonic`` and ``time.sleep`` by default; tests pass stand-ins to
+        drive the quota window and latency without waiting.
+    """
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 not_found_rate=0.0, rate_limit=0.0, key=None, seed=0, clock=time.monotonic,
+                 sleep=time.sleep):
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.not_found_rate = not_found_rate
+        self.rate_limit = rate_limit
+        self.key = key
+        self._random = random.Random(seed)
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self._thread = None
+        self.statuses = Counter()
+
+    @property
+    def url(self):
+        """``url_isbn`` of this server, with ``{}`` for the ISBN."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/book/{{}}"
+
+    @property
+    def requests(self):
+        return sum(self.statuses.values())
+
+    def start(self):
+        """Serve on a background thread; returns the server."""
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name="fake-isbn-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _admit(self):
+        """Draw this request's delay and failure; returns ``(delay, status or None)``."""
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            if self.rate_limit > 0:
+                now = self.clock()
+                while self._recent and now - self._recent[0] >= 1.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rate_limit:
+                    return 0.0, 429
+                self._recent.append(now)
+            if self.error_rate and self._random.random() < self.error_rate:
+                return delay, 503
+        return delay, None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as ISBNdb
+    disable_nagle_algorithm = True  # headers and body are separate writes
+
+    def do_GET(self):
+        server = self.server
+        parts = self.path.split("?")[0].strip("/").split("/")
+        if server.key is not None and self.headers.get("Authorization") != server.key:
+            return self._reply(401, {"message": "Unauthorized"})
+        delay, status = server._admit()
+        if status == 429:
+            return self._reply(429, {"message": "Too Many Requests"})
+        server.sleep(delay)
+        if status is not None:
+            return self._reply(status, {"message": "Service Unavailable"})
+        if len(parts) != 2 or parts[0] != "book" or not parts[1]:
+            return self._reply(404, {"errorMessage": "Not Found"})
+        record, fraction = synthetic_book(parts[1])
+        if fraction < server.not_found_rate:
+            return self._reply(404, {"errorMessage": "Not Found"})
+        self._reply(200, record)
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        with self.server._lock:
+            self.server.statuses[status] += 1
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to each response (default 0)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many more seconds (default 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 503")
+    parser.add_argument("--not-found-rate", type=float, default=0.0, help="share of ISBNs answered with 404")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before 429 (0: none)")
+    parser.add_argument("--key", help="required Authorization header value")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    server = FakeISBNServer(args.host, args.port, args.latency, args.jitter, args.error_rate,
+                            args.not_found_rate, args.rate_limit, args.key, args.seed)
+    print(f"serving {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"responses: {dict(server.statuses)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,18 @@ import os
 from io import BytesIO
 from logging.config import dictConfig
 
-import pandas as pd
 import requests
+from bookdbtool.isbn_cache import isbn10, normalize_isbn
+from booksdb import queries
 from booksdb.api_util import *
-from flask import Flask, Response, send_file, request, abort
-from matplotlib import pylab as plt
+from booksdb.db_pool import workers_per_service
+from flask import Flask, Response, send_file, request, abort, g
 from werkzeug.utils import secure_filename
 
-from isbn_com import Endpoint as isbn
+from http_cache import conditional_response
+from isbn_com import DEFAULT_RATE_LIMIT as ISBN_DEFAULT_RATE_LIMIT, Endpoint as isbn
+from render_cache import RenderCache
+from render_pool import RenderBroken, RenderBusy, RenderPool, RenderTimeout
 
 dictConfig({
     'version': 1,
@@ -31,6 +35,30 @@ dictConfig({
 
 app = Flask(__name__)
 
+if search_index is not None:
+    # load the search index before the first request rather than during it
+    search_index.refresh()
+
+# report images are cached per data version of the tables they are drawn from
+REPORT_TABLES = ("book collection", "books read")
+render_cache = RenderCache()
+render_pool = RenderPool()
+
+
+def isbn_rate_limit():
+    """
+    ISBNdb requests per second for this worker: ``BOOKDB_ISBN_RATE_LIMIT``, the quota of
+    the whole service, split evenly between the uWSGI workers, which each pace their
+    own lookups.
+    """
+    return float(os.getenv("BOOKDB_ISBN_RATE_LIMIT", ISBN_DEFAULT_RATE_LIMIT)) / workers_per_service()
+
+
+# ISBN client whose keep-alive session and rate limit span requests.  It is created here,
+# in the uWSGI master, and copied into each worker by the fork; it opens no connection
+# before its first lookup, and its ISBNCache opens SQLite in each worker on first use.
+isbn_endpoint = isbn(isbn_conf, rate_limit=isbn_rate_limit())
+
 
 def require_app_key(view_function):
     """
@@ -107,6 +135,39 @@ def configuration():
     return Response(response=rdata, status=200, headers=response_headers)
 
 
+@app.route('/pool_stats')
+@require_app_key
+def pool_stats():
+    """
+    Report database connection pool statistics for this worker process.
+
+    Returns
+        flask.Response - JSON object with the pool size, open/idle/in-use
+        connection counts and cumulative counters (created, reused, waits,
+        timeouts, failed health checks, idle evictions).  Each uWSGI worker
+        has its own pool, so the ``pid`` identifies which worker answered.
+    """
+    rdata = json.dumps({"pool_stats": books_pool.stats()})
+    response_headers = resp_header(rdata)
+    return Response(response=rdata, status=200, headers=response_headers)
+
+
+@app.route('/render_stats')
+@require_app_key
+def render_stats():
+    """
+    Report chart rendering statistics for this worker process.
+
+    Returns
+        flask.Response - JSON object with the render pool (process count, queue
+        depth and limit, timeout, submitted/completed/failed/timeout/rejected
+        counters) and the rendered image cache (entries, hits, misses).
+    """
+    rdata = json.dumps({"render_pool": render_pool.stats(), "render_cache": render_cache.stats()})
+    response_headers = resp_header(rdata)
+    return Response(response=rdata, status=200, headers=response_headers)
+
+
 ##########################################################################
 # UI Utilities
 ##########################################################################
@@ -173,6 +234,38 @@ def recent(limit=10):
     return Response(response=result, status=200, headers=resp_header(result))
 
 
+@app.route('/changes')
+@require_app_key
+def changes():
+    """
+    Stream the rows added or changed since a feed position, for incremental sync.
+
+    The optional ``since`` query argument is the ``next_token`` of a previous call, or a
+    date (``2024-05-01`` or ``2024-05-01 18:30:00``); without it every row is sent.  The
+    response is NDJSON: for each of `book collection`, `books read`, `books tags`,
+    `images`, `complete date estimates` and `daily page records` a
+    ``{"table": ..., "header": [...]}`` line and then one array per row, ending with
+    ``{"next_token": ..., "counts": {...}}``.  Rows changed shortly before the
+    previous token may be sent again (see ``CHANGE_FEED_OVERLAP_SECONDS``); apply rows
+    as upserts by primary key.  Deleted rows are not reported.
+
+    E.g.
+    curl -H "x-api-key: YOUR_KEY" "http://172.17.0.2:5000/changes?since=2024-05-01"
+
+    :return: streamed NDJSON, or 400 for an invalid ``since``
+    """
+    try:
+        since_state = decode_change_token(request.args.get("since"))
+    except ValueError as e:
+        rdata = json.dumps({"error": str(e)})
+        return Response(response=rdata, status=400, headers=resp_header(rdata))
+    until_state, error_list = change_feed_snapshot()
+    if error_list is not None:
+        rdata = json.dumps({"error": error_list})
+        return Response(response=rdata, status=200, headers=resp_header(rdata))
+    return Response(stream_change_feed(since_state, until_state), status=200, headers=stream_resp_header("ndjson"))
+
+
 ##########################################################################
 # ADDS
 ##########################################################################
@@ -200,35 +293,19 @@ def add_books():
     curl -X POST -H "Content-type: application/json" -d @./example_json_payloads/test_add_books.json \
     http://172.17.0.2:5000/add_books
 
-    :return:
+    The records are inserted in multi-row statements of ``chunk_size`` books (query
+    argument, default ``BOOKDB_ADD_BOOKS_CHUNK`` or 500).  A record that is invalid or
+    that MySQL rejects is reported as ``{"error": ...}`` in its place and does not stop
+    the others; every other record is stored and returned with its BookCollectionID.
+
+    :return: {"add_books": [record with BookCollectionID, or {"error": ...}, ...]}
     """
-    # records should be a list of dictionaries including all fields
-    db = pymysql.connect(**books_conf)
     records = request.get_json()
-    search_str = ("INSERT INTO `book collection` "
-                  "(Title, Author, CopyrightDate, ISBNNumber, ISBNNumber13, PublisherName, CoverType, Pages, "
-                  "Location, Note, Recycled) "
-                  "VALUES "
-                  "(\"{Title}\", \"{Author}\", \"{CopyrightDate}\", \"{ISBNNumber}\", \"{ISBNNumber13}\", "
-                  "\"{PublisherName}\", \"{CoverType}\", \"{Pages}\", "
-                  "\"{Location}\", \"{Note}\", \"{Recycled}\");")
-    book_id_str = "SELECT LAST_INSERT_ID();"
-    rdata = []
-    with db:
-        with db.cursor() as c:
-            for record in records:
-                try:
-                    record["Note"] = db.escape(record["Note"])
-                    if len(record["CopyrightDate"].strip()) == 4:
-                        record["CopyrightDate"] += "-01-01 00:00:00"  # make it a valid date string!
-                    c.execute(search_str.format(**record))
-                    c.execute(book_id_str)
-                    record["BookCollectionID"] = c.fetchall()[0][0]
-                    rdata.append(record)
-                except pymysql.Error as e:
-                    app.logger.error(e)
-                    rdata.append({"error": str(e)})
-        db.commit()
+    chunk_size = request.args.get("chunk_size")
+    if not isinstance(records, list) or (chunk_size is not None and not chunk_size.isdigit()):
+        rdata = json.dumps({"error": "Payload must be a list of book records; chunk_size must be an integer"})
+        return Response(response=rdata, status=400, headers=resp_header(rdata))
+    rdata = add_books_utility(records, chunk_size)
     rdata = json.dumps({"add_books": rdata})
     response_headers = resp_header(rdata)
     return Response(response=rdata, status=200, headers=response_headers)
@@ -252,23 +329,26 @@ def add_read_dates():
     :return:
     """
     # records should be a list of dictionaries including all fields
-    db = pymysql.connect(**books_conf)
+    db = books_pool.connection()
     records = request.get_json()
-    search_str = 'INSERT INTO `books read` (BookCollectionID, ReadDate, ReadNote) VALUES '
-    search_str += '({BookCollectionID}, "{ReadDate}", "{ReadNote}")'
     res = {"update_read_dates": [], "error": []}
     with db:
         with db.cursor() as c:
             for record in records:
                 try:
-                    record["ReadNote"] = db.escape(record["ReadNote"])
-                    app.logger.debug(search_str.format(**record))
-                    c.execute(search_str.format(**record))
+                    params = (record["BookCollectionID"], record["ReadDate"], record["ReadNote"])
+                    app.logger.debug(f"{queries.INSERT_READ} {params}")
+                    c.execute(queries.INSERT_READ, params)
+                    log_activity(c, record["BookCollectionID"], "add_read", record["ReadDate"])
                     res["update_read_dates"].append(record)
                 except pymysql.Error as e:
                     app.logger.error(e)
                     res["error"].append(str(e))
         db.commit()
+    invalidate_indexes()
+    update_reading_summary(read_dates=[record["ReadDate"] for record in res["update_read_dates"]])
+    # redraw the report images in the background so the next request finds them cached
+    render_cache.refresh_async(_report_data_version, REPORT_RENDERERS)
     res = json.dumps(res)
     response_headers = resp_header(res)
     return Response(response=res, status=200, headers=response_headers)
@@ -290,19 +370,62 @@ def books_by_isbn():
     """
     book_isbn_list = request.get_json()["isbn_list"]
     res = []
-    a = isbn(isbn_conf)
-    for book_isbn in book_isbn_list:
-        res_json = a.get_book_by_isbn(book_isbn)
-        if res_json is not None:
-            proto = a._endpoint_to_collection_db(res_json)
-            res.append(proto)
-        else:
-            app.logger.error(f"No records found for isbn {book_isbn}.")
-    rdata = json.dumps({"book_records": res})
+    errors = []
+    # books already in the collection are copied from it rather than looked up (and paid for) again
+    owned, error_list = _collection_records_by_isbn(book_isbn_list)
+    if error_list is not None:
+        errors.extend(error_list)
+    looked_up = isbn_endpoint.get_books_by_isbn_list([i for i in book_isbn_list if i not in owned])
+    # looked up concurrently, within the endpoint's rate limit; results are in input order
+    for book_isbn in dict.fromkeys(book_isbn_list):
+        if book_isbn in owned:
+            res.append(owned[book_isbn])
+            continue
+        res_json = looked_up[book_isbn]
+        try:
+            if "error" in res_json:
+                raise LookupError(res_json["error"])
+            res.append(isbn_endpoint._endpoint_to_collection_db(res_json))
+        except (LookupError, TypeError) as e:
+            app.logger.error(f"No records found for isbn {book_isbn}: {e}")
+            errors.append(f"{book_isbn}: {e}")
+    rdata = {"book_records": res}
+    if errors:
+        rdata["error"] = errors
+    rdata = json.dumps(rdata)
     response_headers = resp_header(rdata)
     return Response(response=rdata, status=200, headers=response_headers)
 
 
+def _collection_records_by_isbn(isbn_list):
+    """
+    ``books_by_isbn`` records of the books of ``isbn_list`` already in the collection.
+
+    Returns
+    -------
+    tuple
+        ``(records, error_list)``: the record per ISBN found, with the fields of
+        ``Endpoint.COLLECTION_DB_DICT`` plus the BookCollectionID of the owned copy
+        (the first added, if there are several).
+    """
+    keys = {}
+    for book_isbn in isbn_list:
+        keys.setdefault(normalize_isbn(book_isbn), []).append(book_isbn)
+    values = [str(i).strip() for i in isbn_list] + list(keys) + [isbn10(key) for key in keys]
+    rows, header, error_list = books_by_isbn_utility(values)
+    records = {}
+    for row in rows:
+        book = dict(zip(header, row))
+        record = {"BookCollectionID": book["BookCollectionID"]}
+        record.update({k: book.get(k, v) for k, v in isbn.COLLECTION_DB_DICT.items()})
+        record["CopyrightDate"] = str(record["CopyrightDate"])[:10]
+        for column in ("ISBNNumber", "ISBNNumber13"):
+            if book[column]:
+                for book_isbn in keys.get(normalize_isbn(book[column]), []):
+                    records.setdefault(book_isbn, record)
+    return records, error_list
+
+
 ##########################################################################
 # UPDATES
 ##########################################################################
@@ -324,18 +447,16 @@ def update_edit_read_note():
     :return:
     """
     # records should be a single dictionaries including all fields
-    db = pymysql.connect(**books_conf)
+    db = books_pool.connection()
     record = request.get_json()
-    record["ReadNote"] = db.escape(record["ReadNote"])
-    search_str = "UPDATE `books read` SET "
-    search_str += "ReadNote=\"{ReadNote}\" "
-    search_str += "WHERE BookCollectionID = \"{BookCollectionID}\" AND ReadDate = \"{ReadDate}\";"
-    app.logger.debug(search_str.format(**record))
+    params = (record["ReadNote"], record["BookCollectionID"], record["ReadDate"])
+    app.logger.debug(f"{queries.UPDATE_READ_NOTE} {params}")
     rdata = []
     with db:
         with db.cursor() as c:
             try:
-                c.execute(search_str.format(**record))
+                c.execute(queries.UPDATE_READ_NOTE, params)
+                log_activity(c, record["BookCollectionID"], "update_read_note", record["ReadDate"])
                 rdata.append(record)
             except pymysql.Error as e:
                 app.logger.error(e)
@@ -415,6 +536,7 @@ def update_book_record():
 @app.route('/summary_books_read_by_year')
 @app.route('/summary_books_read_by_year/<target_year>')
 @require_app_key
+@conditional_response("book collection", "books read")
 def summary_books_read_by_year(target_year=None):
     """
     Generates a summarized list of books read by year, optionally filtered by a
@@ -441,6 +563,7 @@ def summary_books_read_by_year(target_year=None):
 @app.route('/books_read')
 @app.route('/books_read/<target_year>')
 @require_app_key
+@conditional_response("book collection", "books read")
 def books_read(target_year=None):
     """
     Handles HTTP GET requests for books read statistics.
@@ -457,10 +580,20 @@ def books_read(target_year=None):
         statistics. If omitted, statistics for all years are returned.
     :type target_year: str or None
 
+    The optional ``stream`` query argument (``ndjson`` or ``json``) streams
+    the rows, read in batches of ``STREAM_BATCH_ROWS``, instead of building
+    the whole payload first.
+
     :return: Flask response object containing the serialized data and HTTP
         headers.
     :rtype: Response
     """
+    stream = request.args.get("stream")
+    if stream is not None:
+        if stream not in STREAM_FORMATS:
+            return _invalid_stream_response(stream)
+        rows, _, header, error_list = books_read_by_year_utility(target_year, stream=True)
+        return Response(stream_serialized_rows(rows, header, stream), status=200, headers=stream_resp_header(stream))
     rdata, _, header, error_list = books_read_by_year_utility(target_year)
     result = serialized_result_dict(rdata, header, error_list)
     response_headers = resp_header(result)
@@ -498,6 +631,7 @@ def status_read(book_id=None):
 
 @app.route('/books_search', methods=['POST', 'GET'])
 @require_app_key
+@conditional_response("book collection", "books read", "books tags", "tag labels")
 def books_search():
     """
     Search for books by query parameters.
@@ -521,15 +655,94 @@ def books_search():
     The `resp_header` function is used to construct the appropriate HTTP
     headers for the response.
 
+    The optional `mode` argument selects `like` (default), `fulltext` or
+    `boolean` matching for Title and Author; the FULLTEXT modes add a
+    `Relevance` column and order by it.  An unknown mode returns status 400.
+
+    Paging: `limit` bounds the number of rows (at most `SEARCH_LIMIT_MAX`) and
+    adds a `next_cursor` key to the response, null on the last page.  Passing
+    that value back as `cursor` returns the following page.  `fields` is a comma
+    separated list of columns to return.  Without `limit` and `cursor` the whole
+    result set is returned as before.
+
+    `stream` (`ndjson` or `json`) streams the rows, read in batches of
+    `STREAM_BATCH_ROWS`; a paged stream ends with the `next_cursor`.  Errors are
+    reported in the body with status 200, as without `stream`.
+
     """
     # process any query parameters
-    args = request.args
-    rdata, s, header, error_list = books_search_utility(args)
-    result = serialized_result_dict(rdata, header, error_list)
+    args = request.args.to_dict()
+    mode = args.pop("mode", None)
+    limit = args.pop("limit", None)
+    cursor = args.pop("cursor", None)
+    fields = args.pop("fields", None)
+    stream = args.pop("stream", None)
+    if stream is not None and stream not in STREAM_FORMATS:
+        return _invalid_stream_response(stream)
+    if mode is not None and mode not in SEARCH_MODES:
+        rdata = json.dumps({"error": f"Invalid search mode: {mode}. Use one of {', '.join(SEARCH_MODES)}."})
+        response_headers = resp_header(rdata)
+        return Response(response=rdata, status=400, headers=response_headers)
+    if limit is not None and not limit.isdigit():
+        rdata = json.dumps({"error": f"Invalid limit: {limit}"})
+        response_headers = resp_header(rdata)
+        return Response(response=rdata, status=400, headers=response_headers)
+    if cursor is not None:
+        try:
+            decode_search_cursor(cursor)
+        except ValueError as e:
+            rdata = json.dumps({"error": str(e)})
+            response_headers = resp_header(rdata)
+            return Response(response=rdata, status=400, headers=response_headers)
+    paged = limit is not None or cursor is not None
+    if paged:
+        limit = min(max(int(limit or SEARCH_LIMIT_MAX), 1), SEARCH_LIMIT_MAX)
+    if stream is not None:
+        return _stream_books_search(args, mode, limit, cursor, fields, stream)
+    rdata, s, header, error_list = books_search_utility(args, mode, limit, cursor)
+    extra = None
+    if paged:
+        next_cursor = None
+        if rdata is not None and len(rdata) == limit:
+            next_cursor = encode_search_cursor(rdata[-1], header)
+        extra = {"next_cursor": next_cursor}
+    try:
+        rdata, header = project_search_rows(rdata, header, fields)
+    except ValueError as e:
+        rdata = json.dumps({"error": str(e)})
+        response_headers = resp_header(rdata)
+        return Response(response=rdata, status=400, headers=response_headers)
+    result = serialized_result_dict(rdata, header, error_list, extra)
     response_headers = resp_header(result)
     return Response(response=result, status=200, headers=response_headers)
 
 
+def _stream_books_search(args, mode, limit, cursor, fields, stream):
+    """Streamed variant of `books_search`; see `stream_serialized_rows`."""
+    rows, _, header, error_list = books_search_utility(args, mode, limit, cursor, stream=True)
+    try:
+        positions, out_header = search_field_positions(header, fields)
+    except ValueError as e:
+        # rows is a generator that has not started, so no query has run yet
+        rdata = json.dumps({"error": str(e)})
+        response_headers = resp_header(rdata)
+        return Response(response=rdata, status=400, headers=response_headers)
+    trailer = None
+    if limit is not None:
+        def trailer(last_row, count):
+            next_cursor = encode_search_cursor(last_row, header) if count == limit else None
+            return {"next_cursor": next_cursor}
+    # errors are reported in the body with status 200, as by the buffered search
+    rdata = stream_serialized_rows(rows, out_header, stream, positions, trailer, error_list)
+    return Response(rdata, status=200, headers=stream_resp_header(stream))
+
+
+def _invalid_stream_response(stream):
+    rdata = json.dumps({"error": f"Invalid stream format: {stream}. Use one of {', '.join(STREAM_FORMATS)}."})
+    response_headers = resp_header(rdata)
+    return Response(response=rdata, status=400, headers=response_headers)
+
+
 ##########################################################################
 # COMPLETE BOOK RECORD
 ##########################################################################
@@ -565,17 +778,15 @@ def complete_record_window(book_id, window=20):
     Notes
     -----
     This route internally uses `get_book_ids_in_window` to obtain the list
-    of book IDs, then retrieves each complete record with
-    `get_complete_book_record`.  The response headers are generated by
-    `resp_header`.
+    of book IDs, then retrieves all complete records in one batch with
+    `get_complete_book_records` (one query per table for the whole window).
+    The response headers are generated by `resp_header`.
 
     See Also
     --------
-    get_book_ids_in_window, get_complete_book_record, resp_header
+    get_book_ids_in_window, get_complete_book_records, resp_header
     """
-    window_list = []
-    for bid in get_book_ids_in_window(book_id, int(window)):
-        window_list.append(get_complete_book_record(bid))
+    window_list = get_complete_book_records(get_book_ids_in_window(book_id, int(window)))
     rdata = json.dumps(window_list)
     response_headers = resp_header(rdata)
     return Response(response=rdata, status=200, headers=response_headers)
@@ -638,20 +849,22 @@ def complete_record(book_id, adjacent=None):
 @app.route('/add_tag/<book_id>/<tag>', methods=["PUT"])
 @require_app_key
 def add_tag(book_id, tag):
-    db = pymysql.connect(**books_conf)
+    db = books_pool.connection()
     tag = tag.lower()
     with db:
         with db.cursor() as c:
             try:
-                c.execute(f'INSERT IGNORE INTO `tag labels` SET Label="{tag}";')
-                c.execute(f'SELECT * from `tag labels` WHERE Label="{tag}";')
+                c.execute(queries.INSERT_TAG_LABEL, (tag,))
+                c.execute(queries.TAG_ID_BY_LABEL, (tag,))
                 tag_id = c.fetchall()[0][0]
-                c.execute('INSERT INTO `books tags` (BookID, TagID) VALUES (%s, %s)', (book_id, tag_id))
+                c.execute(queries.INSERT_BOOK_TAG, (book_id, tag_id))
+                log_activity(c, book_id, "add_tag", tag)
                 rdata = json.dumps({"BookID": f"{book_id}", "Tag": f"{tag}", "TagID": f"{tag_id}"})
             except pymysql.Error as e:
                 app.logger.error(e)
                 rdata = json.dumps({"error": str(e)})
         db.commit()
+    invalidate_indexes()
     response_headers = resp_header(rdata)
     return Response(response=rdata, status=200, headers=response_headers)
 
@@ -659,34 +872,32 @@ def add_tag(book_id, tag):
 @app.route('/tag_counts')
 @app.route('/tag_counts/<tag>')
 @require_app_key
+@conditional_response("books tags", "tag labels")
 def tag_counts(tag=None):
     """
     Retrieve tag count information from the database.
 
     This view handles GET requests to `/tag_counts` or `/tag_counts/<tag>`. It queries the MySQL database configured in `books_conf` to count occurrences of each tag label. If a `tag` parameter is supplied, the query filters results to labels that start with the provided string. The function logs the executed query, executes it, handles any database errors, and returns a Flask Response object containing the serialized JSON data and appropriate response headers.
 
+    The optional ``stream`` query argument (``ndjson`` or ``json``) streams the
+    counts, read in batches of ``STREAM_BATCH_ROWS``.
+
     Args:
         tag (str or None): Optional tag name used to filter results by label prefix.
 
     Returns:
         Response: Flask Response object with JSON data and response headers.
     """
-    db = pymysql.connect(**books_conf)
-    search_str = "SELECT a.Label as Tag, COUNT(b.TagID) as Count"
-    search_str += " FROM `tag labels` a JOIN `books tags` b ON a.TagID =b.TagID"
-    if tag is not None:
-        search_str += f" WHERE Label LIKE \"{tag}%\""
-    search_str += " GROUP BY Label ORDER BY count DESC, Label ASC"
-    app.logger.debug(search_str)
-    header = ["Tag", "Count"]
-    c = db.cursor()
-    try:
-        c.execute(search_str)
-    except pymysql.Error as e:
-        rdata = json.dumps({"error": str(e)})
-        app.logger.error(e)
+    stream = request.args.get("stream")
+    if stream is not None:
+        if stream not in STREAM_FORMATS:
+            return _invalid_stream_response(stream)
+        rows, _, header, _ = tag_counts_utility(tag, stream=True)
+        return Response(stream_serialized_rows(rows, header, stream), status=200, headers=stream_resp_header(stream))
+    s, _, header, error_list = tag_counts_utility(tag)
+    if error_list is not None:
+        rdata = json.dumps({"error": error_list[0]})
     else:
-        s = c.fetchall()
         rdata = serialized_result_dict(s, header)
     response_headers = resp_header(rdata)
     return Response(response=rdata, status=200, headers=response_headers)
@@ -750,18 +961,18 @@ def update_tag_value(current, updated):
     ------
     None
     """
-    db = pymysql.connect(**books_conf)
+    db = books_pool.connection()
     with db:
         with db.cursor() as c:
             try:
                 _updated = updated.lower().strip(" ")
-                records = c.execute("UPDATE `tag labels` SET Label = '{}' WHERE Label = '{}'".format(
-                    _updated, current))
+                records = c.execute(queries.RENAME_TAG_LABEL, (_updated, current))
                 rdata = json.dumps({"data": {"tag_update": f"{current} >> {updated}", "updated_tags": records}})
             except pymysql.Error as e:
                 app.logger.error(e)
                 rdata = json.dumps({"error": str(e)})
         db.commit()
+    invalidate_indexes()
     response_headers = resp_header(rdata)
     return Response(response=rdata, status=200, headers=response_headers)
 
@@ -797,7 +1008,7 @@ def tags_search(match_str):
 @app.route('/tag_maintenance')
 @require_app_key
 def tag_maintenance():
-    db = pymysql.connect(**books_conf)
+    db = books_pool.connection()
     rdata = {"tag_maintenance": {}}
     with db:
         with db.cursor() as c:
@@ -808,6 +1019,30 @@ def tag_maintenance():
             except pymysql.Error as e:
                 rdata = {"error": [str(e)]}
                 app.logger.error(e)
+    invalidate_indexes()
+    rdata = json.dumps(rdata)
+    response_headers = resp_header(rdata)
+    return Response(response=rdata, status=200, headers=response_headers)
+
+
+@app.route('/summary_maintenance')
+@require_app_key
+def summary_maintenance():
+    """
+    Rebuild the `reading summary` table from `book collection` and `books read`.
+
+    The API keeps the summary current on its own writes; run this after creating
+    the table or after reads or page counts were changed outside the API.
+
+    Returns
+        flask.Response - JSON object with the number of months in the rebuilt
+        summary, or the database error.
+    """
+    months, error_list = rebuild_reading_summary()
+    if error_list:
+        rdata = {"error": error_list}
+    else:
+        rdata = {"summary_maintenance": {"months": months}}
     rdata = json.dumps(rdata)
     response_headers = resp_header(rdata)
     return Response(response=rdata, status=200, headers=response_headers)
@@ -834,22 +1069,19 @@ def date_page_records(record_id=None):
 @app.route('/record_set/<book_id>')
 @require_app_key
 def record_set(book_id=None):
-    db = pymysql.connect(**books_conf)
-    rdata = {"record_set": {"BookCollectionID": book_id, "RecordID": [], "Estimate": []}}
-    q = ("SELECT StartDate, RecordID FROM `complete date estimates` "
-         f"WHERE BookCollectionID = {book_id} ORDER BY StartDate ASC")
-    with db:
-        with db.cursor() as c:
-            try:
-                c.execute(q)
-                res = c.fetchall()
-            except pymysql.Error as e:
-                rdata["error"].append(str(e))
-                app.logger.error(e)
-        db.commit()
-    for record in [(str(x[0]), int(x[1])) for x in res]:
-        rdata["record_set"]["RecordID"].append(record)
-        rdata["record_set"]["Estimate"].append(calculate_estimates(record[1]))
+    """
+    Readings of a book with their completion date estimates.
+
+    E.g.
+    curl http://172.17.0.2:5000/record_set/1234
+
+    :return: {"record_set": {"BookCollectionID": ..., "RecordID": [[StartDate, RecordID], ...],
+              "Estimate": [[likely, earliest, latest], ...]}}
+    """
+    records, estimates, error_list = calculate_book_estimates(book_id)
+    rdata = {"record_set": {"BookCollectionID": book_id, "RecordID": records, "Estimate": estimates}}
+    if error_list is not None:
+        rdata["error"] = error_list
     rdata = json.dumps(rdata)
     response_headers = resp_header(rdata)
     return Response(response=rdata, status=200, headers=response_headers)
@@ -874,17 +1106,16 @@ def add_date_page():
     """
     # records should be a single dictionaries including all fields
     record = request.get_json()
-    search_str = "INSERT INTO `daily page records` SET "
-    search_str += 'RecordID="{RecordID}", '
-    search_str += 'RecordDate="{RecordDate}", '
-    search_str += 'page="{Page}";'
-    app.logger.debug(search_str.format(**record))
-    db = pymysql.connect(**books_conf)
+    params = (record["RecordID"], record["RecordDate"], record["Page"])
+    app.logger.debug(f"{queries.INSERT_DAILY_PAGE} {params}")
+    db = books_pool.connection()
     rdata = json.dumps({"error": "No record added."})
     with db:
         with db.cursor() as c:
             try:
-                c.execute(search_str.format(**record))
+                c.execute(queries.INSERT_DAILY_PAGE, params)
+                c.execute(queries.ESTIMATE_BOOK, (record["RecordID"],))
+                log_activity(c, [row[0] for row in c.fetchall()], "add_date_page", record["RecordDate"])
                 rdata = json.dumps({"add_date_page": record})
             except pymysql.Error as e:
                 app.logger.error(e)
@@ -899,17 +1130,17 @@ def add_date_page():
 @require_app_key
 def add_book_estimate(book_id, last_readable_page, start_date=None):
     # TODO: if you call it again, you get a new record_id for a second reading of the same book
-    db = pymysql.connect(**books_conf)
+    db = books_pool.connection()
     last_readable_page = int(last_readable_page)
     if start_date is None:
         start_date = datetime.datetime.now().strftime(FMT)
-    q = (f'INSERT INTO `complete date estimates` SET BookCollectionID={book_id},'
-         f' StartDate="{start_date}", LastReadablePage={last_readable_page};')
-    app.logger.debug(q)
+    params = (book_id, start_date, last_readable_page)
+    app.logger.debug(f"{queries.INSERT_ESTIMATE} {params}")
     with db:
         with db.cursor() as c:
             try:
-                c.execute(q)
+                c.execute(queries.INSERT_ESTIMATE, params)
+                log_activity(c, book_id, "add_estimate", start_date)
                 rdata = json.dumps({"add_book_estimate":
                                         {"BookCollectionID": f"{book_id}", "LastReadablePage":
                                             f"{last_readable_page}", "StartDate": f"{start_date}"}})
@@ -939,7 +1170,7 @@ def get_images(book_id):
     E.g.
     curl http://172.17.0.2:5000/images/1234
     """
-    db = pymysql.connect(**books_conf)
+    db = books_pool.connection()
     search_str = "SELECT id, BookCollectionID, name, url, type FROM `images` WHERE BookCollectionID = %s"
 
     with db:
@@ -994,7 +1225,6 @@ def add_image():
     Returns:
         JSON response with the inserted image record including the auto-generated id
     """
-    db = pymysql.connect(**books_conf)
     record = request.get_json()
 
     # Validate required fields
@@ -1047,19 +1277,16 @@ def add_image():
                 response_headers = resp_header(rdata)
                 return Response(response=rdata, status=400, headers=response_headers)
 
-    search_str = ("INSERT INTO `images` "
-                  "(BookCollectionID, name, url, type) "
-                  "VALUES "
-                  "({BookCollectionID}, \"{name}\", \"{url}\", \"{type}\");")
-    image_id_str = "SELECT LAST_INSERT_ID();"
+    params = (record["BookCollectionID"], record.get("name"), record.get("url"), record["type"])
 
+    db = books_pool.connection()
     with db:
         with db.cursor() as c:
             try:
-                app.logger.debug(search_str.format(**record))
-                c.execute(search_str.format(**record))
-                c.execute(image_id_str)
-                record["id"] = c.fetchall()[0][0]
+                app.logger.debug(f"{queries.INSERT_IMAGE} {params}")
+                c.execute(queries.INSERT_IMAGE, params)
+                record["id"] = c.lastrowid
+                log_activity(c, record["BookCollectionID"], "add_image", record["type"])
                 rdata = json.dumps({"add_image": record})
             except pymysql.Error as e:
                 app.logger.error(e)
@@ -1140,68 +1367,68 @@ def upload_image():
         return Response(response=rdata, status=500, headers=response_headers)
 
 
+# charts are drawn in render_pool processes; this worker only fetches the rows
+
+def _render_year_progress_comparison(window):
+    _, s, h, e = books_read_by_year_utility()
+    return render_pool.render("year_progress_comparison", s, h, window)
+
+
+def _render_all_years(year):
+    _, s, h, e = summary_books_read_by_year_utility()
+    return render_pool.render("all_years", s, h, year)
+
+
+# renderers by report name, also used to re-render cached images in the background
+REPORT_RENDERERS = {
+    "year_progress_comparison": _render_year_progress_comparison,
+    "all_years": _render_all_years,
+}
+
+
+def _report_data_version():
+    return table_fingerprint(REPORT_TABLES)
+
+
+def _cached_report(route, arg):
+    version = g.get("data_version") or _report_data_version()
+    try:
+        img = BytesIO(render_cache.render(route, arg, version, REPORT_RENDERERS[route]))
+    except (RenderBroken, RenderBusy, RenderTimeout) as e:
+        app.logger.error(e)
+        rdata = json.dumps({"error": str(e)})
+        response_headers = resp_header(rdata) + [('Retry-After', '5')]
+        return Response(response=rdata, status=503, headers=response_headers)
+    return send_file(img, mimetype='image/png')
+
+
 @app.route('/image/year_progress_comparison.png')
 @app.route('/image/year_progress_comparison.png/<window>')
 @require_app_key
+@conditional_response(*REPORT_TABLES, compress=False)
 def year_progress_comparison(window=15):
-    window = int(window)
-    img = BytesIO()
-    _, s, h, e = books_read_by_year_utility()
-    df1 = pd.DataFrame(s, columns=h)
-    df1["read_date"] = pd.to_datetime(df1["ReadDate"])
-    df1 = df1.set_index("ReadDate")
-    df1.index = pd.to_datetime(df1.index)
-    ds_pages = df1.groupby(df1.index.to_period('Y'))["Pages"].cumsum()
-    ds_day = df1.read_date.apply(lambda x: x.dayofyear)
-    ds_year = df1.read_date.apply(lambda x: x.year)
-    df1 = pd.concat([ds_pages, ds_day, ds_year], axis=1)
-    df1.columns = ["Pages", "Day", "Year"]
-    fig_size = [8, 8]
-    xlim = [0, 365]
-    ylim = [0, max(df1.Pages)]
-    years = df1.Year.unique()[-window:].tolist()
-    current_year = max(years)
-    y = years.pop(0)
-    _df = df1.loc[df1.Year == y]
-    ax = _df.plot("Day", "Pages", figsize=fig_size, xlim=xlim, ylim=ylim, label=y)
-    for y in years:
-        _df = df1.loc[df1.Year == y]
-        lw = 1 if y != current_year else 4
-        ax = _df.plot("Day", "Pages", figsize=fig_size, xlim=xlim, ylim=ylim, ax=ax, label=y, lw=lw)
-    plt.savefig(img, format='png')
-    img.seek(0)
-    return send_file(img, mimetype='image/png')
+    """
+    Cumulative pages read by day of year, one line per year for the last ``window``
+    years.  Images are served from ``render_cache`` while the data is unchanged.
+    """
+    return _cached_report("year_progress_comparison", int(window))
+
+
+def _report_year(year=None):
+    return datetime.datetime.now().year if year is None else int(year)
 
 
 @app.route('/image/all_years.png')
 @app.route('/image/all_years.png/<year>')
 @require_app_key
+# the resolved year is part of the ETag, so a tag from last year does not match after Jan 1
+@conditional_response(*REPORT_TABLES, compress=False, resolve=_report_year)
 def all_years(year=None):
-    if year is None:
-        year = datetime.datetime.now().year
-    else:
-        year = int(year)
-    img = BytesIO()
-    _, s, h, e = summary_books_read_by_year_utility()
-    df = pd.DataFrame(s, columns=h)
-    df['pages read'] = df['pages read'].astype(float)
-    df["rank"] = df["pages read"].rank(ascending=False)
-    df.sort_values(by=["rank"], inplace=True)
-    df.reset_index()
-    # When we are in a new year, but no read books yet, we need to add the year
-    if year not in df.year.unique():
-        year = df.year.unique().max()
-    now_df = df.loc[df["year"] == year]
-    app.logger.debug(now_df)
-    fig, axs = plt.subplots(3, 1, figsize=[10, 18])
-    df.hist("pages read", bins=14, color="darkblue", ax=axs[0])
-    axs[0].axvline(x=int(now_df["pages read"].iloc[0]), color="red")
-    df.plot.bar(x="rank", y="pages read", width=.95, color="darkblue", ax=axs[1])
-    axs[1].axvline(x=int(now_df["rank"].iloc[0]) - 1, color="red")
-    df.sort_values("year").plot.bar(x="year", y="pages read", width=.95, color="darkblue", ax=axs[2])
-    fig.savefig(img, format='png')
-    img.seek(0)
-    return send_file(img, mimetype='image/png')
+    """
+    Pages read in ``year`` (default: the current year) compared with every other
+    year.  Images are served from ``render_cache`` while the data is unchanged.
+    """
+    return _cached_report("all_years", _report_year(year))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+import functools
+import gzip
+import hashlib
+import logging
+
+from booksdb.api_util import table_fingerprint
+from flask import Response, g, request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+app_logger = logging.getLogger('flask.app')
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Clients may keep a copy but must revalidate it; responses need an API key
+CACHE_CONTROL = "private, no-cache"
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pick the content coding for a response from an ``Accept-Encoding`` header.
+
+    Parameters
+    ----------
+    accept_encoding : str or None
+        The request header value, e.g. ``"gzip, deflate, br;q=0.9"``.
+
+    Returns
+    -------
+    str or None
+        ``"br"`` (when the brotli package is installed) or ``"gzip"``, preferring
+        the higher q-value and brotli on a tie, or None for an identity response.
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+    wildcard = weights.get("*", 0.0)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress_body(data, encoding):
+    """Compress ``data`` (bytes) with ``"gzip"`` or ``"br"``."""
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def make_etag(key, fingerprint, encoding=None):
+    """
+    Strong entity tag for one representation of a resource.
+
+    Parameters
+    ----------
+    key : str
+        Identifies the resource, normally the request path and query string.
+    fingerprint : str
+        Data version from ``table_fingerprint``.
+    encoding : str or None
+        Content coding of the body; each coding is a distinct representation.
+
+    Returns
+    -------
+    str
+        Unquoted tag value.
+    """
+    digest = hashlib.sha1(f"{key}\n{fingerprint}".encode("utf-8")).hexdigest()
+    return f"{digest}-{encoding}" if encoding else digest
+
+
+def conditional_response(*tables, compress=True, resolve=None):
+    """
+    Add ETag revalidation and response compression to a read-only GET view.
+
+    The ETag is derived from ``table_fingerprint(tables)``, the request path and the
+    query string, so it is known before the view runs: a request whose
+    ``If-None-Match`` matches gets ``304 Not Modified`` without running the query or
+    serializing the result.  Otherwise the view runs, and a buffered 200 response
+    larger than ``MIN_COMPRESS_BYTES`` is gzip or brotli encoded according to
+    ``Accept-Encoding``.  Streamed and non-GET responses are passed through
+    unchanged, as is everything when the fingerprint query fails.  The fingerprint
+    is left in ``flask.g.data_version`` for the view.
+
+    Parameters
+    ----------
+    *tables : str
+        Tables the view reads; keys of ``TABLE_FINGERPRINTS``.
+    compress : bool, optional
+        Set False for bodies that are already compressed, such as PNG images.
+    resolve : callable, optional
+        Called with the view's arguments; its result is added to the ETag key.  Use
+        it when a view fills in a default that changes over time (the current year),
+        so the same URL does not keep the tag of an earlier default.
+
+    Returns
+    -------
+    callable
+        Decorator for a Flask view function.
+    """
+
+    def decorator(view_function):
+        @functools.wraps(view_function)
+        def decorated_function(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view_function(*args, **kwargs)
+            fingerprint = table_fingerprint(tables)
+            if fingerprint is None:
+                return view_function(*args, **kwargs)
+            # views that key their own caches on the data version reuse it
+            g.data_version = fingerprint
+            encoding = negotiate_encoding(request.headers.get("Accept-Encoding")) if compress else None
+            key = request.full_path
+            if resolve is not None:
+                key = f"{key}\n{resolve(*args, **kwargs)}"
+            etag = make_etag(key, fingerprint, encoding)
+            # the client may hold the identity representation if the body was too small to compress
+            matched = [tag for tag in (etag, make_etag(key, fingerprint)) if request.if_none_match.contains_weak(tag)]
+            if matched:
+                response = Response(status=304)
+                response.set_etag(matched[0])
+                _set_cache_headers(response, compress)
+                return response
+
+            response = view_function(*args, **kwargs)
+            if response.status_code != 200:
+                return response
+            if response.direct_passthrough:
+                # send_file output (images): cacheable, but the file is sent as is
+                response.set_etag(make_etag(key, fingerprint))
+                _set_cache_headers(response, compress)
+                return response
+            if response.is_streamed:
+                return response
+            body = response.get_data()
+            if encoding is None or len(body) < MIN_COMPRESS_BYTES:
+                response.set_etag(make_etag(key, fingerprint))
+            else:
+                response.set_data(compress_body(body, encoding))
+                response.headers["Content-Encoding"] = encoding
+                response.set_etag(etag)
+            _set_cache_headers(response, compress)
+            return response
+
+        return decorated_function
+
+    return decorator
+
+
+def _set_cache_headers(response, compress):
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if compress:
+        response.vary.add("Accept-Encoding")
@@ -1,8 +1,76 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-import json
+from bookdbtool.isbn_cache import ISBNCache
+from requests.adapters import HTTPAdapter
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_RATE_LIMIT = 1.0  # requests per second; ISBNdb's basic plan allows 1, premium 3, pro 5
+DEFAULT_TIMEOUT_SECONDS = 10
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: ``rate`` tokens per second, holding at most ``capacity``.
+
+    ``acquire`` blocks until a token is available, so callers sharing a bucket together
+    stay within the rate.  A rate of 0 or less disables the limit.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available; returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
 
 
 class Endpoint:
+    """
+    Client of the ISBN lookup service (ISBNdb).
+
+    One instance keeps a keep-alive ``requests.Session`` and a ``TokenBucket`` shared by
+    every lookup made through it, so create it once per process.  Lists are looked up
+    concurrently on up to ``max_concurrency`` threads, each request within ``timeout``
+    seconds and all of them within ``rate_limit`` requests per second.
+
+    Parameters
+    ----------
+    conf : dict
+        The ``isbn_com`` configuration: ``url_isbn`` (with a ``{}`` for the ISBN) and ``key``.
+    max_concurrency : int, optional
+        Concurrent requests.  Defaults to ``BOOKDB_ISBN_MAX_CONCURRENCY`` or 4.
+    rate_limit : float, optional
+        Requests per second of this client; 0 disables the limit.  Defaults to
+        ``BOOKDB_ISBN_RATE_LIMIT`` or 1.  The API passes each uWSGI worker its share of
+        that service-wide quota.  Requests are spaced evenly at this rate, without a
+        burst after an idle spell.
+    timeout : float, optional
+        Seconds per request.  Defaults to ``BOOKDB_ISBN_TIMEOUT`` or 10.
+    cache : ISBNCache, optional
+        Persistent cache consulted before, and filled after, each request.  Defaults to
+        the cache at ``BOOKDB_ISBN_CACHE``; ``False`` or an unset variable disables it.
+    """
     COLLECTION_DB_DICT = {
         "Title": "",
         "Author": "",
@@ -17,30 +85,69 @@ class Endpoint:
         "Recycled": "0=No or 1=Yes"
     }
 
-    def __init__(self, conf):
+    def __init__(self, conf, max_concurrency=None, rate_limit=None, timeout=None, cache=None):
         self.config = conf
+        self.cache = ISBNCache.from_env() if cache is None else (cache or None)
+        self.max_concurrency = max(1, int(max_concurrency if max_concurrency is not None else
+                                          os.getenv("BOOKDB_ISBN_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)))
+        self.timeout = float(timeout if timeout is not None else
+                             os.getenv("BOOKDB_ISBN_TIMEOUT", DEFAULT_TIMEOUT_SECONDS))
+        # no bursts: a full bucket on top of a provider's per-second window would exceed it
+        self.rate_limiter = TokenBucket(rate_limit if rate_limit is not None else
+                                        os.getenv("BOOKDB_ISBN_RATE_LIMIT", DEFAULT_RATE_LIMIT), capacity=1)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def get_book_by_isbn(self, isbn=None):
+        if self.cache is not None:
+            cached = self.cache.get(isbn)
+            if cached is not None:
+                return cached
         url = self.config.get("url_isbn").format(isbn)
         headers = {'Authorization': self.config.get("key")}
+        self.rate_limiter.acquire()
         try:
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            res = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
             error_message = str(e)
-            return {
+            res = {
                 'error': error_message
             }
+            # only "not found" is cached; timeouts, quota and server errors are retried
+            not_found = getattr(getattr(e, "response", None), "status_code", None) == 404
+            if self.cache is not None and not_found:
+                self.cache.put(isbn, res, found=False)
+            return res
+        if self.cache is not None:
+            self.cache.put(isbn, res)
+        return res
 
     def get_books_by_isbn_list(self, isbn_list=[]):
-        result = {}
-        for isbn in isbn_list:
-            try:
-                result[isbn] = self.get_book_by_isbn(isbn)
-            except Exception as e:
-                result[isbn] = {'error': str(e)}
-        return result
+        """
+        Look up each ISBN of ``isbn_list`` concurrently.
+
+        Returns
+        -------
+        dict
+            The lookup result (or ``{'error': ...}``) per ISBN, in input order.
+        """
+        isbn_list = list(dict.fromkeys(isbn_list))
+        if not isbn_list:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(isbn_list)),
+                                thread_name_prefix="isbn-lookup") as executor:
+            responses = executor.map(self._get_book_or_error, isbn_list)
+            return dict(zip(isbn_list, responses))
+
+    def _get_book_or_error(self, isbn):
+        try:
+            return self.get_book_by_isbn(isbn)
+        except Exception as e:
+            return {'error': str(e)}
 
     def _endpoint_to_collection_db(self, isbn_dict):
         proto = self.COLLECTION_DB_DICT.copy()
@@ -0,0 +1,190 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+app_logger = logging.getLogger('flask.app')
+
+DEFAULT_RENDER_CACHE_SIZE = 32
+
+
+class RenderCache:
+    """
+    LRU cache of rendered report images, keyed by ``(route, argument, data version)``.
+
+    The data version is a table fingerprint, so a cached image is never served after
+    the data it was drawn from changes; stale entries simply age out.  With a
+    ``directory`` the images are also written to disk, which lets the uWSGI workers
+    share renders and keeps them across restarts.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        Images kept in memory, and on disk.  Defaults to ``BOOKDB_RENDER_CACHE_SIZE``
+        or 32.
+    directory : str, optional
+        Directory for persisted images.  Defaults to ``BOOKDB_RENDER_CACHE_DIR``; unset
+        keeps the cache in memory only.
+    """
+
+    def __init__(self, max_entries=None, directory=None):
+        self.max_entries = int(max_entries if max_entries is not None else
+                               os.getenv("BOOKDB_RENDER_CACHE_SIZE", DEFAULT_RENDER_CACHE_SIZE))
+        self.directory = directory if directory is not None else os.getenv("BOOKDB_RENDER_CACHE_DIR")
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._refresh_lock = threading.Lock()
+        self._refresh_pending = False
+        self._refresh_thread = None
+
+    def _path(self, key):
+        route, arg, version = key
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"{route}-{arg}-{digest}.png")
+
+    def get(self, key):
+        """
+        Cached image for ``key``, from memory or else from disk.
+
+        Returns
+        -------
+        bytes or None
+            The image, or None on a miss.
+        """
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return data
+        if self.directory:
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+            except OSError:
+                data = None
+            if data is not None:
+                self._remember(key, data)
+                with self._lock:
+                    self._hits += 1
+                return data
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, key, data):
+        """Store ``data`` for ``key``, evicting the least recently used images."""
+        self._remember(key, data)
+        if self.directory:
+            try:
+                self._write(key, data)
+            except OSError as e:
+                app_logger.error(e)
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _write(self, key, data):
+        # write then rename, so another worker never reads a partial image
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+        images = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                  if name.endswith(".png")]
+        if len(images) > self.max_entries:
+            images.sort(key=os.path.getmtime)
+            for path in images[:len(images) - self.max_entries]:
+                os.remove(path)
+
+    def render(self, route, arg, version, renderer):
+        """
+        Image for ``route`` and ``arg`` at data ``version``, rendering it on a miss.
+
+        Parameters
+        ----------
+        route : str
+            Report name.
+        arg : hashable
+            The report's argument (window, year, ...).
+        version : str or None
+            Data version; None (fingerprint unavailable) renders without caching.
+        renderer : callable
+            ``renderer(arg)`` returns the PNG bytes.
+
+        Returns
+        -------
+        bytes
+            The PNG image.
+        """
+        if version is None:
+            return renderer(arg)
+        key = (route, arg, version)
+        data = self.get(key)
+        if data is None:
+            data = renderer(arg)
+            self.put(key, data)
+        return data
+
+    def recent_requests(self):
+        """Distinct ``(route, arg)`` pairs in the cache, most recently used first."""
+        with self._lock:
+            keys = list(reversed(self._entries))
+        return list(OrderedDict.fromkeys((route, arg) for route, arg, _ in keys))
+
+    def refresh_async(self, version_function, renderers):
+        """
+        Re-render the recently requested images for the current data version in a
+        background thread, so the next request for them is served from the cache.
+
+        A call made while a refresh is running schedules one more pass instead of
+        starting a second thread.  uWSGI needs ``enable-threads`` for the thread to run.
+
+        Parameters
+        ----------
+        version_function : callable
+            Returns the current data version.
+        renderers : dict
+            Maps each route to its ``renderer(arg)``.
+        """
+        with self._refresh_lock:
+            self._refresh_pending = True
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self._refresh, args=(version_function, renderers),
+                                                    name="render-cache-refresh", daemon=True)
+            self._refresh_thread.start()
+
+    def _refresh(self, version_function, renderers):
+        while True:
+            with self._refresh_lock:
+                if not self._refresh_pending:
+                    self._refresh_thread = None
+                    return
+                self._refresh_pending = False
+            version = version_function()
+            if version is None:
+                continue
+            for route, arg in self.recent_requests():
+                if route not in renderers:
+                    continue
+                try:
+                    self.render(route, arg, version, renderers[route])
+                except Exception as e:  # a failed background render must not kill the thread
+                    app_logger.error(f"Background render of {route}/{arg} failed: {e}")
+
+    def stats(self):
+        """Entry count, hit and miss counters and the disk directory."""
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries,
+                    "hits": self._hits, "misses": self._misses, "directory": self.directory}
@@ -0,0 +1,195 @@
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+app_logger = logging.getLogger('flask.app')
+
+DEFAULT_RENDER_WORKERS = 1
+DEFAULT_RENDER_TIMEOUT_SECONDS = 30
+DEFAULT_RENDER_QUEUE = 4
+# recycle render processes periodically so matplotlib/pandas caches cannot grow without bound
+RENDER_TASKS_PER_CHILD = 100
+
+
+class RenderBusy(Exception):
+    """Raised when the render queue is full."""
+
+
+class RenderTimeout(Exception):
+    """Raised when a render does not finish within the pool timeout."""
+
+
+class RenderBroken(Exception):
+    """Raised when a render process died; the next render starts a fresh pool."""
+
+
+class RenderPool:
+    """
+    Bounded pool of processes that draw the PNG reports.
+
+    Rendering runs in ``report_render.render_report`` in a separate process, so a slow or
+    memory-hungry figure cannot stall or bloat the uWSGI worker; the worker only fetches
+    the rows and waits for the PNG bytes.  The processes are started with the ``spawn``
+    method (forking a threaded worker is unsafe) with the interpreter from
+    ``python_executable``, use the Agg backend, and are replaced after
+    ``RENDER_TASKS_PER_CHILD`` renders.  The executor is created on the first render,
+    so each uWSGI worker gets its own after the fork.  A render that times out has its
+    pool killed, so it cannot keep occupying a render process.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        Render processes.  Defaults to ``BOOKDB_RENDER_WORKERS`` or 1.
+    timeout : float, optional
+        Seconds to wait for one render.  Defaults to ``BOOKDB_RENDER_TIMEOUT`` or 30.
+    max_queue : int, optional
+        Renders allowed to be queued or running at once; more raise ``RenderBusy``.
+        Defaults to ``BOOKDB_RENDER_QUEUE`` or 4.
+    """
+
+    def __init__(self, max_workers=None, timeout=None, max_queue=None):
+        self.max_workers = int(max_workers if max_workers is not None else
+                               os.getenv("BOOKDB_RENDER_WORKERS", DEFAULT_RENDER_WORKERS))
+        self.timeout = float(timeout if timeout is not None else
+                             os.getenv("BOOKDB_RENDER_TIMEOUT", DEFAULT_RENDER_TIMEOUT_SECONDS))
+        self.max_queue = int(max_queue if max_queue is not None else
+                             os.getenv("BOOKDB_RENDER_QUEUE", DEFAULT_RENDER_QUEUE))
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = 0
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "timeouts": 0, "rejected": 0}
+
+    def _get_executor(self):
+        if self._executor is None:
+            context = multiprocessing.get_context("spawn")
+            context.set_executable(python_executable())
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                                 initializer=_init_render_process,
+                                                 max_tasks_per_child=RENDER_TASKS_PER_CHILD)
+        return self._executor
+
+    def _discard_executor(self, executor):
+        """
+        Stop ``executor`` and kill its processes, so a hung render cannot hold a slot.
+
+        Renders still running in it fail with ``BrokenProcessPool``; the next render
+        starts a fresh pool.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        # shutdown() forgets the processes; collect them first
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.kill()
+
+    def render(self, report, rows, header, arg):
+        """
+        Draw ``report`` from ``rows`` in a render process.
+
+        Parameters
+        ----------
+        report : str
+            Key of ``report_render.REPORTS``.
+        rows, header
+            The report's data, as returned by its utility function.
+        arg
+            The report's argument (window, year, ...).
+
+        Returns
+        -------
+        bytes
+            The PNG image.
+
+        Raises
+        ------
+        RenderBusy
+            If ``max_queue`` renders are already queued or running.
+        RenderTimeout
+            If the render takes longer than ``timeout`` seconds.
+        RenderBroken
+            If the pool broke (``BrokenProcessPool``): a render process died, or the
+            pool was killed after another render timed out.
+        """
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self._counters["rejected"] += 1
+                raise RenderBusy(f"{self._pending} renders already queued")
+            self._pending += 1
+            self._counters["submitted"] += 1
+        try:
+            with self._lock:
+                executor = self._get_executor()
+                future = executor.submit(_render_report, report, rows, header, arg)
+            data = future.result(timeout=self.timeout)
+        except TimeoutError:
+            # a render that already started cannot be cancelled; kill its process instead
+            if not future.cancel():
+                self._discard_executor(executor)
+            self._count("timeouts")
+            raise RenderTimeout(f"Rendering {report} took longer than {self.timeout:g} s")
+        except BrokenProcessPool as e:
+            # a render process died or was killed; the next render starts a fresh pool
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+                self._counters["failed"] += 1
+            raise RenderBroken(f"Rendering {report} failed: the render process pool broke") from e
+        except Exception:
+            self._count("failed")
+            raise
+        else:
+            self._count("completed")
+            return data
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        """Queue depth, limits and cumulative counters for this worker's pool."""
+        with self._lock:
+            return {"pid": os.getpid(), "workers": self.max_workers, "started": self._executor is not None,
+                    "queue_depth": self._pending, "max_queue": self.max_queue, "timeout": self.timeout,
+                    **self._counters}
+
+
+def python_executable():
+    """
+    Python interpreter to start the render processes with.
+
+    ``BOOKDB_RENDER_PYTHON`` if set.  Otherwise ``sys.executable`` when it is a Python
+    interpreter; under uWSGI it is the uwsgi binary, so the interpreter of the running
+    Python installation (``sys.prefix``) or the first ``python3`` on the PATH is used.
+    """
+    configured = os.getenv("BOOKDB_RENDER_PYTHON")
+    if configured:
+        return configured
+    if os.path.basename(sys.executable or "").startswith("python"):
+        return sys.executable
+    version = f"python{sys.version_info[0]}.{sys.version_info[1]}"
+    for candidate in (os.path.join(sys.prefix, "bin", version), os.path.join(sys.prefix, "bin", "python3"),
+                      shutil.which(version), shutil.which("python3")):
+        if candidate and os.access(candidate, os.X_OK):
+            return candidate
+    return sys.executable
+
+
+def _init_render_process():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _render_report(report, rows, header, arg):
+    # imported in the render process only; the API worker never loads pandas or matplotlib
+    from report_render import render_report
+    return render_report(report, rows, header, arg)
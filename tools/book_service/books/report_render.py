@@ -0,0 +1,76 @@
+import logging
+from io import BytesIO
+
+import pandas as pd
+from bookdbtool.reading_progress import plot_year_progress, year_progress_matrix
+from matplotlib.figure import Figure
+
+app_logger = logging.getLogger('flask.app')
+
+
+def _png_bytes(fig):
+    img = BytesIO()
+    fig.savefig(img, format='png')
+    return img.getvalue()
+
+
+def render_year_progress_comparison(rows, header, window=15):
+    """
+    PNG of cumulative pages read by day of year for the last ``window`` years.
+
+    The current (latest) year is drawn with a heavy line.  Uses a standalone Agg
+    ``Figure`` rather than pyplot, so it is safe to call from several threads.
+
+    Returns
+    -------
+    bytes
+        The PNG image.
+    """
+    years, matrix = year_progress_matrix(pd.DataFrame(rows, columns=header), window)
+    fig = Figure(figsize=[8, 8])
+    plot_year_progress(fig.add_subplot(), years, matrix, current_lw=4)
+    return _png_bytes(fig)
+
+
+def render_all_years(rows, header, year):
+    """
+    PNG comparing pages read in ``year`` with every other year.
+
+    Three panels: a histogram of pages read per year, years ranked by pages read and
+    pages read by year, with ``year`` marked in red.  If ``year`` has no books read
+    yet the latest year with data is marked instead.
+
+    Returns
+    -------
+    bytes
+        The PNG image.
+    """
+    df = pd.DataFrame(rows, columns=header)
+    df['pages read'] = df['pages read'].astype(float)
+    df["rank"] = df["pages read"].rank(ascending=False)
+    df.sort_values(by=["rank"], inplace=True)
+    # When we are in a new year, but no read books yet, we need to add the year
+    if year not in df.year.unique():
+        year = df.year.unique().max()
+    now_df = df.loc[df["year"] == year]
+    app_logger.debug(now_df)
+    fig = Figure(figsize=[10, 18])
+    axs = fig.subplots(3, 1)
+    df.hist("pages read", bins=14, color="darkblue", ax=axs[0])
+    axs[0].axvline(x=int(now_df["pages read"].iloc[0]), color="red")
+    df.plot.bar(x="rank", y="pages read", width=.95, color="darkblue", ax=axs[1])
+    axs[1].axvline(x=int(now_df["rank"].iloc[0]) - 1, color="red")
+    df.sort_values("year").plot.bar(x="year", y="pages read", width=.95, color="darkblue", ax=axs[2])
+    return _png_bytes(fig)
+
+
+# report name -> renderer(rows, header, arg), as drawn by render_pool
+REPORTS = {
+    "year_progress_comparison": render_year_progress_comparison,
+    "all_years": render_all_years,
+}
+
+
+def render_report(report, rows, header, arg):
+    """Draw ``REPORTS[report]`` and return the PNG bytes."""
+    return REPORTS[report](rows, header, arg)
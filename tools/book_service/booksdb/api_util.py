@@ -1,12 +1,19 @@
+import base64
 import datetime
 import json
 import logging
 import os
+import re
 from decimal import Decimal
 
-import numpy as np
 import pymysql
 
+from booksdb import queries
+from booksdb.book_index import BookIdIndex
+from booksdb.db_pool import ConnectionPool
+from booksdb.search_index import BookSearchIndex
+from booksdb.serializer import json_dumps, json_text
+
 app_logger = logging.getLogger('flask.app')
 
 table_header = ["BookCollectionID",
@@ -27,6 +34,18 @@ locations_sort_order = [3, 4, 2, 1, 7, 6, 5]
 
 FMT = "%Y-%m-%d"
 
+# books_search_utility modes; Title and Author have FULLTEXT indexes (Title_idx, Author_idx)
+SEARCH_MODES = ("like", "fulltext", "boolean")
+FULLTEXT_COLUMNS = ("Title", "Author")
+FULLTEXT_MIN_TOKEN_LENGTH = 4  # MyISAM ft_min_word_len default
+SEARCH_LIMIT_MAX = 1000  # largest page books_search_utility returns
+
+STREAM_FORMATS = ("ndjson", "json")
+STREAM_CHUNK_ROWS = 200  # rows per chunk written by stream_serialized_rows
+STREAM_BATCH_ROWS = 500  # rows per query of stream_keyset_rows
+
+ER_NO_SUCH_TABLE = 1146  # MySQL error for a missing table, e.g. before a schema upgrade
+
 API_KEY = None
 
 
@@ -90,6 +109,114 @@ def read_json_configuration():
 # server configuration
 books_conf, isbn_conf = read_json_configuration()
 
+# shared connection pool; every utility and route checks connections out of here
+books_pool = ConnectionPool(books_conf)
+
+# sorted BookCollectionIDs for next/previous and window lookups; invalidate after inserts
+book_id_index = BookIdIndex(books_pool)
+
+# optional in-process index answering books_search_utility without a table scan
+search_index = BookSearchIndex(books_pool) if os.getenv("BOOKDB_SEARCH_INDEX", "0") == "1" else None
+
+
+# Per-table change fingerprint used for HTTP ETags.  SUM(UNIX_TIMESTAMP(LastUpdate)) changes
+# when any row is touched, even twice within the same second, where MAX(LastUpdate) would
+# not; tables without LastUpdate fall back to a checksum of their content.
+TABLE_FINGERPRINTS = {
+    "book collection": "CONCAT_WS(':', COUNT(*), SUM(UNIX_TIMESTAMP(LastUpdate)))",
+    "books read": "CONCAT_WS(':', COUNT(*), SUM(UNIX_TIMESTAMP(LastUpdate)))",
+    "books tags": "CONCAT_WS(':', COUNT(*), SUM(UNIX_TIMESTAMP(LastUpdate)))",
+    "daily page records": "CONCAT_WS(':', COUNT(*), SUM(UNIX_TIMESTAMP(LastUpdate)))",
+    "tag labels": "CONCAT_WS(':', COUNT(*), SUM(CRC32(CONCAT_WS(':', TagID, Label))))",
+}
+
+
+def table_fingerprint(tables):
+    """
+    Cheap change fingerprint of the given tables, in one round trip.
+
+    Parameters
+    ----------
+    tables : iterable of str
+        Keys of ``TABLE_FINGERPRINTS``.
+
+    Returns
+    -------
+    str or None
+        Fingerprint that changes whenever a row of any of the tables is inserted,
+        updated or deleted, or None on a database error.
+
+    Raises
+    ------
+    KeyError
+        If a table has no fingerprint expression.
+    """
+    subqueries = [f"(SELECT {TABLE_FINGERPRINTS[table]} FROM `{table}`)" for table in tables]
+    try:
+        with books_pool.connection() as db:
+            c = db.cursor()
+            c.execute(f"SELECT {', '.join(subqueries)};")
+            row = c.fetchall()[0]
+    except pymysql.Error as e:
+        app_logger.error(e)
+        return None
+    return "|".join(str(value) for value in row)
+
+
+def invalidate_indexes():
+    """
+    Make the in-process indexes re-check the database on their next lookup.
+
+    Call after a write so this worker sees the change immediately; other workers
+    notice it on their next fingerprint check.
+    """
+    book_id_index.invalidate()
+    if search_index is not None:
+        search_index.invalidate()
+
+
+# `activity log` Action values written by the mutating routes
+ACTIVITY_ACTIONS = ("add_book", "update_book", "add_read", "update_read_note", "add_tag",
+                    "add_date_page", "add_estimate", "add_image")
+
+
+def log_activity(cursor, book_ids, action, detail=None):
+    """
+    Append events to `activity log` on the caller's cursor.
+
+    Run it on the connection of the write it records, before the commit.  The event
+    is committed with the caller's commit; `book collection` and `books tags` are
+    MyISAM and not transactional, so their changes are stored as each statement runs
+    and an event can be lost if the connection fails before the commit.  Failures
+    (including a missing table) are logged and never abort the caller's write.
+
+    Parameters
+    ----------
+    cursor : pymysql.cursors.Cursor
+        Cursor of the connection making the change.
+    book_ids : int or iterable of int
+        Book(s) touched.
+    action : str
+        One of ``ACTIVITY_ACTIONS``.
+    detail : str, optional
+        Short free text, truncated to 255 characters.
+    """
+    if isinstance(book_ids, (int, str)):
+        book_ids = [book_ids]
+    if detail is not None:
+        detail = str(detail)[:255]
+    rows = [(book_id, action, detail) for book_id in book_ids]
+    if not rows:
+        return
+    try:
+        cursor.executemany("INSERT INTO `activity log` (BookCollectionID, Action, Detail) VALUES (%s, %s, %s)",
+                           rows)
+    except pymysql.Error as e:
+        if e.args and e.args[0] == ER_NO_SUCH_TABLE:
+            app_logger.debug(e)
+        else:
+            app_logger.error(e)
+
 
 def sort_list_by_index_list(lst, indexes, reverse=False):
     """
@@ -118,16 +245,16 @@ def sort_list_by_index_list(lst, indexes, reverse=False):
         x[0], reverse=reverse)]
 
 
-def serialized_result_dict(db_result_rows, header=None, error_list=None):
+def serialized_result_dict(db_result_rows, header=None, error_list=None, extra=None):
     """
     Serializes database result rows into JSON.
 
     This function takes the result rows from a database query, optionally a
     header specifying column names, and an optional list of error messages.
-    It first converts the rows into a dictionary representation by delegating
-    to `create_result_dict`.  The resulting dictionary is then encoded as a
-    JSON string using the standard library `json.dumps` function.  The JSON
-    string is returned to the caller.
+    The rows are handed to the configured encoder (`booksdb.serializer.json_dumps`)
+    as they are; its default hook converts Decimal and date values, so no
+    per-cell conversion or per-row copy is made in Python.  The output is the
+    same as that of `_create_serializeable_result_dict` followed by `json.dumps`.
 
     Arguments
     ---------
@@ -140,37 +267,37 @@ def serialized_result_dict(db_result_rows, header=None, error_list=None):
         automatically.
     error_list
         Optional list of error messages to include in the output dictionary.
+    extra
+        Optional mapping of additional top-level keys (e.g. ``next_cursor``)
+        to include in the output dictionary.
 
     Returns
     -------
-    str
-        A JSON formatted string representing the serialized result set.
+    str or bytes
+        A JSON document representing the serialized result set; ``bytes`` when
+        ``BOOKDB_JSON_ENCODER=orjson``.
 
     Raises
     ------
-    ValueError
-        If `create_result_dict` raises a `ValueError` when converting the rows.
     TypeError
-        If `json.dumps` receives an unsupported object type.
+        If a row contains a value the encoder cannot serialize.
 
     Notes
     -----
     The function does not perform any validation of the input beyond what
-    `create_result_dict` and `json.dumps` require.  It is intended for
-    serialization tasks where the output will be transmitted or stored as
-    text.  The caller should ensure that the database rows and header are
-    consistent in length.
+    the encoder requires.  It is intended for serialization tasks where the
+    output will be transmitted or stored as text.  The caller should ensure
+    that the database rows and header are consistent in length.
 
     See Also
     --------
-    create_result_dict
-        Helper function that creates the intermediate dictionary from the rows.
-    json.dumps
-        Standard library function used for JSON encoding.
+    booksdb.serializer.json_dumps
+        Pluggable encoder (standard library ``json`` or ``orjson``).
     """
-    result = _create_serializeable_result_dict(db_result_rows, header, error_list=None)
-    result_dict_json = json.dumps(result)
-    return result_dict_json
+    result = {"header": header, "data": [] if db_result_rows is None else db_result_rows}
+    if extra is not None:
+        result.update(extra)
+    return json_dumps(result)
 
 
 def _convert_db_types(value_list):
@@ -288,6 +415,349 @@ def resp_header(rdata):
     return response_header
 
 
+def stream_resp_header(fmt="ndjson"):
+    """
+    HTTP response headers for a streamed payload from ``stream_serialized_rows``.
+
+    There is no ``Content-Length``; the body is sent with chunked transfer encoding.
+
+    Args:
+        fmt (str): ``"ndjson"`` or ``"json"``.
+
+    Returns:
+        list[tuple[str, str]]: The ``Content-Type`` header for the format.
+    """
+    content_type = 'application/x-ndjson' if fmt == "ndjson" else 'application/json'
+    return [('Content-type', f'{content_type}; charset=utf-8')]
+
+
+def stream_keyset_rows(build_query, row_key, limit=None, batch_rows=None):
+    """
+    Yield the rows of a keyset-ordered query, read in batches of ``batch_rows``.
+
+    Each batch is a buffered query on a pooled connection, which is returned to the
+    pool before the batch is yielded.  A slow reader therefore holds no connection,
+    and no MyISAM table lock, while it consumes the rows; memory stays bounded by
+    one batch.  The next batch starts after the keyset value of the last row, so
+    each row is yielded at most once even if the table changes in between.
+
+    Parameters
+    ----------
+    build_query : callable
+        ``build_query(after, n)`` returns ``(query, params)`` for at most ``n`` rows
+        in keyset order, after the keyset value ``after`` (None for the first batch).
+    row_key : callable
+        ``row_key(row)`` returns the keyset value of a row, passed back as ``after``.
+    limit : int, optional
+        Total number of rows to yield; all if None.
+    batch_rows : int, optional
+        Rows per query; defaults to ``STREAM_BATCH_ROWS``.
+
+    Yields
+    ------
+    tuple
+        One result row.
+
+    Raises
+    ------
+    pymysql.Error
+        Raised to the consumer if a batch query fails; logged here first.
+    """
+    batch_rows = batch_rows or STREAM_BATCH_ROWS
+    after, count = None, 0
+    while limit is None or count < limit:
+        n = batch_rows if limit is None else min(batch_rows, limit - count)
+        search_str, params = build_query(after, n)
+        app_logger.debug(f"{search_str} {params}")
+        with books_pool.connection() as db:
+            c = db.cursor()
+            try:
+                c.execute(search_str, params)
+                rows = c.fetchall()
+            except pymysql.Error as e:
+                app_logger.error(e)
+                raise
+            finally:
+                c.close()
+        yield from rows
+        count += len(rows)
+        if len(rows) < n:
+            return
+        after = row_key(rows[-1])
+
+
+def stream_serialized_rows(rows, header, fmt="ndjson", positions=None, trailer=None, error_list=None):
+    """
+    Serialize rows incrementally as NDJSON or as a chunked JSON document.
+
+    ``ndjson`` writes a ``{"header": [...]}`` line followed by one JSON array per
+    row.  ``json`` writes the same ``{"header": [...], "data": [...]}`` document as
+    ``serialized_result_dict``, a chunk at a time.  A database error raised while
+    iterating ``rows``, or an ``error_list`` known before streaming, is reported in a
+    final ``{"error": [...]}`` line, or as the ``error`` key of the JSON document, as
+    the buffered responses report it with status 200.
+
+    Parameters
+    ----------
+    rows : iterable of tuple
+        Result rows, typically from ``stream_keyset_rows``; ignored if ``error_list``
+        is given.
+    header : list
+        Column names of the serialized rows.
+    fmt : str, optional
+        ``"ndjson"`` (default) or ``"json"``.
+    positions : list of int, optional
+        Column positions to keep (see ``search_field_positions``); all if None.
+    trailer : callable, optional
+        Called as ``trailer(last_row, row_count)`` with the last unprojected row
+        (or None) after the rows are written; the returned dict is added to the
+        output (e.g. ``next_cursor``).
+    error_list : list, optional
+        Errors of a request that could not be run; no rows are written.
+
+    Yields
+    ------
+    str
+        Chunks of the serialized payload of up to ``STREAM_CHUNK_ROWS`` rows.
+    """
+    ndjson = fmt == "ndjson"
+    extra = {}
+    if error_list:
+        rows, extra["error"] = (), list(error_list)
+    if ndjson:
+        yield json_text({"header": header}) + "\n"
+    else:
+        yield '{"header": ' + json_text(header) + ', "data": ['
+    chunk, count, last_row = [], 0, None
+    try:
+        for row in rows:
+            last_row = row
+            if positions is not None:
+                row = [row[i] for i in positions]
+            line = json_text(row)
+            if ndjson:
+                chunk.append(line + "\n")
+            else:
+                chunk.append(line if count == 0 else ", " + line)
+            count += 1
+            if len(chunk) >= STREAM_CHUNK_ROWS:
+                yield "".join(chunk)
+                chunk = []
+        if trailer is not None:
+            extra.update(trailer(last_row, count))
+    except pymysql.Error as e:
+        extra["error"] = [str(e)]
+    yield "".join(chunk)
+    if ndjson:
+        for key, value in extra.items():
+            yield json_text({key: value}) + "\n"
+    else:
+        yield "]" + "".join(f", {json_text(key)}: {json_text(value)}" for key, value in extra.items()) + "}"
+
+
+##########################################################################
+# CHANGE FEED
+##########################################################################
+
+# Tables of the /changes feed, in the order they are streamed: (name, header, query,
+# keyset).  Tables with a LastUpdate column take the (since, until] timestamp window;
+# `images` and `complete date estimates` have none and take the (since, until] id
+# window, and estimates also any row whose EstimateDate (rewritten by /record_set) is
+# in the timestamp window.  Each table is read in batches ordered by its keyset.
+CHANGE_FEED_TABLES = (
+    ("book collection",
+     ["BookCollectionID", "Title", "Author", "CopyrightDate", "ISBNNumber", "ISBNNumber13", "PublisherName",
+      "CoverType", "Pages", "Category", "Location", "Note", "Recycled", "LastUpdate"],
+     "SELECT BookCollectionID, Title, Author, CopyrightDate, ISBNNumber, ISBNNumber13, PublisherName, "
+     "CoverType, Pages, Category, Location, Note, Recycled, LastUpdate FROM `book collection` "
+     "WHERE LastUpdate > %(t_since)s AND LastUpdate <= %(t_until)s",
+     ["LastUpdate", "BookCollectionID"]),
+    ("books read",
+     ["BookCollectionID", "ReadDate", "ReadNote", "LastUpdate"],
+     "SELECT BookCollectionID, ReadDate, ReadNote, LastUpdate FROM `books read` "
+     "WHERE LastUpdate > %(t_since)s AND LastUpdate <= %(t_until)s",
+     ["LastUpdate", "BookCollectionID", "ReadDate"]),
+    ("books tags",
+     ["BookID", "TagID", "Label", "LastUpdate"],
+     "SELECT a.BookID, a.TagID, b.Label, a.LastUpdate FROM `books tags` a LEFT JOIN `tag labels` b "
+     "ON a.TagID = b.TagID WHERE a.LastUpdate > %(t_since)s AND a.LastUpdate <= %(t_until)s",
+     ["a.LastUpdate", "a.BookID", "a.TagID"]),
+    ("images",
+     ["id", "BookCollectionID", "name", "url", "type"],
+     "SELECT id, BookCollectionID, name, url, type FROM `images` "
+     "WHERE id > %(images_since)s AND id <= %(images_until)s",
+     ["id"]),
+    ("complete date estimates",
+     ["RecordID", "BookCollectionID", "StartDate", "LastReadablePage", "EstimateDate", "EstimatedFinishDate"],
+     "SELECT RecordID, BookCollectionID, StartDate, LastReadablePage, EstimateDate, EstimatedFinishDate "
+     "FROM `complete date estimates` WHERE RecordID <= %(estimates_until)s AND (RecordID > %(estimates_since)s "
+     "OR (EstimateDate > %(t_since)s AND EstimateDate <= %(t_until)s))",
+     ["RecordID"]),
+    ("daily page records",
+     ["RecordID", "RecordDate", "page", "LastUpdate"],
+     "SELECT RecordID, RecordDate, page, LastUpdate FROM `daily page records` "
+     "WHERE LastUpdate > %(t_since)s AND LastUpdate <= %(t_until)s",
+     ["LastUpdate", "RecordID", "RecordDate"]),
+)
+
+# The upper bound lags the database clock by a second: LastUpdate has one-second
+# resolution, so rows changed later in the current second go into the next window.
+CHANGE_FEED_SNAPSHOT = ("SELECT NOW() - INTERVAL 1 SECOND, "
+                        "(SELECT COALESCE(MAX(id), 0) FROM `images`), "
+                        "(SELECT COALESCE(MAX(RecordID), 0) FROM `complete date estimates`)")
+
+# LastUpdate and auto-increment ids are assigned when a statement runs, not when its
+# transaction commits, so a row committed after a snapshot can fall inside a window
+# already delivered.  Each window therefore starts this far below the token's
+# position; the rows of the overlap are sent again and clients apply rows as upserts
+# keyed by primary key.
+CHANGE_FEED_OVERLAP_SECONDS = 60
+CHANGE_FEED_OVERLAP_IDS = 20
+
+# state of a feed that has never been read; every row is newer than this
+CHANGE_FEED_START = {"t": "1970-01-01 00:00:00", "images": 0, "estimates": 0}
+
+
+def encode_change_token(state):
+    """
+    Opaque ``/changes`` token for a feed position.
+
+    Parameters
+    ----------
+    state : dict
+        ``{"t": "YYYY-MM-DD HH:MM:SS", "images": int, "estimates": int}``, the
+        upper bounds of the windows already delivered.
+
+    Returns
+    -------
+    str
+        URL-safe base64 encoded JSON.
+    """
+    return base64.urlsafe_b64encode(json.dumps(state).encode("utf-8")).decode("ascii")
+
+
+def decode_change_token(since):
+    """
+    Feed position of a ``since`` argument.
+
+    Parameters
+    ----------
+    since : str or None
+        A token from ``encode_change_token``, or a date/datetime in ISO format
+        (``2024-05-01`` or ``2024-05-01 18:30:00``).  A date only covers tables
+        with a ``LastUpdate`` column; `images` and `complete date estimates` are
+        then sent in full.  None (or empty) starts from the beginning.
+
+    Returns
+    -------
+    dict
+        The position, as for ``encode_change_token``.
+
+    Raises
+    ------
+    ValueError
+        If ``since`` is neither a valid token nor a date.
+    """
+    if not since:
+        return dict(CHANGE_FEED_START)
+    try:
+        return dict(CHANGE_FEED_START, t=datetime.datetime.fromisoformat(since).strftime("%Y-%m-%d %H:%M:%S"))
+    except ValueError:
+        pass
+    try:
+        state = json.loads(base64.urlsafe_b64decode(since.encode("ascii")))
+        datetime.datetime.strptime(state["t"], "%Y-%m-%d %H:%M:%S")
+        return {"t": state["t"], "images": int(state["images"]), "estimates": int(state["estimates"])}
+    except (ValueError, TypeError, KeyError, UnicodeError) as e:
+        raise ValueError(f"Invalid change token: {since}") from e
+
+
+def change_feed_snapshot():
+    """
+    Current feed position: the upper bounds of the next ``/changes`` windows.
+
+    Returns
+    -------
+    tuple
+        ``(state, error_list)``; ``state`` is None if the query failed.
+    """
+    state, error_list = None, None
+    try:
+        with books_pool.connection() as db, db.cursor() as c:
+            c.execute(CHANGE_FEED_SNAPSHOT)
+            until, images, estimates = c.fetchall()[0]
+            state = {"t": until.strftime("%Y-%m-%d %H:%M:%S"), "images": int(images), "estimates": int(estimates)}
+    except pymysql.Error as e:
+        app_logger.error(e)
+        error_list = [str(e)]
+    return state, error_list
+
+
+def _change_feed_query(query, keyset, params, after, n):
+    """``(query, params)`` of one ``stream_keyset_rows`` batch of a ``CHANGE_FEED_TABLES`` query."""
+    params = dict(params, n=n)
+    columns = ", ".join(keyset)
+    if after is not None:
+        query += f" AND ({columns}) > ({', '.join(f'%(k{i})s' for i in range(len(keyset)))})"
+        params.update((f"k{i}", value) for i, value in enumerate(after))
+    return query + f" ORDER BY {columns} LIMIT %(n)s", params
+
+
+def stream_change_feed(since_state, until_state):
+    """
+    Serialize the rows changed between two feed positions as NDJSON.
+
+    For each table of ``CHANGE_FEED_TABLES`` a ``{"table": ..., "header": [...]}``
+    line is followed by one JSON array per changed row, read in keyset batches by
+    ``stream_keyset_rows``, so no connection is held while the client reads.  The
+    windows start ``CHANGE_FEED_OVERLAP_SECONDS`` and ``CHANGE_FEED_OVERLAP_IDS``
+    below ``since_state``, so rows of the previous call may be sent again.  The last
+    line is ``{"next_token": ..., "counts": {...}}``; passing ``next_token`` as
+    ``since`` resumes after ``until_state``.  If a query fails the stream ends with
+    an ``{"error": [...]}`` line and no token, so the client retries from its
+    previous token.
+
+    Parameters
+    ----------
+    since_state, until_state : dict
+        Feed positions from ``decode_change_token`` and ``change_feed_snapshot``.
+
+    Yields
+    ------
+    str
+        Chunks of up to ``STREAM_CHUNK_ROWS`` lines.
+    """
+    t_since = datetime.datetime.strptime(since_state["t"], "%Y-%m-%d %H:%M:%S")
+    t_since = max(t_since - datetime.timedelta(seconds=CHANGE_FEED_OVERLAP_SECONDS),
+                  datetime.datetime.strptime(CHANGE_FEED_START["t"], "%Y-%m-%d %H:%M:%S"))
+    params = {"t_since": t_since.strftime("%Y-%m-%d %H:%M:%S"), "t_until": until_state["t"],
+              "images_since": max(since_state["images"] - CHANGE_FEED_OVERLAP_IDS, 0),
+              "images_until": until_state["images"],
+              "estimates_since": max(since_state["estimates"] - CHANGE_FEED_OVERLAP_IDS, 0),
+              "estimates_until": until_state["estimates"]}
+    counts = {}
+    try:
+        for table, header, query, keyset in CHANGE_FEED_TABLES:
+            yield json_text({"table": table, "header": header}) + "\n"
+            positions = [header.index(column.split(".")[-1]) for column in keyset]
+            rows = stream_keyset_rows(
+                lambda after, n, query=query, keyset=keyset: _change_feed_query(query, keyset, params, after, n),
+                lambda row, positions=positions: [row[i] for i in positions])
+            chunk, count = [], 0
+            for row in rows:
+                chunk.append(json_text(row) + "\n")
+                count += 1
+                if len(chunk) >= STREAM_CHUNK_ROWS:
+                    yield "".join(chunk)
+                    chunk = []
+            yield "".join(chunk)
+            counts[table] = count
+    except pymysql.Error as e:
+        yield json_text({"error": [str(e)]}) + "\n"
+        return
+    yield json_text({"next_token": encode_change_token(until_state), "counts": counts}) + "\n"
+
+
 ##########################################################################
 # BASIC API UTILITIES
 #    Return: data_rowe, raw_data, header, error_str_list
@@ -320,7 +790,7 @@ def get_valid_locations():
     db = None
     error_list = None
     try:
-        db = pymysql.connect(**books_conf)
+        db = books_pool.connection()
         cursor = db.cursor()
 
         # Execute the query
@@ -343,14 +813,62 @@ def get_valid_locations():
     return sorted_locations_list, locations, ["Location"], error_list
 
 
+# activity log rows read per distinct book requested; widened if books repeat
+RECENT_SCAN_FACTOR = 8
+
+
+def _recent_from_activity_log(cursor, limit):
+    """
+    Latest ``limit`` distinct books of `activity log` as a {BookCollectionID: time} dict.
+
+    Reads the newest events through ``ActivityTime_idx``, widening the window until
+    it holds ``limit`` distinct books or the log is exhausted.  The dict is empty if
+    the table is missing or empty.
+    """
+    scan = limit * RECENT_SCAN_FACTOR
+    latest = {}
+    while True:
+        try:
+            cursor.execute("SELECT BookCollectionID, ActivityTime FROM `activity log` "
+                           "ORDER BY ActivityTime DESC, ActivityID DESC LIMIT %s", (scan,))
+        except pymysql.Error as e:
+            if e.args and e.args[0] == ER_NO_SUCH_TABLE:
+                return {}
+            raise
+        events = cursor.fetchall()
+        latest = {}
+        for book_id, activity_time in events:
+            latest.setdefault(book_id, activity_time)
+        if len(latest) >= limit or len(events) < scan:
+            return latest
+        scan *= 4
+
+
+def _recent_books(cursor, limit):
+    """
+    Latest ``limit`` distinct books of `activity log` as (id, time, title) rows, newest
+    first, with the titles looked up by primary key.
+    """
+    latest = _recent_from_activity_log(cursor, limit)
+    book_ids = list(latest)[:limit]
+    if not book_ids:
+        return ()
+    cursor.execute("SELECT BookCollectionID, Title FROM `book collection` "
+                   f"WHERE BookCollectionID IN ({_in_list_placeholders(book_ids)})", book_ids)
+    titles = dict(cursor.fetchall())
+    return tuple((book_id, latest[book_id], titles[book_id]) for book_id in book_ids if book_id in titles)
+
+
 def get_recently_touched(limit=10):
     """
     Retrieve a list of recently touched book collections.
 
-    This function queries the database to find the most recently updated
-    book collections, combining data from several tables.  It returns the
-    results together with the raw database rows, a header describing the
-    columns, and any error messages that occurred during execution.
+    The books are read from the `activity log` table, newest first, which the
+    mutating routes append to: one top-n read of ``ActivityTime_idx``.  Changes made
+    through the legacy PHP pages are not logged and do not appear.  It returns
+    the results together with the raw database rows,
+    a header describing the columns, and any error messages that occurred
+    during execution.
 
     Parameters
     ----------
@@ -368,8 +886,8 @@ def get_recently_touched(limit=10):
           to the global ``FMT`` constant; titles longer than 43 characters
           are truncated to 40 characters followed by ellipsis.
 
-        * s (tuple): The raw rows returned by the cursor's ``fetchall``.
-          Each row is a tuple of the original column values.
+        * s (tuple): The raw ``(BookCollectionID, LastUpdate, Title)`` rows,
+          with the original column values.
 
         * header (list[str]): A list of column names used for the result
           set: ``["BookCollectionID", "LastUpdate", "Title"]``.
@@ -386,36 +904,15 @@ def get_recently_touched(limit=10):
     recent_books = []
     header = ["BookCollectionID", "LastUpdate", "Title"]
     s = None
+    limit = int(limit)
 
     try:
-        db = pymysql.connect(**books_conf)
+        db = books_pool.connection()
         cursor = db.cursor()
 
-        # Execute the query - removed duplicate UNION of book collection table
-        query = ('SELECT abc.BookCollectionID, max(abc.LastUpdate) as LastUpdate, bc.Title FROM\n'
-                 '(       SELECT BookCollectionID, LastUpdate \n'
-                 '        FROM `book collection`\n'
-                 '        UNION \n'
-                 '        SELECT BookID as BookCollectionID, LastUpdate\n'
-                 '        FROM `books tags`\n'
-                 '        UNION\n'
-                 '        SELECT a.BookCollectionID, b.LastUpdate\n'
-                 '        FROM `complete date estimates` a JOIN `daily page records` b ON\n'
-                 '        a.RecordID = b.RecordID\n'
-                 '        UNION \n'
-                 '        SELECT BookCollectionID, EstimateDate as LastUpdate\n'
-                 '        FROM `complete date estimates`) abc\n'
-                 '        UNION \n'
-                 '        SELECT BookCollectionID, LastUpdate\n'
-                 '        FROM `images`\n'
-                 'JOIN `book collection` bc ON abc.BookCollectionID = bc.BookCollectionID \n'
-                 'GROUP BY abc.BookCollectionID, bc.Title\n'
-                 'ORDER BY LastUpdate DESC LIMIT %s;\n')
-        app_logger.debug(query)
-        cursor.execute(query, (limit,))
+        s = _recent_books(cursor, limit)
 
-        # Fetch and process the results
-        s = cursor.fetchall()
+        # Process the results
         for a, b, c in s:
             _date = b.strftime(FMT) if b else None
             _title = c if len(c) <= 43 else c[:40] + "..."
@@ -442,11 +939,11 @@ def get_next_book_id(current_book_id, direction=1):
     Gets the next book collection ID in the database.
 
     Summary:
-        Retrieves the next BookCollectionID from the `book collection` table in
-        the MySQL database. The function uses the current ID and a direction
-        flag to determine whether to look forward or backward. When the search
-        reaches the end of the table it wraps around to the first or last
-        entry, depending on the direction.
+        Looks up the neighbouring BookCollectionID in the cached, sorted id index
+        (``book_id_index``) rather than querying the `book collection` table. The
+        function uses the current ID and a direction flag to determine whether to
+        look forward or backward. When the search reaches the end of the collection
+        it wraps around to the first or last entry, depending on the direction.
 
     Parameters:
         current_book_id (int): The current book collection identifier.
@@ -455,61 +952,22 @@ def get_next_book_id(current_book_id, direction=1):
             Defaults to 1.
 
     Returns:
-        int or None: The next book collection ID, or None if a database
-        error occurs.
-
-    Raises:
-        pymysql.Error: If an error occurs during the database query.
-    """
-    db = pymysql.connect(**books_conf)
-    order = "ASC" if direction > 0 else "DESC"
-    ineq = ">" if direction > 0 else "<"
-    query_str = ("SELECT a.BookCollectionID "
-                 "FROM `book collection` as a "
-                 f"WHERE a.BookCollectionID {ineq} {current_book_id} "
-                 f"ORDER BY a.BookCollectionID {order} "
-                 "LIMIT 1;")
-    app_logger.debug(query_str)
-    next_book_id = None
-    c = db.cursor()
-    try:
-        c.execute(query_str)
-    except pymysql.Error as e:
-        app_logger.error(e)
-        return next_book_id
-    else:
-        s = c.fetchall()
-        # If no results, wrap around
-        if len(s) == 0:
-            if direction > 0:
-                # get the first record
-                next_book_id = 2
-            else:
-                query_str = ("SELECT max(a.BookCollectionID) "
-                             "FROM `book collection` as a; ")
-                c = db.cursor()
-                try:
-                    c.execute(query_str)
-                except pymysql.Error as e:
-                    app_logger.error(e)
-                else:
-                    s = c.fetchall()
-                    next_book_id = s[0][0]
-        else:
-            next_book_id = s[0][0]
-        return next_book_id
+        int or None: The next book collection ID, or None if the id index could
+        not be loaded from the database.
+    """
+    return book_id_index.next_id(int(current_book_id), direction)
 
 
 def get_book_ids_in_window(book_id, window):
     """
     Get a list of book IDs within a given window around a specific book ID.
 
-    This function connects to a MySQL database and retrieves a contiguous block of
-    book IDs that surrounds the supplied `book_id`. The window is divided into a
-    top and bottom half.  If the requested range extends beyond the existing
-    records, the function wraps around to the beginning or end of the collection
-    to fill the deficit, ensuring the returned list has exactly `window`
-    entries.
+    The IDs come from the cached, sorted id index (``book_id_index``), so no query
+    is issued unless the index needs refreshing.  The window is divided into a
+    bottom half (IDs up to and including `book_id`) and a top half (IDs after it).
+    If the requested range extends beyond the existing records, the window wraps
+    around to the beginning or end of the collection to fill the deficit,
+    ensuring the returned list has exactly `window` entries.
 
     Parameters
     ----------
@@ -525,192 +983,371 @@ def get_book_ids_in_window(book_id, window):
         A list of book IDs ordered such that the supplied `book_id` is
         positioned near the center of the list.  The list length is equal to
         `window`.  If the underlying collection contains fewer records
-        than requested, duplicates are inserted to satisfy the size.
-
-    Raises
-    ------
-    pymysql.Error
-        If a database query fails, the exception is logged but not
-        propagated; the function continues with whatever results were
-        retrieved so far.
+        than requested, duplicates are inserted to satisfy the size.  The
+        list is empty if the id index could not be loaded.
     """
-    db = pymysql.connect(**books_conf)
     app_logger.debug(f"Getting book ID window for book ID {book_id} with window {window}")
-    top_half_window = int((window + 1) / 2)
-    bottom_half_window = window - top_half_window
-
-    query_str = ("SELECT a.BookCollectionID "
-                 "FROM `book collection` as a "
-                 "WHERE a.BookCollectionID {ineq} {book_id} "
-                 "ORDER BY a.BookCollectionID {order} "
-                 "LIMIT {limit};")
-    # get the bottom half first - window leading up to book_id
-    q = query_str.format(ineq="<=", book_id=book_id, order="DESC", limit=bottom_half_window)
-    app_logger.debug(q)
-    c = db.cursor()
-    book_id_list = []
-    try:
-        c.execute(q)
-    except pymysql.Error as e:
-        app_logger.error(e)
-    else:
-        s = c.fetchall()
-        for row in s:
-            book_id_list.append(row[0])
-        book_id_list.reverse()
-    if len(book_id_list) < bottom_half_window:
-        # Make a ring of ideas - get some from the end of book records
-        deficit = bottom_half_window - len(book_id_list)
-        q = query_str.format(ineq=">", book_id=book_id, order="DESC", limit=deficit)
-        app_logger.debug(q)
-        try:
-            c.execute(q)
-        except pymysql.Error as e:
-            app_logger.error(e)
-        else:
-            s = c.fetchall()
-            for row in s:
-                book_id_list.insert(0, row[0])
-    # now get the top half - window after book_id
-    q = query_str.format(ineq=">", book_id=book_id, order="ASC", limit=top_half_window)
-    app_logger.debug(q)
-    try:
-        c.execute(q)
-    except pymysql.Error as e:
-        app_logger.error(e)
-    else:
-        s = c.fetchall()
-        for row in s:
-            book_id_list.append(row[0])
-    if len(book_id_list) < window:
-        # Make a ring of ideas - get some from the start of book records
-        deficit = window - len(book_id_list)
-        q = query_str.format(ineq="<=", book_id=book_id, order="ASC", limit=deficit)
-        app_logger.debug(q)
-        try:
-            c.execute(q)
-        except pymysql.Error as e:
-            app_logger.error(e)
-        else:
-            s = c.fetchall()
-            for row in s:
-                book_id_list.append(row[0])
-    return book_id_list
+    return book_id_index.window(int(book_id), int(window))
 
 
-def get_complete_book_record(book_id):
-    # process any query parameters
-    db = pymysql.connect(**books_conf)
-    q_book = ("SELECT a.BookCollectionID, a.Title, a.Author, a.CopyrightDate, "
-              "a.ISBNNumber, a.PublisherName, a.CoverType, a.Pages, "
-              "a.Category, a.Note, a.Recycled, a.Location, a.ISBNNumber13 "
-              "FROM `book collection` as a "
-              f"WHERE a.BookCollectionID = {book_id};")
+def _in_list_placeholders(values):
+    """Return a ``%s, %s, ...`` placeholder string for a parameterized ``IN (...)`` clause."""
+    return ", ".join(["%s"] * len(values))
+
+
+def get_complete_book_records(book_ids):
+    """
+    Retrieve complete records (book, reads, tags and cover image) for a list of books.
+
+    All books are loaded with one ``IN (...)`` query per table on a single pooled
+    connection, so a window of N books costs four round trips instead of 4 * N
+    queries and N connections.
+
+    Parameters
+    ----------
+    book_ids : list
+        BookCollectionIDs (int or numeric str).  Order and duplicates are preserved
+        in the result.
+
+    Returns
+    -------
+    list[dict]
+        One record per requested ID, in request order, each with the same shape as
+        ``get_complete_book_record``::
+
+            {"book": {"header": [...], "data": [[...]]},
+             "reads": {"header": ["DateRead", "ReadNote"], "data": [[...], ...]},
+             "tags": {"header": ["Tag"], "data": [[tag, ...]]},
+             "img": {"header": ["ImageURL"], "data": [[url, ...]]},
+             "error": ["error string"]}   # only present if a query failed
+
+        A section is ``None`` if its query failed.
+    """
     h_book = table_header
-    q_read = ("SELECT b.ReadDate, b.ReadNote "
-              "FROM `books read` as b "
-              f"WHERE b.BookCollectionID = {book_id};")
     h_read = ["DateRead", "ReadNote"]
-    q_tags = ("SELECT b.Label "
-              "FROM `books tags` as a JOIN `tag labels` as b "
-              "ON b.TagID = a.TagID "
-              f"WHERE a.BookID = {book_id};")
     h_tags = ["Tag"]
-    q_img = ("SELECT a.url "
-             "FROM `images` as a "
-             f"WHERE a.BookCollectionID = {book_id} "
-             "AND a.type = \"cover-face\"; ")
     h_img = ["ImageURL"]
-    app_logger.debug(q_book)
-    app_logger.debug(q_read)
-    app_logger.debug(q_tags)
-    app_logger.debug(q_img)
 
-    result_data = {"book": None, "reads": None, "tags": None, "img": None, "error": []}
-    c = db.cursor()
-    try:
-        c.execute(q_book)
-    except pymysql.Error as e:
-        app_logger.error(e)
-        result_data["error"].append(str(e))
-    else:
-        s = c.fetchall()
-        result_data["book"] = _create_serializeable_result_dict(s, h_book)
-    try:
-        c.execute(q_read)
-    except pymysql.Error as e:
-        app_logger.error(e)
-        result_data["error"].append(str(e))
-    else:
-        s = c.fetchall()
-        result_data["reads"] = _create_serializeable_result_dict(s, h_read)
-    try:
-        c.execute(q_tags)
-    except pymysql.Error as e:
-        app_logger.error(e)
-        result_data["error"].append(str(e))
-    else:
-        s = c.fetchall()
-        result_data["tags"] = _create_serializeable_result_dict([[x[0] for x in s]], h_tags)
-    try:
-        c.execute(q_img)
-    except pymysql.Error as e:
-        app_logger.error(e)
-        result_data["error"].append(str(e))
-    else:
-        s = c.fetchall()
-        result_data["img"] = _create_serializeable_result_dict([[x[0] for x in s]], h_img)
+    book_ids = list(book_ids)
+    errors = []
+    ids = []
+    for book_id in book_ids:
+        try:
+            ids.append(int(book_id))
+        except (TypeError, ValueError):
+            app_logger.error(f"Invalid BookCollectionID: {book_id}")
+            ids.append(None)
+    unique_ids = list(dict.fromkeys(x for x in ids if x is not None))
+
+    books, reads, tags, imgs = {}, {}, {}, {}
+    failed = set()
+    if unique_ids:
+        q_book = queries.in_list(queries.BOOKS_BY_ID, unique_ids)
+        q_read = queries.in_list(queries.READS_BY_BOOK_IDS, unique_ids)
+        q_tags = queries.in_list(queries.TAGS_BY_BOOK_IDS, unique_ids)
+        q_img = queries.in_list(queries.COVERS_BY_BOOK_IDS, unique_ids)
+        str_ids = [str(x) for x in unique_ids]
+        lookups = [
+            ("book", q_book, unique_ids, books, lambda row: row),
+            ("reads", q_read, unique_ids, reads, lambda row: row[1:]),
+            ("tags", q_tags, str_ids, tags, lambda row: row[1]),
+            ("img", q_img, unique_ids, imgs, lambda row: row[1]),
+        ]
+        with books_pool.connection() as db:
+            c = db.cursor()
+            for section, query, params, grouped, value in lookups:
+                app_logger.debug(query)
+                try:
+                    c.execute(query, params)
+                except pymysql.Error as e:
+                    app_logger.error(e)
+                    errors.append(str(e))
+                    failed.add(section)
+                else:
+                    for row in c.fetchall():
+                        grouped.setdefault(int(row[0]), []).append(value(row))
+
+    result_list = []
+    for book_id, requested_id in zip(ids, book_ids):
+        result_data = {"book": None, "reads": None, "tags": None, "img": None, "error": list(errors)}
+        if book_id is None:
+            result_data["error"].append(f"Invalid BookCollectionID: {requested_id}")
+        else:
+            if "book" not in failed:
+                result_data["book"] = _create_serializeable_result_dict(books.get(book_id, []), h_book)
+            if "reads" not in failed:
+                result_data["reads"] = _create_serializeable_result_dict(reads.get(book_id, []), h_read)
+            if "tags" not in failed:
+                result_data["tags"] = _create_serializeable_result_dict([tags.get(book_id, [])], h_tags)
+            if "img" not in failed:
+                result_data["img"] = _create_serializeable_result_dict([imgs.get(book_id, [])], h_img)
+        if len(result_data["error"]) == 0:
+            del result_data["error"]
+        result_list.append(result_data)
+    return result_list
 
-    if len(result_data["error"]) == 0:
-        del result_data["error"]
-    return result_data
 
+def get_complete_book_record(book_id):
+    """
+    Retrieve the complete record (book, reads, tags and cover image) for one book.
 
-##########################################################################
-# UPDATE BOOKS
-##########################################################################
+    Parameters
+    ----------
+    book_id : int or str
+        The BookCollectionID of the book.
 
-def update_book_record_by_key(update_dict):
+    Returns
+    -------
+    dict
+        See ``get_complete_book_records`` for the record shape.
     """
-    Updates a book record in the database using the provided dictionary of record
-    values and the corresponding `BookCollectionID`. Key-value pairs in the record
-    represent the columns to update and their new values. If an error occurs while
-    executing the SQL operation, an error dictionary will be returned.
+    return get_complete_book_records([book_id])[0]
 
-    :param update_dict: A dictionary containing the record information for the book to
-        be updated. The keys represent the column names, and the values represent
-        the new data to be inserted for those columns.
-    :type update_dict: dict
-    :return: A list containing the result of the update operation. If successful,
-        the `record` dictionary is returned; otherwise, an error dictionary is
-        returned.
-    :rtype: list
+
+def books_by_isbn_utility(isbn_values):
     """
-    db = pymysql.connect(**books_conf)
-    search_str = "UPDATE `book collection` SET "
-    continuation = False
-    for key in update_dict:
-        if key == "BookCollectionID":
-            BookCollectionID = update_dict[key]
-            continue
-        if continuation:
-            search_str += ", "
-        else:
-            continuation = True
-            search_str += f" {key} = \"{update_dict[key]}\""
-    search_str += f" WHERE BookCollectionID = {BookCollectionID} "
-    app_logger.debug(search_str)
+    Books of the collection whose ISBN-10 or ISBN-13 is one of ``isbn_values``.
+
+    Values are compared exactly, so pass every form of an ISBN that may be stored
+    (with and without hyphens, ISBN-10 and ISBN-13).
+
+    Parameters
+    ----------
+    isbn_values : iterable of str
+        ISBNs to match.
+
+    Returns
+    -------
+    tuple
+        ``(rows, header, error_list)``: the matching rows in ``table_header`` order,
+        oldest book first, and ``None`` or a list of error strings.
+    """
+    values = list(dict.fromkeys(str(value) for value in isbn_values if value))
+    if not values:
+        return [], table_header, None
+    error_list = None
+    rows = []
+    with books_pool.connection() as db:
+        c = db.cursor()
+        try:
+            c.execute(queries.in_list(queries.BOOKS_BY_ISBN, values), values + values)
+        except pymysql.Error as e:
+            app_logger.error(e)
+            error_list = [str(e)]
+        else:
+            rows = c.fetchall()
+    return rows, table_header, error_list
+
+
+##########################################################################
+# ADD BOOKS
+##########################################################################
+
+# columns written by add_books_utility, with their varchar widths (None: not a string)
+ADD_BOOKS_COLUMNS = {"Title": 200, "Author": 200, "CopyrightDate": None, "ISBNNumber": 13, "ISBNNumber13": 13,
+                     "PublisherName": 50, "CoverType": 30, "Pages": None, "Location": 50, "Note": None,
+                     "Recycled": None}
+ADD_BOOKS_REQUIRED = ("Title", "Author", "Location")
+ADD_BOOKS_INSERT = f"INSERT INTO `book collection` ({', '.join(ADD_BOOKS_COLUMNS)}) VALUES "
+ADD_BOOKS_ROW = f"({', '.join(['%s'] * len(ADD_BOOKS_COLUMNS))})"
+
+# books per multi-row INSERT statement
+ADD_BOOKS_CHUNK = int(os.getenv("BOOKDB_ADD_BOOKS_CHUNK", 500))
+
+
+def _add_book_params(record):
+    """
+    INSERT parameters of an /add_books record, in ``ADD_BOOKS_COLUMNS`` order.
+
+    Blank optional values become NULL, a bare copyright year becomes January 1st of
+    that year, and ``Recycled`` defaults to 0.  Raises ``ValueError`` describing the
+    first problem that would make the row fail in MySQL.
+    """
+    missing = [key for key in ADD_BOOKS_REQUIRED if not str(record.get(key) or "").strip()]
+    if missing:
+        raise ValueError(f"Missing required field(s): {', '.join(missing)}")
+    params = []
+    for key, width in ADD_BOOKS_COLUMNS.items():
+        value = record.get(key)
+        if isinstance(value, str) and key != "Note" and not value.strip():
+            value = None
+        if value is not None:
+            if key == "CopyrightDate":
+                value = value.strip()
+                if len(value) == 4:
+                    value += "-01-01 00:00:00"  # make it a valid date string!
+                datetime.datetime.fromisoformat(value)
+            elif key in ("Pages", "Recycled"):
+                try:
+                    value = int(value)
+                except ValueError:
+                    raise ValueError(f"{key} must be an integer, not {value!r}")
+            elif width is not None and len(str(value)) > width:
+                raise ValueError(f"{key} is longer than {width} characters")
+        elif key == "Recycled":
+            value = 0
+        params.append(value)
+    return params
+
+
+# columns identifying the rows of a failed chunk that were stored anyway
+ADD_BOOKS_MATCH = ("Title", "Author", "Location")
+_ADD_BOOKS_MATCH_POSITIONS = [list(ADD_BOOKS_COLUMNS).index(key) for key in ADD_BOOKS_MATCH]
+
+
+def _stored_chunk_prefix(cursor, chunk, max_id_before):
+    """
+    Ids of the leading rows of ``chunk`` that a failed multi-row INSERT stored.
+
+    `book collection` is MyISAM: a statement failing on row k keeps rows 1..k-1, and
+    ``LAST_INSERT_ID()`` is undefined after the error.  The table is locked for the
+    statement, so the stored rows are consecutive; they are found as the longest run
+    of rows after ``max_id_before`` matching the chunk from its start.
+    """
+    cursor.execute("SELECT BookCollectionID, " + ", ".join(ADD_BOOKS_MATCH) + " FROM `book collection` "
+                   "WHERE BookCollectionID > %s ORDER BY BookCollectionID", (max_id_before,))
+    rows = cursor.fetchall()
+    keys = [tuple(params[n] for n in _ADD_BOOKS_MATCH_POSITIONS) for _, params in chunk]
+    best = []
+    for start in range(len(rows)):
+        run = []
+        while (len(run) < len(keys) and start + len(run) < len(rows)
+               and tuple(rows[start + len(run)][1:]) == keys[len(run)]):
+            run.append(rows[start + len(run)][0])
+        if len(run) > len(best):
+            best = run
+    return best
+
+
+def add_books_utility(records, chunk_size=None):
+    """
+    Insert books into `book collection` with one multi-row INSERT per chunk.
+
+    Each record is validated first; an invalid record gets an error entry and the
+    rest of the batch goes ahead.  The valid records are inserted ``chunk_size`` rows
+    per statement.  A multi-row INSERT assigns consecutive ids starting at
+    ``LAST_INSERT_ID()`` (the table is MyISAM, which locks it for the statement), so
+    the ids are derived from the cursor's ``lastrowid`` and
+    ``@@auto_increment_increment`` rather than read back row by row.
+
+    MyISAM has no transactions: a chunk failing on one row keeps the rows before it.
+    Those rows are found with ``_stored_chunk_prefix`` and reported with their ids,
+    and the rest of the chunk is inserted one row at a time, so every record gets
+    its own id or its own error and a client can safely retry only the failed ones.
+
+    Parameters
+    ----------
+    records : list of dict
+        Book records keyed by ``ADD_BOOKS_COLUMNS``; ``Title``, ``Author`` and
+        ``Location`` are required.
+    chunk_size : int, optional
+        Rows per INSERT statement.  Defaults to ``BOOKDB_ADD_BOOKS_CHUNK`` or 500.
+
+    Returns
+    -------
+    list
+        One entry per record, in order: the record with its new ``BookCollectionID``,
+        or ``{"error": str}``.
+    """
+    chunk_size = max(1, int(chunk_size or ADD_BOOKS_CHUNK))
+    results = [None] * len(records)
+    valid = []
+    for i, record in enumerate(records):
+        try:
+            valid.append((i, _add_book_params(record)))
+        except (ValueError, TypeError, AttributeError) as e:
+            results[i] = {"error": f"Record {i}: {e}"}
+    if valid:
+        db = books_pool.connection()
+        with db:
+            with db.cursor() as c:
+                c.execute("SELECT @@auto_increment_increment")
+                step = c.fetchall()[0][0]
+                for start in range(0, len(valid), chunk_size):
+                    chunk = valid[start:start + chunk_size]
+                    try:
+                        c.execute("SELECT IFNULL(MAX(BookCollectionID), 0) FROM `book collection`")
+                        max_id_before = c.fetchall()[0][0]
+                    except pymysql.Error as e:
+                        app_logger.error(e)
+                        for i, _ in chunk:
+                            results[i] = {"error": f"Record {i}: {e}"}
+                        continue
+                    try:
+                        c.execute(ADD_BOOKS_INSERT + ", ".join([ADD_BOOKS_ROW] * len(chunk)),
+                                  [value for _, params in chunk for value in params])
+                        book_ids = [c.lastrowid + n * step for n in range(len(chunk))]
+                    except pymysql.Error as e:
+                        app_logger.error(e)
+                        try:
+                            book_ids = _stored_chunk_prefix(c, chunk, max_id_before)
+                        except pymysql.Error as e:
+                            # unknown which rows were stored; do not invite a retry that duplicates them
+                            app_logger.error(e)
+                            for i, _ in chunk:
+                                results[i] = {"error": f"Record {i}: not known whether stored: {e}"}
+                            continue
+                    stored, rest = chunk[:len(book_ids)], chunk[len(book_ids):]
+                    log_activity(c, book_ids, "add_book")
+                    for (i, _), book_id in zip(stored, book_ids):
+                        results[i] = dict(records[i], BookCollectionID=book_id)
+                    for i, params in rest:
+                        try:
+                            c.execute(ADD_BOOKS_INSERT + ADD_BOOKS_ROW, params)
+                        except pymysql.Error as e:
+                            app_logger.error(e)
+                            results[i] = {"error": f"Record {i}: {e}"}
+                            continue
+                        log_activity(c, c.lastrowid, "add_book")
+                        results[i] = dict(records[i], BookCollectionID=c.lastrowid)
+            db.commit()
+        invalidate_indexes()
+    return results
+
+
+##########################################################################
+# UPDATE BOOKS
+##########################################################################
+
+def update_book_record_by_key(update_dict):
+    """
+    Updates a book record in the database using the provided dictionary of record
+    values and the corresponding `BookCollectionID`. Key-value pairs in the record
+    represent the columns to update and their new values. If an error occurs while
+    executing the SQL operation, an error dictionary will be returned.
+
+    :param update_dict: A dictionary containing the record information for the book to
+        be updated. The keys represent the column names, and the values represent
+        the new data to be inserted for those columns.
+    :type update_dict: dict
+    :return: A list containing the result of the update operation. If successful,
+        the `record` dictionary is returned; otherwise, an error dictionary is
+        returned, also when a key is not one of ``queries.BOOK_UPDATE_COLUMNS``.
+    :rtype: list
+    """
+    columns = [key for key in update_dict if key != "BookCollectionID"]
+    try:
+        BookCollectionID = int(update_dict["BookCollectionID"])
+        search_str = queries.update_book(columns)
+    except (KeyError, TypeError, ValueError) as e:
+        app_logger.error(e)
+        return [{"error": f"Invalid update: {e}"}]
+    params = [update_dict[key] for key in columns] + [BookCollectionID]
+    app_logger.debug(f"{search_str} {params}")
     results = []
-    with db:
+    with books_pool.connection() as db:
         with db.cursor() as c:
             try:
-                c.execute(search_str.format(**update_dict))
-                app_logger.debug(search_str.format(**update_dict))
+                c.execute(search_str, params)
+                log_activity(c, BookCollectionID, "update_book", ",".join(columns))
                 results.append(update_dict)
             except pymysql.Error as e:
                 app_logger.error(e)
                 results.append({"error": str(e)})
         db.commit()
+    invalidate_indexes()
+    if "Pages" in columns and "error" not in results[0]:
+        update_reading_summary(book_id=BookCollectionID)
     return results
 
 
@@ -718,11 +1355,152 @@ def update_book_record_by_key(update_dict):
 # REPORTS
 ##########################################################################
 
+# `reading summary` holds one row per (year, month) and a marker row (0, 0) written by
+# rebuild_reading_summary; see schema_booksdb.sql
+READING_SUMMARY_SELECT = (
+    "SELECT YEAR(b.ReadDate) as y, MONTH(b.ReadDate) as m, IFNULL(SUM(a.Pages), 0) as pages, "
+    "COUNT(a.Pages) as books, COUNT(*) as read_count "
+    "FROM `book collection` as a JOIN `books read` as b "
+    "ON a.BookCollectionID = b.BookCollectionID "
+    "WHERE b.ReadDate is not NULL "
+)
+READING_SUMMARY_INSERT = "INSERT INTO `reading summary` (Year, Month, Pages, Books, ReadCount) "
+READING_SUMMARY_GROUP = "GROUP BY YEAR(b.ReadDate), MONTH(b.ReadDate) "
+
+
+def _summary_months(read_dates):
+    """Distinct (year, month) pairs of the parseable dates in ``read_dates``."""
+    months = set()
+    for read_date in read_dates:
+        try:
+            d = datetime.datetime.strptime(str(read_date)[:10], FMT)
+        except ValueError:
+            continue
+        months.add((d.year, d.month))
+    return months
+
+
+def update_reading_summary(read_dates=None, book_id=None):
+    """
+    Recompute the `reading summary` months touched by a write.
+
+    Each affected month is deleted and recalculated from `book collection` and
+    `books read` in one transaction, so the cost is proportional to the books read in
+    those months, a month left without reads loses its row, and repeated calls are
+    harmless.  Call after inserting or removing reads (pass their dates) or after
+    changing a book's Pages (pass its id; every month it was read in is refreshed).
+
+    Parameters
+    ----------
+    read_dates : iterable, optional
+        Dates (``datetime.date`` or ``YYYY-MM-DD`` strings) of the reads written.
+    book_id : int, optional
+        Book whose page count changed.
+
+    Returns
+    -------
+    list or None
+        Error messages, or None on success.  A missing summary table is not an error;
+        the summary utilities then use the live query.
+    """
+    months = _summary_months(read_dates or [])
+    error_list = None
+    with books_pool.connection() as db:
+        c = db.cursor()
+        try:
+            if book_id is not None:
+                c.execute("SELECT DISTINCT YEAR(ReadDate), MONTH(ReadDate) FROM `books read` "
+                          "WHERE BookCollectionID = %s AND ReadDate is not NULL", (book_id,))
+                months.update((int(y), int(m)) for y, m in c.fetchall())
+            for year, month in sorted(months):
+                start = datetime.date(year, month, 1)
+                end = datetime.date(year + month // 12, month % 12 + 1, 1)
+                c.execute("DELETE FROM `reading summary` WHERE Year = %s AND Month = %s", (year, month))
+                c.execute(READING_SUMMARY_INSERT + READING_SUMMARY_SELECT +
+                          "AND b.ReadDate >= %s AND b.ReadDate < %s " + READING_SUMMARY_GROUP, (start, end))
+            db.commit()
+        except pymysql.Error as e:
+            db.rollback()
+            if e.args and e.args[0] == ER_NO_SUCH_TABLE:
+                app_logger.debug(e)
+            else:
+                app_logger.error(e)
+                error_list = [str(e)]
+    return error_list
+
+
+def rebuild_reading_summary():
+    """
+    Rebuild `reading summary` from `book collection` and `books read`.
+
+    Runs in one transaction, so readers see either the old or the new summary.  The
+    API keeps the table current on its own writes (``update_reading_summary``); a
+    rebuild is a maintenance operation, needed once after creating the table and
+    after reads or page counts were changed outside the API.  It writes the marker
+    row (Year 0, Month 0) with the time of the rebuild; until the marker exists the
+    summary utilities use the live query.
+
+    Returns
+    -------
+    tuple
+        (number of months in the summary, error list or None)
+    """
+    error_list = None
+    months = 0
+    with books_pool.connection() as db:
+        c = db.cursor()
+        try:
+            c.execute("DELETE FROM `reading summary`")
+            months = c.execute(READING_SUMMARY_INSERT + READING_SUMMARY_SELECT + READING_SUMMARY_GROUP)
+            c.execute("INSERT INTO `reading summary` (Year, Month, Version) VALUES (0, 0, %s)",
+                      (datetime.datetime.now().isoformat(sep=" ", timespec="seconds"),))
+            db.commit()
+        except pymysql.Error as e:
+            if e.args and e.args[0] == ER_NO_SUCH_TABLE:
+                app_logger.debug(e)
+            else:
+                app_logger.error(e)
+            db.rollback()
+            error_list = [str(e)]
+    return months, error_list
+
+
+def _summary_from_table(target_year=None):
+    """
+    Per-year rows from `reading summary`, or None if it is missing or was never built.
+
+    Costs O(years): one indexed read of the maintained table, with no check of the
+    source tables.
+    """
+    query = ("SELECT Year as year, IF(SUM(Books) = 0, NULL, SUM(Pages)), CAST(SUM(Books) AS SIGNED) "
+             "FROM `reading summary` WHERE Year > 0 ")
+    params = []
+    if target_year is not None:
+        query += "AND Year = %s "
+        params.append(target_year)
+    query += "GROUP BY Year HAVING SUM(ReadCount) > 0 ORDER BY Year ASC"
+    with books_pool.connection() as db:
+        c = db.cursor()
+        try:
+            if c.execute("SELECT 1 FROM `reading summary` WHERE Year = 0 AND Month = 0") == 0:
+                return None
+            c.execute(query, params)
+            return c.fetchall()
+        except pymysql.Error as e:
+            if not (e.args and e.args[0] == ER_NO_SUCH_TABLE):
+                app_logger.error(e)
+            return None
+
+
 def summary_books_read_by_year_utility(target_year=None):
     """
     Summarizes the number of pages read and books read each year.
     Can be filtered for a specific year.
 
+    Reads the `reading summary` table (O(years)), which the API's writes keep current;
+    if the table is missing or has not been built with ``rebuild_reading_summary``,
+    the join of `book collection` and `books read` is aggregated instead.
+
     Parameters:
     target_year (int, optional): The year for which the summary is required. Defaults to None.
 
@@ -730,47 +1508,73 @@ def summary_books_read_by_year_utility(target_year=None):
     tuple: A tuple containing the serialized result, raw data, and header.
     """
     error_list = None
-    # Initialize database connection
-    db = pymysql.connect(**books_conf)
+    # Prepare response data
+    headers = ["year", "pages read", "books read"]
+    results = _summary_from_table(target_year)
+    if results is not None:
+        return results, results, headers, error_list
+
+    # Check out a pooled database connection
+    db = books_pool.connection()
     cursor = db.cursor()
 
     # Building the SQL query string
-    query = (
-        "SELECT YEAR(b.ReadDate) as Year, SUM(a.Pages) as Pages, COUNT(a.Pages) as Books "
-        "FROM `book collection` as a JOIN `books read` as b "
-        "ON a.BookCollectionID = b.BookCollectionID "
-        "WHERE b.ReadDate is not NULL "
-    )
-    if target_year is not None:
-        query += f" AND YEAR(b.ReadDate) = {target_year} "
-    query += "GROUP BY Year ORDER BY Year ASC"
+    if target_year is None:
+        query, params = queries.SUMMARY_BY_YEAR, None
+    else:
+        query, params = queries.SUMMARY_FOR_YEAR, (target_year, target_year)
 
-    # Prepare response data
-    headers = ["year", "pages read", "books read"]
-    app_logger.debug(query)
+    app_logger.debug(f"{query} {params}")
 
     # Execute query and handle exceptions
     try:
-        cursor.execute(query)
+        cursor.execute(query, params)
         results = cursor.fetchall()
     except pymysql.Error as e:
         app_logger.error(e)
         error_list = [str(e)]
         results = None
     finally:
-        # Close the database connection
+        # Return the connection to the pool
         db.close()
 
     return results, results, headers, error_list
 
 
-def books_read_by_year_utility(target_year=None):
+def _books_read_query(target_year=None, after=None, limit=None):
+    """
+    Return ``(query, params, header)`` for ``books_read_by_year_utility``.
+
+    Rows are ordered by the keyset ReadDate, BookCollectionID (the primary key of
+    `books read`); ``after`` is such a pair, and only later rows are returned.
+    """
+    search_str = ("SELECT a.BookCollectionID, a.Title, a.Author, a.CopyrightDate, "
+                  "a.ISBNNumber, a.PublisherName, a.CoverType, a.Pages, "
+                  "a.Category, a.Note, a.Recycled, a.Location, a.ISBNNumber13, "
+                  "b.ReadDate "
+                  "FROM `book collection` as a JOIN `books read` as b "
+                  "ON a.BookCollectionID = b.BookCollectionID "
+                  "WHERE b.ReadDate is not NULL ")
+    params = []
+    if target_year is not None:
+        search_str += " AND YEAR(b.ReadDate) = %s "
+        params.append(target_year)
+    if after is not None:
+        search_str += " AND (b.ReadDate, b.BookCollectionID) > (%s, %s) "
+        params.extend(after)
+    search_str += "ORDER BY b.ReadDate, a.BookCollectionID ASC"
+    if limit is not None:
+        search_str += " LIMIT %s"
+        params.append(limit)
+    return search_str, params, table_header + ["ReadDate"]
+
+
+def books_read_by_year_utility(target_year=None, stream=False):
     """
     Retrieves books that have been read from the database, optionally filtered by a
     specific year.
 
-    This function connects to a MySQL database using the connection parameters
-    defined in ``books_conf``. It builds a SQL query that joins the
+    This function checks a connection out of the shared ``books_pool``. It builds a SQL query that joins the
     ``book collection`` table with the ``books read`` table to fetch details for
     every book that has a non‑null ``ReadDate``.  If ``target_year`` is supplied,
     the query is restricted to entries whose ``ReadDate`` falls within that
@@ -784,6 +1588,9 @@ def books_read_by_year_utility(target_year=None):
         When supplied, only books whose ``ReadDate`` year matches
         ``target_year`` are returned.  If ``None`` (the default), all
         records with a non‑null ``ReadDate`` are included.
+    stream : bool, optional
+        If True ``rows`` is an iterator reading the rows in keyset batches (see
+        ``stream_keyset_rows``) and database errors are raised while iterating.
 
     Returns
     -------
@@ -812,28 +1619,22 @@ def books_read_by_year_utility(target_year=None):
     or further analysis.
     """
     error_list = None
-    db = pymysql.connect(**books_conf)
-    search_str = ("SELECT a.BookCollectionID, a.Title, a.Author, a.CopyrightDate, "
-                  "a.ISBNNumber, a.PublisherName, a.CoverType, a.Pages, "
-                  "a.Category, a.Note, a.Recycled, a.Location, a.ISBNNumber13, "
-                  "b.ReadDate "
-                  "FROM `book collection` as a JOIN `books read` as b "
-                  "ON a.BookCollectionID = b.BookCollectionID "
-                  "WHERE b.ReadDate is not NULL ")
-    if target_year is not None:
-        search_str += f" AND YEAR(b.ReadDate) = {target_year} "
-    search_str += "ORDER BY b.ReadDate, a.BookCollectionID ASC"
-    header = table_header + ["ReadDate"]
+    search_str, params, header = _books_read_query(target_year)
+    if stream:
+        s = stream_keyset_rows(lambda after, n: _books_read_query(target_year, after, n)[:2],
+                               lambda row: (row[13], row[0]))
+        return s, s, header, error_list
     app_logger.debug(search_str)
     s = None
-    c = db.cursor()
-    try:
-        c.execute(search_str)
-    except pymysql.Error as e:
-        app_logger.error(e)
-        error_list = [str(e)]
-    else:
-        s = c.fetchall()
+    with books_pool.connection() as db:
+        c = db.cursor()
+        try:
+            c.execute(search_str, params)
+        except pymysql.Error as e:
+            app_logger.error(e)
+            error_list = [str(e)]
+        else:
+            s = c.fetchall()
     return s, s, header, error_list
 
 
@@ -853,27 +1654,24 @@ def status_read_utility(book_id):
               occurred during execution, or ``None`` if the query succeeded.
 
     Notes:
-        This function opens a connection to the MySQL database using the global
-        ``books_conf`` configuration. It logs the SQL query for debugging purposes,
-        executes the query, and captures any ``pymysql.Error`` exceptions.
-        The database cursor is not closed explicitly; it relies on garbage
-        collection for cleanup.
+        This function checks a connection out of the shared ``books_pool``. It logs
+        the SQL query for debugging purposes, executes the query, and captures any
+        ``pymysql.Error`` exceptions. The connection is returned to the pool when
+        the query completes.
     """
     error_list = None
-    db = pymysql.connect(**books_conf)
-    search_str = (f"select BookCollectionID, ReadDate, ReadNote "
-                  f"FROM `books read` "
-                  f"WHERE BookCollectionID = {book_id} ORDER BY ReadDate ASC;")
-    app_logger.debug(search_str)
-    c = db.cursor()
+    s = None
+    app_logger.debug(f"{queries.READS_BY_BOOK} {book_id}")
     header = ["BookCollectionID", "ReadDate", "ReadNote"]
-    try:
-        c.execute(search_str)
-    except pymysql.Error as e:
-        app_logger.error(e)
-        error_list = [str(e)]
-    else:
-        s = c.fetchall()
+    with books_pool.connection() as db:
+        c = db.cursor()
+        try:
+            c.execute(queries.READS_BY_BOOK, (book_id,))
+        except pymysql.Error as e:
+            app_logger.error(e)
+            error_list = [str(e)]
+        else:
+            s = c.fetchall()
     return s, s, header, error_list
 
 
@@ -902,31 +1700,274 @@ def tags_search_utility(match_str):
     """
     match_str = match_str.lower().strip()
     error_list = None
-    db = pymysql.connect(**books_conf)
-    search_str = ("SELECT a.BookID, b.TagID, b.Label as Tag"
-                  " FROM `books tags` a JOIN `tag labels` b ON a.TagID=b.TagID"
-                  f" WHERE b.Label LIKE \"%{match_str}%\" "
-                  " ORDER BY b.Label ASC")
+    s = None
     header = ["BookCollectionID", "TagID", "Tag"]
-    app_logger.debug(search_str)
-    c = db.cursor()
+    app_logger.debug(f"{queries.TAGS_SEARCH} {match_str}")
+    with books_pool.connection() as db:
+        c = db.cursor()
+        try:
+            c.execute(queries.TAGS_SEARCH, (f"%{match_str}%",))
+        except pymysql.Error as e:
+            app_logger.error(e)
+            error_list = [str(e)]
+        else:
+            s = c.fetchall()
+    return s, s, header, error_list
+
+
+def _fulltext_tokens(value, mode):
+    """
+    Split a search value into ``MATCH ... AGAINST`` terms and ``LIKE`` fallback terms.
+
+    MyISAM does not index words shorter than ``ft_min_word_len`` (4 by default), so
+    such tokens can never match through the FULLTEXT index.  When the value has no
+    indexable token at all it is matched with ``LIKE`` instead (the whole value in
+    natural language mode, each token in boolean mode).  Otherwise short tokens are
+    dropped, as MySQL would ignore them, except boolean ``+word``/``-word`` tokens,
+    which become ``LIKE``/``NOT LIKE`` filters.
+
+    Returns
+    -------
+    tuple
+        ``(match_terms, like_terms)`` where ``like_terms`` holds ``(negated, word)``.
+    """
+    pattern = r'[+\-~<>(]*"[^"]*"[)*]*|\S+' if mode == "boolean" else r"\S+"
+    match_terms, short_terms = [], []
+    for token in re.findall(pattern, value):
+        word = token.strip('+-~<>()"*')
+        if not word:
+            continue
+        if len(word) >= FULLTEXT_MIN_TOKEN_LENGTH or (" " in word and mode == "boolean"):
+            match_terms.append(token if mode == "boolean" else word)
+        else:
+            short_terms.append((token[0], word))
+    if mode != "boolean":
+        return match_terms, [] if match_terms or not value.strip() else [(False, value.strip())]
+    like_terms = [(op == "-", word) for op, word in short_terms if op in "+-" or not match_terms]
+    return match_terms, like_terms
+
+
+def encode_search_cursor(row, header):
+    """
+    Opaque ``books_search_utility`` cursor that resumes after ``row``.
+
+    Parameters
+    ----------
+    row : sequence
+        Last row of a page, as returned by ``books_search_utility``.
+    header : list
+        Column names of ``row``.
+
+    Returns
+    -------
+    str
+        URL-safe base64 encoded JSON holding the row's keyset values (Author,
+        Title, BookCollectionID, ReadDate and, in FULLTEXT modes, Relevance).
+        The Relevance is kept as the exact decimal string the query returned, so
+        the next page resumes on the same score rather than a rounded float.
+    """
+    cursor = search_cursor_after(row, header)
+    if "relevance" in cursor:
+        cursor["relevance"] = str(cursor["relevance"])
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode("utf-8")).decode("ascii")
+
+
+def search_cursor_after(row, header):
+    """Decoded cursor (see ``decode_search_cursor``) resuming after ``row``."""
+    values = dict(zip(header, row))
+    read_date = values["ReadDate"]
+    cursor = {"key": [values["Author"] or "", values["Title"] or "", values["BookCollectionID"],
+                      "1000-01-01" if read_date is None else read_date.strftime(FMT)]}
+    if "Relevance" in values:
+        cursor["relevance"] = values["Relevance"]
+    return cursor
+
+
+def decode_search_cursor(cursor):
+    """Inverse of ``encode_search_cursor``; raises ``ValueError`` for a malformed cursor."""
     try:
-        c.execute(search_str)
-    except pymysql.Error as e:
-        app_logger.error(e)
-        error_list = [str(e)]
+        after = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        author, title, book_id, read_date = after["key"]
+        after["key"] = [str(author), str(title), int(book_id), str(read_date)]
+        if "relevance" in after:
+            relevance = Decimal(str(after["relevance"]))
+            if not relevance.is_finite():
+                raise ValueError(after["relevance"])
+            after["relevance"] = str(relevance)
+    except (ValueError, TypeError, KeyError, UnicodeError, ArithmeticError) as e:
+        raise ValueError(f"Invalid search cursor: {cursor}") from e
+    return after
+
+
+def project_search_rows(rows, header, fields):
+    """
+    Keep only the requested columns of ``books_search_utility`` rows.
+
+    Parameters
+    ----------
+    rows : sequence of tuple
+        Result rows.
+    header : list
+        Column names of ``rows``.
+    fields : str or list or None
+        Comma separated string or list of column names to keep, in output order.
+        None or empty keeps every column.
+
+    Returns
+    -------
+    tuple
+        ``(rows, header)`` restricted to ``fields``.
+
+    Raises
+    ------
+    ValueError
+        If a requested field is not in ``header``.
+    """
+    positions, header = search_field_positions(header, fields)
+    if positions is None:
+        return rows, header
+    return [tuple(row[i] for i in positions) for row in rows or []], header
+
+
+def search_field_positions(header, fields):
+    """
+    Column positions in ``header`` of the requested ``fields``.
+
+    Returns
+    -------
+    tuple
+        ``(positions, header)``; ``positions`` is None when ``fields`` is empty,
+        meaning every column is kept.
+
+    Raises
+    ------
+    ValueError
+        If a requested field is not in ``header``.
+    """
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(",") if f.strip()]
+    if not fields:
+        return None, header
+    unknown = [f for f in fields if f not in header]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return [header.index(f) for f in fields], list(fields)
+
+
+def _books_search_query(args, mode="like", limit=None, after=None):
+    """
+    Build the parameterized query behind ``books_search_utility``.
+
+    Parameters
+    ----------
+    args : dict
+        Search criteria keyed by column name; see ``books_search_utility``.
+    mode : str, optional
+        One of ``SEARCH_MODES``.  In ``fulltext`` and ``boolean`` modes Title and
+        Author criteria use the FULLTEXT indexes and a ``Relevance`` column is added.
+    limit : int, optional
+        Maximum number of rows.  Paged queries (``limit`` or ``after`` given) are
+        ordered by the full keyset Author, Title, BookCollectionID, ReadDate.
+    after : dict, optional
+        Decoded cursor; only rows after its keyset values are returned.
+
+    Returns
+    -------
+    tuple
+        ``(query, params, header)``.
+
+    Raises
+    ------
+    ValueError
+        If ``mode`` or a search key is not recognized.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Invalid search mode: {mode}. Use one of {', '.join(SEARCH_MODES)}.")
+    fulltext = mode != "like"
+    against = "IN BOOLEAN MODE" if mode == "boolean" else "IN NATURAL LANGUAGE MODE"
+    where, params = [], []
+    relevance, relevance_params = [], []
+    for key in args:
+        value = args.get(key)
+        if key == "BookCollectionID":
+            where.append(f"a.{key} = %s")
+            params.append(value)
+        elif key == "ReadDate":
+            where.append(f"b.{key} LIKE %s")
+            params.append(f"%{value}%")
+        elif key == "Tags":
+            _, s, _, _ = tags_search_utility(value)
+            id_list = [int(x[0]) for x in s or []]
+            app_logger.debug(id_list)
+            if len(id_list) == 0:
+                # no matching tags - force no results
+                where.append("a.BookCollectionID in (0)")
+            else:
+                where.append(f"a.BookCollectionID in ({_in_list_placeholders(id_list)})")
+                params.extend(id_list)
+        elif key not in table_header:
+            raise ValueError(f"Unknown search field: {key}")
+        elif fulltext and key in FULLTEXT_COLUMNS:
+            match_terms, like_terms = _fulltext_tokens(value, mode)
+            if match_terms:
+                match_str = f"MATCH(a.{key}) AGAINST (%s {against})"
+                where.append(match_str)
+                params.append(" ".join(match_terms))
+                relevance.append(match_str)
+                relevance_params.append(" ".join(match_terms))
+            for negated, word in like_terms:
+                where.append(f"a.{key} {'NOT LIKE' if negated else 'LIKE'} %s")
+                params.append(f"%{word}%")
+        else:
+            where.append(f"a.{key} LIKE %s")
+            params.append(f"%{value}%")
+    search_str = ("SELECT a.BookCollectionID, a.Title, a.Author, a.CopyrightDate, "
+                  "a.ISBNNumber, a.PublisherName, a.CoverType, a.Pages, "
+                  "a.Category, a.Note, a.Recycled, a.Location, a.ISBNNumber13, "
+                  "b.ReadDate ")
+    header = table_header + ["ReadDate"]
+    # the score is cast to an exact DECIMAL so that the ORDER BY, the cursor and the
+    # keyset comparison below all see the same value
+    relevance_str = f"CAST({' + '.join(relevance) or '0'} AS DECIMAL(30,15))"
+    if fulltext:
+        search_str += f", {relevance_str} as Relevance "
+        header = header + ["Relevance"]
+    search_str += ("FROM `book collection` as a LEFT JOIN `books read` as b "
+                   "ON a.BookCollectionID = b.BookCollectionID ")
+    paged = limit is not None or after is not None
+    keyset = "IFNULL(a.Author, ''), IFNULL(a.Title, ''), a.BookCollectionID, IFNULL(b.ReadDate, '1000-01-01')"
+    if after is not None:
+        keyset_after = f"({keyset}) > (%s, %s, %s, %s)"
+        if fulltext:
+            after_relevance = "CAST(%s AS DECIMAL(30,15))"
+            where.append(f"({relevance_str} < {after_relevance} OR "
+                         f"({relevance_str} = {after_relevance} AND {keyset_after}))")
+            params.extend(relevance_params + [after.get("relevance", "0")] +
+                          relevance_params + [after.get("relevance", "0")] + after["key"])
+        else:
+            where.append(keyset_after)
+            params.extend(after["key"])
+    if len(where) > 0:
+        search_str += "WHERE " + " AND ".join(where)
+    if paged:
+        search_str += f" ORDER BY {'Relevance DESC, ' if fulltext else ''}{keyset}"
+    elif fulltext:
+        search_str += " ORDER BY Relevance DESC, a.Author, a.Title ASC"
     else:
-        s = c.fetchall()
-    return s, s, header, error_list
+        search_str += " ORDER BY a.Author, a.Title ASC"
+    if limit is not None:
+        search_str += " LIMIT %s"
+        params.append(limit)
+    return search_str, relevance_params + params, header
 
 
-def books_search_utility(args):
+def books_search_utility(args, mode=None, limit=None, cursor=None, stream=False):
     """
     This function searches a book collection database for records matching the provided criteria.
 
-    The function builds a SQL query dynamically based on the keys in the `args` dictionary.  Certain keys are treated specially – for example, a key of `"BookCollectionID"` is matched exactly, while `"ReadDate"` is matched using a `LIKE` pattern.  The `"Tags"` key triggers a call to `tags_search_utility`, converting a list of tag identifiers into a tuple used in a sub‑query.  All other keys are compared using a `LIKE` clause.
+    The function builds a parameterized SQL query based on the keys in the `args` dictionary.  Certain keys are treated specially – for example, a key of `"BookCollectionID"` is matched exactly, while `"ReadDate"` is matched using a `LIKE` pattern.  The `"Tags"` key triggers a call to `tags_search_utility`, converting a list of tag identifiers into an `IN` list.  All other keys are compared using a `LIKE` clause, except Title and Author in the FULLTEXT modes.
 
-    The query joins the `book collection` table with the `books read` table.  If any conditions are supplied, they are added to a `WHERE` clause; the results are ordered by author and title.  The function logs the final query for debugging purposes.
+    The query joins the `book collection` table with the `books read` table.  If any conditions are supplied, they are added to a `WHERE` clause; the results are ordered by author and title (by relevance first in the FULLTEXT modes).  The function logs the final query for debugging purposes.
 
     After executing the query, the function fetches all rows and returns them along with a header list and any error information that may have been captured.
 
@@ -942,6 +1983,21 @@ def books_search_utility(args):
           tag IDs are used to filter the collection IDs.
         * All other keys – matched using a ``LIKE`` pattern against the column
           of the same name in the ``book collection`` table.
+    mode : str, optional
+        ``"like"`` (default) for substring matching, ``"fulltext"`` to match Title
+        and Author with ``MATCH ... AGAINST`` in natural language mode, or
+        ``"boolean"`` for boolean mode (``+word -word "a phrase" prefix*``).  Tokens
+        shorter than the FULLTEXT minimum word length are matched with ``LIKE``.
+    limit : int, optional
+        Return at most ``limit`` rows (capped at ``SEARCH_LIMIT_MAX``).  Paged
+        results are ordered by the keyset Author, Title, BookCollectionID, ReadDate.
+    cursor : str, optional
+        Value from ``encode_search_cursor`` for the last row of the previous page;
+        the search resumes after that row.
+    stream : bool, optional
+        If True the rows are returned as an iterator reading them in keyset batches
+        (see ``stream_keyset_rows``), in the paged order; database errors are then
+        raised while iterating instead of being returned in ``error_list``.
 
     Returns
     -------
@@ -953,73 +2009,131 @@ def books_search_utility(args):
         * ``s`` – the same list of rows returned again (this duplication is
           intentional to match the original return signature).
         * ``header`` – a list of column names for the result set, including the
-          ``ReadDate`` column appended to the global ``table_header``.
+          ``ReadDate`` column appended to the global ``table_header`` and, in the
+          FULLTEXT modes, a ``Relevance`` score column.
         * ``error_list`` – a list containing any database error messages that
           occurred during query execution, or ``None`` if no errors were
           encountered.
 
     Notes
     -----
-    * The function relies on several global objects: ``books_conf`` for the
-      database connection parameters, ``tags_search_utility`` for resolving tag
+    * The function relies on several global objects: ``books_pool`` for
+      database connections, ``tags_search_utility`` for resolving tag
       IDs, ``app_logger`` for logging, and ``table_header`` for header
       construction.  These objects must be defined in the module before calling
       this function.
 
-    * Because the query is built by interpolating values directly into the SQL
-      string, it is susceptible to SQL injection if ``args`` contains untrusted
-      data.  Ensure that all values in ``args`` are sanitized before use.
+    * Search values are passed as query parameters; search keys must be
+      ``table_header`` columns, ``ReadDate`` or ``Tags``.
 
     * The returned list of rows is fetched using the ``fetchall`` method of a
       MySQL cursor, which yields a list of tuples.  The column order matches the
       selection in the query string.
+
+    * When ``BOOKDB_SEARCH_INDEX=1`` a ``like`` mode request is answered from the
+      in-process ``search_index`` with the same rows and ordering; requests it
+      cannot answer exactly (other keys, ``LIKE`` wildcards in values) fall
+      through to the query.
     """
+    mode = mode or "like"
     error_list = None
     s = None
-    db = pymysql.connect(**books_conf)
-    where = []
-    for key in args:
-        if key == "BookCollectionID":
-            where.append(f"a.{key} = \"{args.get(key)}\"")
-        elif key == "ReadDate":
-            where.append(f"b.{key} LIKE \"%{args.get(key)}%\"")
-        elif key == "Tags":
-            _, s, _, _ = tags_search_utility(args.get(key))
-            id_list = str(tuple([int(x[0]) for x in s]))
-            if len(s) == 1:
-                # remove trailing comma
-                id_list = id_list.replace(",", "")
-            app_logger.debug(id_list)
-            if id_list == "()":
-                # no matching tags - force no results
-                where.append("a.BookCollectionID in (0)")
-            else:
-                where.append(f"a.BookCollectionID in {id_list}")
-        else:
-            where.append(f"a.{key} LIKE \"%{args.get(key)}%\"")
-    where_str = " AND ".join(where)
-    search_str = ("SELECT a.BookCollectionID, a.Title, a.Author, a.CopyrightDate, "
-                  "a.ISBNNumber, a.PublisherName, a.CoverType, a.Pages, "
-                  "a.Category, a.Note, a.Recycled, a.Location, a.ISBNNumber13, "
-                  "b.ReadDate "
-                  "FROM `book collection` as a LEFT JOIN `books read` as b "
-                  "ON a.BookCollectionID = b.BookCollectionID ")
-    if where_str != '':
-        search_str += "WHERE " + where_str
-    search_str += " ORDER BY a.Author, a.Title ASC"
-    app_logger.debug(search_str)
-    header = table_header + ["ReadDate"]
-    c = db.cursor()
     try:
-        c.execute(search_str)
-    except pymysql.Error as e:
+        if limit is not None:
+            limit = min(max(int(limit), 1), SEARCH_LIMIT_MAX)
+        after = decode_search_cursor(cursor) if cursor else None
+        if search_index is not None and mode == "like":
+            s = search_index.search(args)
+            if s is not None:
+                if after is not None:
+                    start = search_index.row_key(*after["key"])
+                    s = tuple(r for r in s if search_index.row_key(r[2], r[1], r[0], r[13]) > start)
+                if limit is not None:
+                    s = s[:limit]
+                if stream:
+                    s = iter(s)
+                return s, s, table_header + ["ReadDate"], None
+        search_str, params, header = _books_search_query(args, mode, limit, after)
+    except ValueError as e:
         app_logger.error(e)
-        error_list = [str(e)]
-    else:
-        s = c.fetchall()
+        return s, s, table_header + ["ReadDate"], [str(e)]
+    if stream:
+        s = stream_keyset_rows(lambda page_after, n: _books_search_query(args, mode, n, page_after or after)[:2],
+                               lambda row: search_cursor_after(row, header), limit)
+        return s, s, header, error_list
+    app_logger.debug(f"{search_str} {params}")
+    with books_pool.connection() as db:
+        c = db.cursor()
+        try:
+            c.execute(search_str, params)
+        except pymysql.Error as e:
+            app_logger.error(e)
+            error_list = [str(e)]
+        else:
+            s = c.fetchall()
+    return s, s, header, error_list
+
+
+def tag_counts_utility(tag=None, stream=False):
+    """
+    Count the books carrying each tag label.
+
+    Parameters
+    ----------
+    tag : str, optional
+        Only labels starting with this string are counted.
+    stream : bool, optional
+        If True the rows are returned as an iterator reading them in keyset batches
+        (see ``stream_keyset_rows``) and database errors are raised while iterating.
+
+    Returns
+    -------
+    tuple
+        ``(rows, rows, header, error_list)`` with rows of ``(Tag, Count)`` ordered by
+        count descending, then label; ``error_list`` is None on success.
+    """
+    error_list = None
+    s = None
+    header = ["Tag", "Count"]
+    if stream:
+        s = stream_keyset_rows(lambda after, n: _tag_counts_query(tag, after, n), lambda row: (row[1], row[0]))
+        return s, s, header, error_list
+    search_str, params = _tag_counts_query(tag)
+    app_logger.debug(search_str)
+    with books_pool.connection() as db:
+        c = db.cursor()
+        try:
+            c.execute(search_str, params)
+        except pymysql.Error as e:
+            app_logger.error(e)
+            error_list = [str(e)]
+        else:
+            s = c.fetchall()
     return s, s, header, error_list
 
 
+def _tag_counts_query(tag=None, after=None, limit=None):
+    """
+    Return ``(query, params)`` for ``tag_counts_utility``, ordered by the keyset
+    count descending, label; ``after`` is a ``(count, label)`` pair.
+    """
+    search_str = "SELECT a.Label as Tag, COUNT(b.TagID) as Count"
+    search_str += " FROM `tag labels` a JOIN `books tags` b ON a.TagID =b.TagID"
+    params = []
+    if tag is not None:
+        search_str += " WHERE Label LIKE %s"
+        params.append(f"{tag}%")
+    search_str += " GROUP BY Label"
+    if after is not None:
+        search_str += " HAVING Count < %s OR (Count = %s AND Tag > %s)"
+        params.extend([after[0], after[0], after[1]])
+    search_str += " ORDER BY count DESC, Label ASC"
+    if limit is not None:
+        search_str += " LIMIT %s"
+        params.append(limit)
+    return search_str, params
+
+
 def book_tags(book_id):
     """
     Retrieve tag labels for a specified book from the database.
@@ -1045,21 +2159,19 @@ def book_tags(book_id):
     """
     error_list = None
     s = None
-    db = pymysql.connect(**books_conf)
-    search_str = "SELECT a.Label as Tag"
-    search_str += " FROM `tag labels` a JOIN `books tags` b ON a.TagID =b.TagID"
-    search_str += f" WHERE b.BookID = {book_id} ORDER BY Tag"
-    app_logger.debug(search_str)
-    c = db.cursor()
-    try:
-        c.execute(search_str)
-    except pymysql.Error as e:
-        app_logger.error(e)
-        error_list = [str(e)]
-    else:
-        s = c.fetchall()
-        tag_list = [x[0].strip() for x in s]
-        rdata = {"BookID": book_id, "tag_list": tag_list}
+    rdata = {"BookID": book_id, "tag_list": []}
+    app_logger.debug(f"{queries.BOOK_TAGS} {book_id}")
+    with books_pool.connection() as db:
+        c = db.cursor()
+        try:
+            c.execute(queries.BOOK_TAGS, (str(book_id),))
+        except pymysql.Error as e:
+            app_logger.error(e)
+            error_list = [str(e)]
+        else:
+            s = c.fetchall()
+            tag_list = [x[0].strip() for x in s]
+            rdata = {"BookID": book_id, "tag_list": tag_list}
     return rdata, error_list
 
 
@@ -1083,33 +2195,28 @@ def daily_page_record_from_db(RecordID):
     # Initialize an empty list for the data
     data = []
 
-    # Connect to the database
+    # Check out a pooled connection
     try:
-        db = pymysql.connect(**books_conf)
-        with db.cursor() as cur:
+        with books_pool.connection() as db, db.cursor() as cur:
             # Execute the query to fetch daily page records
-            q = ("SELECT a.RecordDate, a.page FROM `daily page records` a "
-                 f"WHERE a.RecordID = {RecordID} ORDER BY a.RecordDate ASC")
-            app_logger.debug(q)
-            cur.execute(q)
+            app_logger.debug(f"{queries.DAILY_PAGE_RECORDS} {RecordID}")
+            cur.execute(queries.DAILY_PAGE_RECORDS, (RecordID,))
             rows = cur.fetchall()
-
-            # Check if any rows were returned
-            if rows:
-                first_record_date = rows[0][0]
-                for row in rows:
-                    # Calculate the day number and append it to the row
-                    day_number = (row[0] - first_record_date).days
-                    data.append(list(row) + [day_number])
+            data = _with_day_numbers(rows)
     except pymysql.MySQLError as e:
         app_logger.error(f"Database error: {e}")
-    finally:
-        # Ensure the database connection is closed
-        db.close()
 
     return data, RecordID
 
 
+def _with_day_numbers(rows):
+    """(RecordDate, page) rows as [RecordDate, page, days since the first record] lists."""
+    if not rows:
+        return []
+    first_record_date = rows[0][0]
+    return [list(row) + [(row[0] - first_record_date).days] for row in rows]
+
+
 def reading_book_data_from_db(RecordID):
     """
     Fetches book data for a specified RecordID from the database.
@@ -1124,34 +2231,27 @@ def reading_book_data_from_db(RecordID):
     """
     # Initialize an empty list for the data
     rows = []
-    # Establish a database connection
+    # Check out a pooled connection
     try:
-        db = pymysql.connect(**books_conf)
-        with db.cursor() as cur:
+        with books_pool.connection() as db, db.cursor() as cur:
             # Execute the query to fetch book data
-            q = f'SELECT StartDate, LastReadablePage FROM `complete date estimates` WHERE RecordID = {RecordID}'
-            app_logger.debug(q)
-            cur.execute(q)
+            app_logger.debug(f"{queries.ESTIMATE_START} {RecordID}")
+            cur.execute(queries.ESTIMATE_START, (RecordID,))
             rows = cur.fetchall()
     except pymysql.MySQLError as e:
         # Handle database errors
         app_logger.error(f"Database error: {e}")
-    finally:
-        # Ensure the database connection is closed
-        db.close()
 
     return rows, RecordID
 
 
 def update_reading_book_data(record_id, date_range):
     result = {}
-    db = pymysql.connect(**books_conf)
+    db = books_pool.connection()
     with db:
         with db.cursor() as c:
             try:
-                c.execute(
-                    "UPDATE `complete date estimates` SET EstimateDate = %s, EstimatedFinishDate = %s WHERE RecordID = %s",
-                    (datetime.datetime.now(), date_range[0], record_id))
+                c.execute(queries.UPDATE_ESTIMATE, (datetime.datetime.now(), date_range[0], record_id))
             except pymysql.Error as e:
                 app_logger.error(e)
                 result = {"error": [str(e)]}
@@ -1159,6 +2259,66 @@ def update_reading_book_data(record_id, date_range):
     return result
 
 
+def estimate_values_batch(x_values, y_values, target_x):
+    """
+    Estimates the likely, minimum and maximum y-values at a target x-value for many series at once.
+
+    Each series is one reading: x holds the page reached and y the day number of each
+    daily page record.  The likely value extrapolates the least-squares line of the whole
+    series from its last point; the range extrapolates the slope of every pair of
+    consecutive points, skipping pairs with the same x (the same page count on two days).
+
+    The series are concatenated and the pairwise slopes, extrapolations and per-series
+    minima/maxima are computed with ``np.diff`` and ``reduceat`` in one pass; the
+    least-squares slope is still fitted per series with ``np.polyfit``, so the results
+    equal those of ``_estimate_values`` bit for bit.
+
+    Parameters:
+    - x_values (sequence of 1-D array-like): The x-values of each series, at least two each.
+    - y_values (sequence of 1-D array-like): The y-values of each series.
+    - target_x (sequence of float): The x-value to estimate at, per series.
+
+    Returns:
+    - numpy.ndarray: Float array of shape (number of series, 3) holding the likely, minimum and
+      maximum y-value of each series.  The minimum and maximum are inf and -inf for a series
+      without a usable pair.
+
+    Raises:
+    - ValueError: If a series has fewer than two points.
+    """
+    import numpy as np  # imported on first use; only the estimate routes need it
+    lengths = np.array([len(x) for x in x_values], dtype=np.intp)
+    if lengths.size == 0:
+        return np.empty((0, 3))
+    if (lengths < 2).any():
+        raise ValueError("Every series needs at least two points")
+    x = np.concatenate([np.asarray(v, dtype=np.float64) for v in x_values])
+    y = np.concatenate([np.asarray(v, dtype=np.float64) for v in y_values])
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    x_max = np.maximum.reduceat(x, starts)
+    y_max = np.maximum.reduceat(y, starts)
+    offset = np.asarray(target_x, dtype=np.float64) - x_max
+
+    fit_slope = np.array([np.polyfit(x[i:i + n], y[i:i + n], 1)[0] for i, n in zip(starts, lengths)])
+    likely = fit_slope * offset + y_max
+
+    # consecutive pairs, without the ones spanning two series
+    within = np.ones(x.size - 1, dtype=bool)
+    within[starts[1:] - 1] = False
+    dx = np.diff(x)[within]
+    dy = np.diff(y)[within]
+    pair_series = np.repeat(np.arange(lengths.size), lengths - 1)
+    usable = dx != 0
+    if not usable.all():
+        app_logger.error(f"Skipping {np.count_nonzero(~usable)} pair(s) with the same page count on two days")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        estimated = dy / dx * offset[pair_series] + y_max[pair_series]
+    pair_starts = np.concatenate(([0], np.cumsum(lengths - 1)[:-1]))
+    shortest = np.minimum.reduceat(np.where(usable, estimated, np.inf), pair_starts)
+    longest = np.maximum.reduceat(np.where(usable, estimated, -np.inf), pair_starts)
+    return np.column_stack((likely, shortest, longest))
+
+
 def _estimate_values(x_values, y_values, target_x):
     """
     Estimates the minimum and maximum y-values for a given target x-value based on linear interpolation
@@ -1172,24 +2332,10 @@ def _estimate_values(x_values, y_values, target_x):
     Returns:
     - list: A list containing the minimum and maximum estimated y-values for the target x-value.
     """
-    slope, _ = np.polyfit(x_values, y_values, 1)  # linear fit to all points
-    most_likely_y = slope * (target_x - np.max(x_values)) + np.max(y_values)
-    estimated_range = [float('inf'), -float('inf')]
-    for i in range(len(x_values) - 1):
-        denom = x_values[i + 1] - x_values[i]
-        if denom == 0:
-            app_logger.error(f"Divide by zero error at index {i} -- skipping")
-            app_logger.debug(f"Did you enter the same page count for two different days?")
-            continue
-        else:
-            slope = (y_values[i + 1] - y_values[i]) / denom
-        estimated_y = slope * (target_x - np.max(x_values)) + np.max(y_values)
-        estimated_range[0] = min(estimated_range[0], estimated_y)
-        estimated_range[1] = max(estimated_range[1], estimated_y)
-
-    app_logger.debug(f"Estimated days: {most_likely_y} and estimated range: {estimated_range}")
+    most_likely_y, shortest, longest = estimate_values_batch([x_values], [y_values], [target_x])[0]
+    app_logger.debug(f"Estimated days: {most_likely_y} and estimated range: {[shortest, longest]}")
     # expected, shortest, longest in days from first record
-    return [int(x) for x in [most_likely_y, estimated_range[0], estimated_range[1]]]
+    return [int(x) for x in [most_likely_y, shortest, longest]]
 
 
 def estimate_completion_dates(reading_data, total_pages):
@@ -1206,6 +2352,8 @@ def estimate_completion_dates(reading_data, total_pages):
     - tuple: A tuple containing the earliest and latest estimated completion dates as datetime.date objects.
     """
 
+    import numpy as np
+
     start_date = reading_data[0][0]  # first record date
     # Convert input data to numpy arrays for manipulation
     data_array = np.array(reading_data)
@@ -1252,3 +2400,68 @@ def calculate_estimates(record_id):
     formatted_estimates = [date.strftime(FMT) for date in estimate_date_range]
 
     return formatted_estimates
+
+
+def calculate_book_estimates(book_id):
+    """
+    Calculates the date estimates of every reading of a book, as ``calculate_estimates`` does for one.
+
+    The readings and all of their daily page records are loaded with two queries on one
+    connection and estimated together by ``estimate_values_batch``; a reading whose records
+    all have the same page count is reported like one with too few records.  An estimate
+    is written back (with a new ``EstimateDate``) only if its
+    likely finish date differs from the stored ``EstimatedFinishDate``, in a single
+    ``executemany``.
+
+    Parameters
+    ----------
+    book_id : int
+        BookCollectionID of the book.
+
+    Returns
+    -------
+    tuple
+        ``(records, estimates, error_list)``: ``records`` holds a ``(StartDate, RecordID)``
+        pair per reading, oldest first; ``estimates`` the matching
+        ``calculate_estimates`` result; ``error_list`` is None unless a query failed.
+    """
+    records, estimates, error_list = [], [], None
+    try:
+        with books_pool.connection() as db, db.cursor() as c:
+            c.execute(queries.ESTIMATES_BY_BOOK, (book_id,))
+            readings = c.fetchall()
+            pages = {}
+            if readings:
+                record_ids = [row[0] for row in readings]
+                c.execute(queries.in_list(queries.DAILY_PAGES_BY_RECORD_IDS, record_ids), record_ids)
+                for record_id, record_date, page in c.fetchall():
+                    pages.setdefault(record_id, []).append((record_date, page))
+            records = [(str(start_date), int(record_id)) for record_id, start_date, _, _ in readings]
+            estimates = [["inadequate reading data", None, None] for _ in readings]
+            # (index, first record date, pages, day numbers) of readings with two or more records
+            fitted = []
+            for i, (record_id, _, _, _) in enumerate(readings):
+                data = _with_day_numbers(pages.get(record_id, []))
+                if len(data) >= 2:
+                    fitted.append((i, data[0][0], [row[1] for row in data], [row[2] for row in data]))
+            days = estimate_values_batch([f[2] for f in fitted], [f[3] for f in fitted],
+                                         [float(readings[f[0]][2]) for f in fitted])
+            changed = []
+            now = datetime.datetime.now()
+            for (i, start_date, _, _), day_range in zip(fitted, days):
+                record_id, _, _, finish_date = readings[i]
+                try:
+                    estimate_date_range = [start_date + datetime.timedelta(days=int(d)) for d in day_range]
+                except OverflowError:
+                    continue  # no two records with different page counts
+                if estimate_date_range[0] != finish_date:
+                    changed.append((now, estimate_date_range[0], record_id))
+                estimates[i] = [date.strftime(FMT) for date in estimate_date_range]
+            if changed:
+                app_logger.debug(f"Updating {len(changed)} of {len(readings)} estimates of book {book_id}")
+                c.executemany(queries.UPDATE_ESTIMATE, changed)
+                db.commit()
+    except pymysql.Error as e:
+        app_logger.error(e)
+        error_list = [str(e)]
+    return records, estimates, error_list
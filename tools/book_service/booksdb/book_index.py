@@ -0,0 +1,134 @@
+import logging
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+import pymysql
+
+app_logger = logging.getLogger('flask.app')
+
+# Seconds between fingerprint checks against the database; override per deployment
+DEFAULT_FINGERPRINT_TTL_SECONDS = 5
+
+
+class BookIdIndex:
+    """
+    Process-local, sorted array of every BookCollectionID in `book collection`.
+
+    Next/previous and window lookups are answered with a bisect into the cached array
+    instead of ordered ``LIMIT`` queries.  The cache is validated against a cheap
+    fingerprint (``MAX(BookCollectionID)``, ``COUNT(*)``) at most once every
+    ``ttl_seconds`` and reloaded only when the fingerprint changes.  Routes that insert
+    or delete books call ``invalidate()`` so the writing process sees the change at once;
+    other uWSGI workers pick it up on their next fingerprint check.
+
+    Parameters
+    ----------
+    pool : booksdb.db_pool.ConnectionPool
+        Pool used for the fingerprint and reload queries.
+    ttl_seconds : float, optional
+        Minimum seconds between fingerprint checks.  Defaults to ``BOOKDB_ID_INDEX_TTL``
+        or 5.
+    """
+
+    fingerprint_query = "SELECT MAX(a.BookCollectionID), COUNT(*) FROM `book collection` as a;"
+    load_query = "SELECT a.BookCollectionID FROM `book collection` as a ORDER BY a.BookCollectionID;"
+
+    def __init__(self, pool, ttl_seconds=None):
+        self.pool = pool
+        self.ttl_seconds = float(ttl_seconds if ttl_seconds is not None else
+                                 os.getenv("BOOKDB_ID_INDEX_TTL", DEFAULT_FINGERPRINT_TTL_SECONDS))
+        self._lock = threading.Lock()
+        self._ids = None
+        self._fingerprint = None
+        self._checked_at = None
+
+    def invalidate(self):
+        """Force a fingerprint check on the next lookup."""
+        with self._lock:
+            self._checked_at = None
+
+    def ids(self):
+        """
+        Current sorted BookCollectionIDs.
+
+        Returns
+        -------
+        array.array or None
+            Sorted ``array('i')`` of ids, or None if the index has never been loaded
+            because of a database error.  A stale array is returned (and the error
+            logged) when a refresh fails after a successful load.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is not None and now - self._checked_at < self.ttl_seconds:
+                return self._ids
+            try:
+                with self.pool.connection() as db:
+                    c = db.cursor()
+                    c.execute(self.fingerprint_query)
+                    fingerprint = tuple(c.fetchall()[0])
+                    if fingerprint != self._fingerprint or self._ids is None:
+                        app_logger.debug(f"Reloading book id index, fingerprint {fingerprint}")
+                        c.execute(self.load_query)
+                        self._ids = array('i', (row[0] for row in c.fetchall()))
+                        self._fingerprint = fingerprint
+            except pymysql.Error as e:
+                app_logger.error(e)
+            else:
+                self._checked_at = now
+            return self._ids
+
+    def next_id(self, current_book_id, direction=1):
+        """
+        Neighbouring id in the given direction, wrapping at either end of the collection.
+
+        Parameters
+        ----------
+        current_book_id : int
+            Reference id; it need not exist in the collection.
+        direction : int, optional
+            Positive for the next larger id, otherwise the next smaller id.
+
+        Returns
+        -------
+        int or None
+            The neighbouring id, or None if the index is empty or unavailable.
+        """
+        ids = self.ids()
+        if not ids:
+            return None
+        if direction > 0:
+            pos = bisect_right(ids, current_book_id)
+        else:
+            pos = bisect_left(ids, current_book_id) - 1
+        return ids[pos % len(ids)]
+
+    def window(self, book_id, window):
+        """
+        Ring of ``window`` ids around ``book_id``.
+
+        The first ``window // 2`` ids are those less than or equal to ``book_id`` and the
+        rest are greater, wrapping around the ends of the collection.  Ids repeat when the
+        collection holds fewer than ``window`` books.
+
+        Parameters
+        ----------
+        book_id : int
+            Center of the window; it need not exist in the collection.
+        window : int
+            Number of ids to return.
+
+        Returns
+        -------
+        list[int]
+            Ids in ring order, empty if the index is empty or unavailable.
+        """
+        ids = self.ids()
+        if not ids or window <= 0:
+            return []
+        n = len(ids)
+        start = bisect_right(ids, book_id) - (window - (window + 1) // 2)
+        return [ids[(start + k) % n] for k in range(window)]
@@ -0,0 +1,302 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import pymysql
+
+app_logger = logging.getLogger('flask.app')
+
+# Defaults may be overridden per deployment through the environment
+DEFAULT_MAX_CONNECTIONS = 20  # budget for the whole service, split across uWSGI workers
+DEFAULT_MAX_IDLE_SECONDS = 300
+DEFAULT_HEALTH_CHECK_SECONDS = 30
+DEFAULT_CHECKOUT_TIMEOUT_SECONDS = 10
+
+
+class PoolExhaustedError(pymysql.err.OperationalError):
+    """
+    Raised when no pooled connection becomes available before the checkout timeout.
+
+    Subclasses ``pymysql.err.OperationalError`` so the existing ``except pymysql.Error``
+    handlers in the utilities and routes report it like any other database error.
+    """
+
+
+def workers_per_service():
+    """
+    Number of worker processes sharing the service-wide budgets: MySQL connections
+    here, the ISBNdb request rate in ``api.py``.
+
+    Uses ``uwsgi.numproc`` when running under uWSGI, otherwise 1 (local scripts,
+    the MCP server, notebooks).
+    """
+    try:
+        import uwsgi
+        return max(1, int(uwsgi.numproc))
+    except (ImportError, AttributeError):
+        return 1
+
+
+def default_pool_size():
+    """
+    Size of the connection pool for this process.
+
+    ``BOOKDB_POOL_SIZE`` sets the size directly.  Otherwise the service-wide budget
+    ``BOOKDB_MAX_CONNECTIONS`` (default 20) is divided evenly between the uWSGI worker
+    processes so the total never exceeds MySQL's ``max_connections`` allowance.
+    """
+    if os.getenv("BOOKDB_POOL_SIZE") is not None:
+        return max(1, int(os.getenv("BOOKDB_POOL_SIZE")))
+    max_total = int(os.getenv("BOOKDB_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS))
+    return max(1, max_total // workers_per_service())
+
+
+class PooledConnection:
+    """
+    Proxy around a pymysql connection checked out of a ``ConnectionPool``.
+
+    Attribute access is forwarded to the underlying connection, so ``cursor()``,
+    ``commit()``, ``escape()`` etc. work unchanged.  ``close()`` and leaving a
+    ``with`` block return the connection to the pool instead of closing the socket.
+    """
+
+    def __init__(self, pool, conn, generation=None):
+        self._pool = pool
+        self._conn = conn
+        self._generation = generation
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise pymysql.err.InterfaceError("Connection already returned to the pool.")
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        # Safety net for callers that never close the connection
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn, self._generation)
+
+
+class ConnectionPool:
+    """
+    Process-wide, size-limited pool of pymysql connections.
+
+    Connections are created lazily up to ``max_size``.  Idle connections are reused
+    most-recently-used first, pinged before reuse when they have been idle longer than
+    ``health_check_seconds`` and closed once idle longer than ``max_idle_seconds``.
+    Any open transaction is rolled back when a connection is returned so the next
+    borrower never sees a stale InnoDB snapshot.  The rollback only undoes uncommitted
+    changes to the InnoDB tables; writes to the MyISAM tables (`book collection`,
+    `books tags`, `tag labels`) are stored as each statement runs and stay.
+
+    The pool notices when it is used from a forked child (e.g. a uWSGI worker forked
+    from the master) and starts over with fresh connections rather than sharing sockets.
+
+    Parameters
+    ----------
+    conf : dict
+        Keyword arguments for ``pymysql.connect``.
+    max_size : int, optional
+        Maximum number of open connections.  Defaults to ``default_pool_size()``.
+    max_idle_seconds : float, optional
+        Idle connections older than this are closed.
+    health_check_seconds : float, optional
+        Idle connections older than this are pinged before being handed out.
+    checkout_timeout : float, optional
+        Seconds to wait for a free connection before raising ``PoolExhaustedError``.
+    """
+
+    def __init__(self, conf, max_size=None, max_idle_seconds=None, health_check_seconds=None,
+                 checkout_timeout=None):
+        self.conf = conf
+        self.max_size = max_size if max_size is not None else default_pool_size()
+        self.max_idle_seconds = float(max_idle_seconds if max_idle_seconds is not None else
+                                      os.getenv("BOOKDB_POOL_MAX_IDLE", DEFAULT_MAX_IDLE_SECONDS))
+        self.health_check_seconds = float(health_check_seconds if health_check_seconds is not None else
+                                          os.getenv("BOOKDB_POOL_HEALTH_CHECK", DEFAULT_HEALTH_CHECK_SECONDS))
+        self.checkout_timeout = float(checkout_timeout if checkout_timeout is not None else
+                                      os.getenv("BOOKDB_POOL_TIMEOUT", DEFAULT_CHECKOUT_TIMEOUT_SECONDS))
+        self._cond = threading.Condition()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = deque()  # (connection, time returned)
+        self._open = 0
+        self._generation = 0  # bumped by close_all; older connections are closed on release
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "released": 0,
+            "discarded": 0,
+            "evicted_idle": 0,
+            "failed_health_checks": 0,
+            "waits": 0,
+            "timeouts": 0,
+        }
+
+    def _check_pid(self):
+        """Drop connections inherited across fork; they belong to the parent process."""
+        if self._pid != os.getpid():
+            app_logger.debug("Connection pool used after fork; starting with fresh connections")
+            self._reset()
+
+    def _evict_idle(self, now):
+        """Remove connections idle too long.  Caller holds the lock and closes the returned list."""
+        expired = []
+        while self._idle and now - self._idle[0][1] > self.max_idle_seconds:
+            conn, _ = self._idle.popleft()
+            expired.append(conn)
+        self._open -= len(expired)
+        self._stats["evicted_idle"] += len(expired)
+        return expired
+
+    @staticmethod
+    def _close_quietly(conns):
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def connection(self):
+        """
+        Check out a connection.
+
+        Returns
+        -------
+        PooledConnection
+            Use as a context manager or call ``close()`` to return it to the pool.
+
+        Raises
+        ------
+        PoolExhaustedError
+            If no connection is free within ``checkout_timeout`` seconds.
+        pymysql.Error
+            If a new connection cannot be opened.
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        with self._cond:
+            self._check_pid()
+            while True:
+                now = time.monotonic()
+                expired = self._evict_idle(now)
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._open < self.max_size:
+                    self._open += 1
+                    conn, returned_at = None, None
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolExhaustedError(f"No database connection available after {self.checkout_timeout}s "
+                                             f"(pool size {self.max_size})")
+                self._stats["waits"] += 1
+                self._cond.wait(remaining)
+            generation = self._generation
+        self._close_quietly(expired)
+
+        if conn is not None and time.monotonic() - returned_at > self.health_check_seconds:
+            try:
+                conn.ping(reconnect=False)
+            except pymysql.Error as e:
+                app_logger.debug(f"Pooled connection failed health check: {e}")
+                self._close_quietly([conn])
+                with self._cond:
+                    self._stats["failed_health_checks"] += 1
+                conn = None
+
+        if conn is None:
+            try:
+                conn = pymysql.connect(**self.conf)
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._stats["created"] += 1
+        else:
+            with self._cond:
+                self._stats["reused"] += 1
+        return PooledConnection(self, conn, generation)
+
+    def release(self, conn, generation=None):
+        """
+        Return a connection to the pool, discarding it if it is no longer usable or was
+        checked out before the last ``close_all`` (``generation`` is the pool generation
+        at checkout).
+        """
+        usable = True
+        try:
+            conn.rollback()
+        except Exception:
+            usable = False
+        with self._cond:
+            if self._pid != os.getpid():
+                # checked out before a fork; not ours to keep
+                return
+            self._stats["released"] += 1
+            if generation is not None and generation != self._generation:
+                usable = False
+            if usable and conn.open:
+                self._idle.append((conn, time.monotonic()))
+            else:
+                self._open -= 1
+                self._stats["discarded"] += 1
+            self._cond.notify()
+        if not usable:
+            self._close_quietly([conn])
+
+    def close_all(self):
+        """
+        Close every idle connection.  Checked-out connections are closed when returned;
+        the pool stays usable and opens new connections on demand.
+        """
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._open -= len(idle)
+            self._generation += 1
+        self._close_quietly(idle)
+
+    def stats(self):
+        """
+        Snapshot of pool counters for monitoring.
+
+        Returns
+        -------
+        dict
+            Pool configuration, current ``open``/``idle``/``in_use`` connection counts and
+            cumulative counters since the pool was created in this process.
+        """
+        with self._cond:
+            idle = len(self._idle)
+            result = {
+                "pid": self._pid,
+                "max_size": self.max_size,
+                "open": self._open,
+                "idle": idle,
+                "in_use": self._open - idle,
+                "max_idle_seconds": self.max_idle_seconds,
+                "health_check_seconds": self.health_check_seconds,
+                "checkout_timeout": self.checkout_timeout,
+            }
+            result.update(self._stats)
+        return result
@@ -0,0 +1,137 @@
+"""
+Named SQL statements shared by ``booksdb.api_util`` and the API routes.
+
+Every value is passed as a ``%s`` parameter, never formatted into the text, so each
+statement has one fixed text: MySQL sees the same digest for every call (which is what
+``performance_schema`` and the slow log aggregate on), and quoting is left to the driver.
+pymysql interpolates the parameters on the client; it has no server-side prepared
+statements (``COM_STMT_PREPARE``), so the statements are not prepared on the server.
+
+Statements reading a variable-length id list contain ``{ids}``; fill it with ``in_list``.
+"""
+
+# `book collection` columns in the order of ``api_util.table_header``
+BOOK_COLUMNS = ("BookCollectionID", "Title", "Author", "CopyrightDate", "ISBNNumber", "PublisherName",
+                "CoverType", "Pages", "Category", "Note", "Recycled", "Location", "ISBNNumber13")
+
+# columns update_book may set; LastUpdate is maintained by MySQL
+BOOK_UPDATE_COLUMNS = BOOK_COLUMNS[1:]
+
+BOOKS_BY_ID = ("SELECT " + ", ".join(f"a.{column}" for column in BOOK_COLUMNS) + " "
+               "FROM `book collection` as a WHERE a.BookCollectionID IN ({ids})")
+
+# ISBNs are matched against both columns; pass the values twice
+BOOKS_BY_ISBN = ("SELECT " + ", ".join(f"a.{column}" for column in BOOK_COLUMNS) + " "
+                 "FROM `book collection` as a WHERE a.ISBNNumber IN ({ids}) OR a.ISBNNumber13 IN ({ids}) "
+                 "ORDER BY a.BookCollectionID")
+
+READS_BY_BOOK_IDS = ("SELECT b.BookCollectionID, b.ReadDate, b.ReadNote FROM `books read` as b "
+                     "WHERE b.BookCollectionID IN ({ids}) ORDER BY b.BookCollectionID, b.ReadDate")
+
+# BookID is a varchar column; pass the ids as strings so the primary key can be used
+TAGS_BY_BOOK_IDS = ("SELECT a.BookID, b.Label FROM `books tags` as a JOIN `tag labels` as b "
+                    "ON b.TagID = a.TagID WHERE a.BookID IN ({ids}) ORDER BY a.BookID, a.TagID")
+
+COVERS_BY_BOOK_IDS = ("SELECT a.BookCollectionID, a.url FROM `images` as a "
+                      "WHERE a.BookCollectionID IN ({ids}) AND a.type = 'cover-face' ORDER BY a.id")
+
+READS_BY_BOOK = ("SELECT BookCollectionID, ReadDate, ReadNote FROM `books read` "
+                 "WHERE BookCollectionID = %s ORDER BY ReadDate ASC")
+
+INSERT_READ = "INSERT INTO `books read` (BookCollectionID, ReadDate, ReadNote) VALUES (%s, %s, %s)"
+
+UPDATE_READ_NOTE = "UPDATE `books read` SET ReadNote = %s WHERE BookCollectionID = %s AND ReadDate = %s"
+
+SUMMARY_BY_YEAR = ("SELECT YEAR(b.ReadDate) as Year, SUM(a.Pages) as Pages, COUNT(a.Pages) as Books "
+                   "FROM `book collection` as a JOIN `books read` as b "
+                   "ON a.BookCollectionID = b.BookCollectionID "
+                   "WHERE b.ReadDate is not NULL GROUP BY Year ORDER BY Year ASC")
+
+SUMMARY_FOR_YEAR = ("SELECT YEAR(b.ReadDate) as Year, SUM(a.Pages) as Pages, COUNT(a.Pages) as Books "
+                    "FROM `book collection` as a JOIN `books read` as b "
+                    "ON a.BookCollectionID = b.BookCollectionID "
+                    "WHERE b.ReadDate >= MAKEDATE(%s, 1) AND b.ReadDate < MAKEDATE(%s + 1, 1) "
+                    "GROUP BY Year ORDER BY Year ASC")
+
+TAGS_SEARCH = ("SELECT a.BookID, b.TagID, b.Label as Tag FROM `books tags` a JOIN `tag labels` b "
+               "ON a.TagID = b.TagID WHERE b.Label LIKE %s ORDER BY b.Label ASC")
+
+BOOK_TAGS = ("SELECT a.Label as Tag FROM `tag labels` a JOIN `books tags` b ON a.TagID = b.TagID "
+             "WHERE b.BookID = %s ORDER BY Tag")
+
+INSERT_TAG_LABEL = "INSERT IGNORE INTO `tag labels` SET Label = %s"
+
+TAG_ID_BY_LABEL = "SELECT TagID FROM `tag labels` WHERE Label = %s"
+
+INSERT_BOOK_TAG = "INSERT INTO `books tags` (BookID, TagID) VALUES (%s, %s)"
+
+RENAME_TAG_LABEL = "UPDATE `tag labels` SET Label = %s WHERE Label = %s"
+
+DAILY_PAGE_RECORDS = ("SELECT a.RecordDate, a.page FROM `daily page records` a "
+                      "WHERE a.RecordID = %s ORDER BY a.RecordDate ASC")
+
+INSERT_DAILY_PAGE = "INSERT INTO `daily page records` (RecordID, RecordDate, page) VALUES (%s, %s, %s)"
+
+ESTIMATE_START = "SELECT StartDate, LastReadablePage FROM `complete date estimates` WHERE RecordID = %s"
+
+ESTIMATE_BOOK = "SELECT BookCollectionID FROM `complete date estimates` WHERE RecordID = %s"
+
+ESTIMATES_BY_BOOK = ("SELECT RecordID, StartDate, LastReadablePage, EstimatedFinishDate "
+                     "FROM `complete date estimates` WHERE BookCollectionID = %s ORDER BY StartDate ASC")
+
+DAILY_PAGES_BY_RECORD_IDS = ("SELECT RecordID, RecordDate, page FROM `daily page records` "
+                             "WHERE RecordID IN ({ids}) ORDER BY RecordID, RecordDate ASC")
+
+INSERT_ESTIMATE = ("INSERT INTO `complete date estimates` (BookCollectionID, StartDate, LastReadablePage) "
+                   "VALUES (%s, %s, %s)")
+
+UPDATE_ESTIMATE = "UPDATE `complete date estimates` SET EstimateDate = %s, EstimatedFinishDate = %s WHERE RecordID = %s"
+
+INSERT_IMAGE = "INSERT INTO `images` (BookCollectionID, name, url, type) VALUES (%s, %s, %s, %s)"
+
+
+def in_list(statement, values):
+    """
+    ``statement`` with its ``{ids}`` replaced by one placeholder per value.
+
+    Parameters
+    ----------
+    statement : str
+        One of the ``*_BY_*_IDS`` statements.
+    values : sequence
+        The ids; must not be empty.
+
+    Returns
+    -------
+    str
+        The statement, to be executed with ``values`` as its parameters.
+    """
+    return statement.format(ids=", ".join(["%s"] * len(values)))
+
+
+def update_book(columns):
+    """
+    ``UPDATE `book collection``` statement setting ``columns`` of one book.
+
+    Parameters
+    ----------
+    columns : iterable of str
+        Columns to set, in the order of the parameters; each must be one of
+        ``BOOK_UPDATE_COLUMNS``.  The last parameter is the BookCollectionID.
+
+    Returns
+    -------
+    str
+        The statement.
+
+    Raises
+    ------
+    ValueError
+        If ``columns`` is empty or holds a column that may not be updated.
+    """
+    columns = list(columns)
+    unknown = [column for column in columns if column not in BOOK_UPDATE_COLUMNS]
+    if unknown or not columns:
+        raise ValueError(f"Cannot update column(s): {', '.join(map(str, unknown)) or 'none given'}")
+    return ("UPDATE `book collection` SET " + ", ".join(f"{column} = %s" for column in columns) +
+            " WHERE BookCollectionID = %s")
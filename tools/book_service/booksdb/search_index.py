@@ -0,0 +1,388 @@
+import logging
+import os
+import datetime
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+
+import pymysql
+
+app_logger = logging.getLogger('flask.app')
+
+# Seconds between fingerprint checks against the database; override per deployment
+DEFAULT_REFRESH_TTL_SECONDS = 5
+
+# Incremental reloads re-read rows stamped up to this many seconds before the previous
+# watermark: a LastUpdate is set when a row is written, not when its transaction commits,
+# so a slow commit can land below a watermark that was read in the meantime.
+REFRESH_OVERLAP_SECONDS = 60
+
+NGRAM = 3
+
+# book collection columns in table_header order, followed by LastUpdate
+BOOK_COLUMNS = ("BookCollectionID, Title, Author, CopyrightDate, ISBNNumber, PublisherName, CoverType, "
+                "Pages, Category, Note, Recycled, Location, ISBNNumber13, LastUpdate")
+
+# searchable text columns and their position in a book row
+TEXT_FIELDS = {
+    "Title": 1,
+    "Author": 2,
+    "ISBNNumber": 4,
+    "PublisherName": 5,
+    "Category": 8,
+    "Note": 9,
+    "Location": 11,
+    "ISBNNumber13": 12,
+}
+
+
+def fold(value):
+    """
+    Normalize text the way a ``*_general_ci`` collation compares it.
+
+    Case is folded and combining accents are dropped, so ``"Émile"`` and ``"emile"``
+    compare equal, matching ``LIKE`` against the utf8mb3 ``book collection`` columns.
+    """
+    if value is None:
+        return None
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def _ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class NgramPostings:
+    """
+    Substring index over folded strings keyed by an integer id.
+
+    Each value is split into overlapping trigrams with a posting set of ids per gram.
+    A substring query intersects the postings of its own trigrams and then verifies the
+    candidates against the stored text, so results are exact.  Queries shorter than a
+    trigram scan the stored values directly.
+    """
+
+    def __init__(self):
+        self.text = {}
+        self.postings = defaultdict(set)
+
+    def add(self, key, value):
+        self.remove(key)
+        folded = fold(value)
+        if folded is None:
+            return
+        self.text[key] = folded
+        for gram in _ngrams(folded):
+            self.postings[gram].add(key)
+
+    def remove(self, key):
+        folded = self.text.pop(key, None)
+        if folded is None:
+            return
+        for gram in _ngrams(folded):
+            ids = self.postings.get(gram)
+            if ids is not None:
+                ids.discard(key)
+                if not ids:
+                    del self.postings[gram]
+
+    def search(self, substring):
+        """Ids whose value contains ``substring`` (already folded).  NULL values never match."""
+        if len(substring) < NGRAM:
+            return {key for key, text in self.text.items() if substring in text}
+        candidates = None
+        for gram in sorted(_ngrams(substring), key=lambda g: len(self.postings.get(g, ()))):
+            ids = self.postings.get(gram)
+            if not ids:
+                return set()
+            candidates = set(ids) if candidates is None else candidates & ids
+        return {key for key in candidates if substring in self.text[key]}
+
+
+class BookSearchIndex:
+    """
+    In-process search index that answers ``books_search_utility`` without a table scan.
+
+    Holds every `book collection` row, the read dates from `books read` and the tag
+    assignments from `books tags`/`tag labels`, with trigram postings for the
+    searchable text columns and tag labels.  ``search`` reproduces the rows and
+    ``ORDER BY a.Author, a.Title`` ordering of the SQL query, returning None whenever a
+    request uses a key or a ``LIKE`` wildcard it cannot answer exactly so the caller can
+    fall back to the database.
+
+    Changes are picked up incrementally: at most once every ``ttl_seconds`` a single
+    fingerprint query reads ``MAX(LastUpdate)``/``COUNT(*)`` for each table, rows with
+    ``LastUpdate`` at or after ``REFRESH_OVERLAP_SECONDS`` before the previous watermark
+    are re-read, and a table is reloaded in full only when its row count no longer
+    matches (deletes).  A table keeps being re-read this way until its watermark is
+    older than the overlap, so a late commit that leaves the fingerprint unchanged is
+    still picked up.  `tag labels`
+    has no ``LastUpdate`` column and is reloaded whenever its count or label checksum
+    changes.
+
+    Parameters
+    ----------
+    pool : booksdb.db_pool.ConnectionPool
+        Pool used for the fingerprint and load queries.
+    ttl_seconds : float, optional
+        Minimum seconds between fingerprint checks.  Defaults to
+        ``BOOKDB_SEARCH_INDEX_TTL`` or 5.
+    """
+
+    fingerprint_query = ("SELECT "
+                         "(SELECT MAX(LastUpdate) FROM `book collection`), "
+                         "(SELECT COUNT(*) FROM `book collection`), "
+                         "(SELECT MAX(LastUpdate) FROM `books read`), "
+                         "(SELECT COUNT(*) FROM `books read`), "
+                         "(SELECT MAX(LastUpdate) FROM `books tags`), "
+                         "(SELECT COUNT(*) FROM `books tags`), "
+                         "(SELECT COUNT(*) FROM `tag labels`), "
+                         "(SELECT SUM(CRC32(Label)) FROM `tag labels`), "
+                         "NOW();")
+
+    def __init__(self, pool, ttl_seconds=None):
+        self.pool = pool
+        self.ttl_seconds = float(ttl_seconds if ttl_seconds is not None else
+                                 os.getenv("BOOKDB_SEARCH_INDEX_TTL", DEFAULT_REFRESH_TTL_SECONDS))
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._checked_at = None
+        self._fingerprint = None
+        self._books = {}  # BookCollectionID -> row tuple in table_header order
+        self._reads = defaultdict(set)  # BookCollectionID -> {ReadDate}
+        self._read_count = 0
+        self._book_tags = set()  # (BookID, TagID) as stored
+        self._tag_books = defaultdict(set)  # TagID -> {BookCollectionID}
+        self._tag_labels = NgramPostings()  # TagID -> label
+        self._fields = {name: NgramPostings() for name in TEXT_FIELDS}
+        self._rank = None  # BookCollectionID -> position in Author, Title order
+
+    def invalidate(self):
+        """Force a fingerprint check on the next search."""
+        with self._lock:
+            self._checked_at = None
+
+    # ------------------------------------------------------------------ loading
+
+    @staticmethod
+    def _changed_since(fp, old, i):
+        """
+        Watermark to re-read table ``i`` (its MAX(LastUpdate)/COUNT(*) pair at ``fp[i:i + 2]``)
+        from, or False if it cannot have changed since ``old``.
+        """
+        overlap = datetime.timedelta(seconds=REFRESH_OVERLAP_SECONDS)
+        if old[i] is None:
+            return None if fp[i:i + 2] != old[i:i + 2] else False
+        if fp[i:i + 2] == old[i:i + 2] and fp[-1] - old[i] > overlap:
+            return False
+        return old[i] - overlap
+
+    def _set_book(self, row):
+        book_id = row[0]
+        self._books[book_id] = tuple(row)
+        for name, pos in TEXT_FIELDS.items():
+            self._fields[name].add(book_id, row[pos])
+
+    def _load_books(self, c, since=None):
+        if since is None:
+            c.execute(f"SELECT {BOOK_COLUMNS} FROM `book collection`;")
+            self._books = {}
+            self._fields = {name: NgramPostings() for name in TEXT_FIELDS}
+        else:
+            c.execute(f"SELECT {BOOK_COLUMNS} FROM `book collection` WHERE LastUpdate >= %s;", (since,))
+        rows = c.fetchall()
+        for row in rows:
+            self._set_book(row[:-1])
+        self._rank = None
+        return len(rows)
+
+    def _load_reads(self, c, since=None):
+        if since is None:
+            c.execute("SELECT BookCollectionID, ReadDate FROM `books read`;")
+            self._reads = defaultdict(set)
+            self._read_count = 0
+        else:
+            c.execute("SELECT BookCollectionID, ReadDate FROM `books read` WHERE LastUpdate >= %s;", (since,))
+        for book_id, read_date in c.fetchall():
+            if read_date not in self._reads[book_id]:
+                self._reads[book_id].add(read_date)
+                self._read_count += 1
+
+    def _load_book_tags(self, c, since=None):
+        if since is None:
+            c.execute("SELECT BookID, TagID FROM `books tags`;")
+            self._book_tags = set()
+            self._tag_books = defaultdict(set)
+        else:
+            c.execute("SELECT BookID, TagID FROM `books tags` WHERE LastUpdate >= %s;", (since,))
+        for book_id, tag_id in c.fetchall():
+            self._book_tags.add((book_id, tag_id))
+            self._tag_books[tag_id].add(int(book_id))
+
+    def _load_tag_labels(self, c):
+        c.execute("SELECT TagID, Label FROM `tag labels`;")
+        self._tag_labels = NgramPostings()
+        for tag_id, label in c.fetchall():
+            self._tag_labels.add(tag_id, label)
+
+    def refresh(self, force=False):
+        """
+        Bring the index up to date with the database.
+
+        Parameters
+        ----------
+        force : bool, optional
+            Reload every table instead of applying incremental changes.
+
+        Returns
+        -------
+        bool
+            True if the index is usable, False if it has never loaded successfully.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if (not force and self._loaded and self._checked_at is not None
+                    and now - self._checked_at < self.ttl_seconds):
+                return True
+            try:
+                with self.pool.connection() as db:
+                    c = db.cursor()
+                    c.execute(self.fingerprint_query)
+                    fp = tuple(c.fetchall()[0])
+                    old = self._fingerprint if self._loaded and not force else None
+                    if old is None:
+                        app_logger.debug("Loading book search index")
+                        self._load_books(c)
+                        self._load_reads(c)
+                        self._load_book_tags(c)
+                        self._load_tag_labels(c)
+                    else:
+                        since = self._changed_since(fp, old, 0)
+                        if since is not False:
+                            self._load_books(c, since)
+                            if len(self._books) != fp[1]:
+                                self._load_books(c)
+                        since = self._changed_since(fp, old, 2)
+                        if since is not False:
+                            self._load_reads(c, since)
+                            if self._read_count != fp[3]:
+                                self._load_reads(c)
+                        since = self._changed_since(fp, old, 4)
+                        if since is not False:
+                            self._load_book_tags(c, since)
+                            if len(self._book_tags) != fp[5]:
+                                self._load_book_tags(c)
+                        if fp[6:8] != old[6:8]:
+                            self._load_tag_labels(c)
+            except pymysql.Error as e:
+                app_logger.error(e)
+                if not self._loaded:
+                    return False
+            else:
+                self._fingerprint = fp
+                self._loaded = True
+                self._checked_at = now
+            return True
+
+    # ------------------------------------------------------------------ searching
+
+    @staticmethod
+    def row_key(author, title, book_id, read_date):
+        """
+        Sort key of a result row, matching the keyset order of a paged search.
+
+        ``ORDER BY IFNULL(a.Author, ''), IFNULL(a.Title, ''), a.BookCollectionID,
+        IFNULL(b.ReadDate, '1000-01-01')`` under a case-insensitive collation.
+        """
+        return (fold(author) or "", fold(title) or "", int(book_id),
+                "1000-01-01" if read_date is None else str(read_date))
+
+    def _ranking(self):
+        if self._rank is None:
+            def sort_key(book_id):
+                row = self._books[book_id]
+                return self.row_key(row[2], row[1], book_id, None)[:3]
+            order = sorted(self._books, key=sort_key)
+            self._rank = {book_id: i for i, book_id in enumerate(order)}
+        return self._rank
+
+    def _match(self, key, value):
+        """Set of matching BookCollectionIDs for one criterion, or None if unsupported."""
+        value = "" if value is None else str(value)
+        if any(ch in value for ch in '%_\\"'):
+            # LIKE wildcards, escapes and quoting are left to MySQL
+            return None
+        if key == "BookCollectionID":
+            if not value.strip().isdigit():
+                return None
+            book_id = int(value)
+            return {book_id} if book_id in self._books else set()
+        if key == "ReadDate":
+            # filters joined read rows rather than books; applied in search()
+            return {book_id for book_id, dates in self._reads.items()
+                    if book_id in self._books and any(value in str(d) for d in dates)}
+        if key == "Tags":
+            # tags_search_utility lower-cases and strips the match string
+            ids = set()
+            for tag_id in self._tag_labels.search(fold(value.lower().strip())):
+                ids |= self._tag_books.get(tag_id, set())
+            return ids & self._books.keys()
+        if key in self._fields:
+            return self._fields[key].search(fold(value))
+        return None
+
+    def search(self, args):
+        """
+        Answer a ``books_search_utility`` request from the index.
+
+        Parameters
+        ----------
+        args : dict
+            Search criteria as accepted by ``books_search_utility``.
+
+        Returns
+        -------
+        tuple or None
+            Rows of ``table_header`` columns plus ``ReadDate``, one per read (or one with
+            ``ReadDate`` None for unread books), ordered by Author and Title.  None if the
+            index is unavailable or the request needs the SQL path.
+        """
+        with self._lock:
+            if not self.refresh():
+                return None
+            matched = None
+            read_date_filters = []
+            for key in args:
+                ids = self._match(key, args.get(key))
+                if ids is None:
+                    return None
+                if key == "ReadDate":
+                    read_date_filters.append(str(args.get(key)))
+                matched = ids if matched is None else matched & ids
+            rank = self._ranking()
+            book_ids = sorted(rank if matched is None else matched, key=rank.__getitem__)
+            rows = []
+            for book_id in book_ids:
+                book = self._books[book_id]
+                dates = self._reads.get(book_id)
+                if dates and read_date_filters:
+                    dates = [d for d in dates if all(f in str(d) for f in read_date_filters)]
+                if dates:
+                    rows.extend(book + (d,) for d in sorted(dates))
+                else:
+                    rows.append(book + (None,))
+            return tuple(rows)
+
+    def stats(self):
+        """Sizes of the indexed collections, for monitoring."""
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "books": len(self._books),
+                "reads": self._read_count,
+                "book_tags": len(self._book_tags),
+                "tag_labels": len(self._tag_labels.text),
+                "ngrams": sum(len(f.postings) for f in self._fields.values()),
+            }
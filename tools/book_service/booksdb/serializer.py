@@ -0,0 +1,92 @@
+import datetime
+import json
+import logging
+import os
+from decimal import Decimal
+
+app_logger = logging.getLogger('flask.app')
+
+FMT = "%Y-%m-%d"
+
+# "json" (standard library, default) or "orjson" (optional package, compact output)
+JSON_ENCODERS = ("json", "orjson")
+
+
+def json_default(value):
+    """
+    Encode the database types the JSON encoders do not handle natively.
+
+    ``Decimal`` becomes a float and ``datetime.date``/``datetime.datetime`` a
+    ``YYYY-MM-DD`` string, exactly as ``_convert_db_types`` does, but the hook is only
+    called for those cells instead of every cell of every row.
+
+    Raises
+    ------
+    TypeError
+        For any other type, as the encoders expect.
+    """
+    if isinstance(value, datetime.date):
+        if value.year < 1000:
+            return value.strftime(FMT)
+        # isoformat is much faster than strftime and identical for four digit years
+        return (value.date() if isinstance(value, datetime.datetime) else value).isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, default=json_default)
+
+
+def _load_encoder(name):
+    """
+    Return the ``dumps`` function for encoder ``name``.
+
+    Falls back to the standard library, with a warning, if orjson is requested but
+    not installed.
+    """
+    if name == "orjson":
+        try:
+            import orjson
+        except ImportError:
+            app_logger.warning("BOOKDB_JSON_ENCODER=orjson but orjson is not installed; using json")
+        else:
+            # dates go through json_default so they keep the YYYY-MM-DD format
+            options = orjson.OPT_PASSTHROUGH_DATETIME
+
+            def _orjson_dumps(obj):
+                return orjson.dumps(obj, default=json_default, option=options)
+
+            return _orjson_dumps
+    elif name != "json":
+        app_logger.warning(f"Unknown BOOKDB_JSON_ENCODER {name}; using json")
+    return _stdlib_dumps
+
+
+_dumps = _load_encoder(os.getenv("BOOKDB_JSON_ENCODER", "json"))
+
+
+def set_json_encoder(name):
+    """Switch the encoder used by ``json_dumps`` (``"json"`` or ``"orjson"``)."""
+    global _dumps
+    _dumps = _load_encoder(name)
+
+
+def json_dumps(obj):
+    """
+    Serialize ``obj`` with the configured encoder (``BOOKDB_JSON_ENCODER``).
+
+    Returns
+    -------
+    str or bytes
+        ``str`` from the standard library encoder, UTF-8 ``bytes`` from orjson; both
+        can be used directly as a Flask response body and with ``resp_header``.
+    """
+    return _dumps(obj)
+
+
+def json_text(obj):
+    """Like ``json_dumps`` but always returns ``str`` (for streamed responses)."""
+    result = json_dumps(obj)
+    return result.decode("utf-8") if isinstance(result, bytes) else result
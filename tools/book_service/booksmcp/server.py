@@ -27,6 +27,7 @@ import json
 import logging
 import os
 import sys
+from decimal import Decimal
 from pathlib import Path
 from typing import Any
 
@@ -48,6 +49,8 @@ logger = logging.getLogger(__name__)
 # Create FastMCP server with streamable HTTP support
 port = int(os.getenv("PORT", "3002"))
 host = os.getenv("HOST", "0.0.0.0")
+# default page size for search tools so large result sets are never returned whole
+search_limit = int(os.getenv("MCP_SEARCH_LIMIT", "100"))
 mcp = FastMCP(
     "booksmcp-service",
     dependencies=["pymysql", "numpy"],
@@ -60,7 +63,8 @@ mcp = FastMCP(
 # Helper Function: Execute Book Search
 # ============================================================================
 
-def _execute_book_search(params: dict) -> str:
+def _execute_book_search(params: dict, mode: str | None = None, limit: int | None = None,
+                         cursor: str | None = None) -> str:
     """
     Internal helper function to execute book search via booksdb API.
 
@@ -69,13 +73,18 @@ def _execute_book_search(params: dict) -> str:
 
     Args:
         params: Dictionary of search parameters matching booksdb field names
+        mode: Optional search mode: "like" (default), "fulltext" or "boolean"
+        limit: Page size; defaults to MCP_SEARCH_LIMIT (100), at most 1000
+        cursor: next_cursor from a previous page
 
     Returns:
-        JSON string with search results including count and book details
+        JSON string with search results including count, book details and
+        next_cursor (null on the last page)
     """
     try:
+        limit = min(max(int(limit or search_limit), 1), api_util.SEARCH_LIMIT_MAX)
         # Call the books_search_utility from booksdb
-        data_rows, raw_data, header, error_list = api_util.books_search_utility(params)
+        data_rows, raw_data, header, error_list = api_util.books_search_utility(params, mode, limit, cursor)
 
         if error_list:
             return json.dumps({
@@ -95,13 +104,21 @@ def _execute_book_search(params: dict) -> str:
                         # Convert datetime objects to strings
                         if hasattr(value, 'strftime'):
                             value = value.strftime("%Y-%m-%d")
+                        # FULLTEXT Relevance is a DECIMAL
+                        elif isinstance(value, Decimal):
+                            value = float(value)
                         book[col_name] = value
                 results.append(book)
 
+        next_cursor = None
+        if data_rows and len(data_rows) == limit:
+            next_cursor = api_util.encode_search_cursor(data_rows[-1], header)
+
         return json.dumps({
             "query": params,
             "count": len(results),
-            "results": results
+            "results": results,
+            "next_cursor": next_cursor
         }, indent=2)
 
     except Exception as e:
@@ -118,7 +135,7 @@ def _execute_book_search(params: dict) -> str:
 # ============================================================================
 
 @mcp.tool()
-def search_books_by_title(title: str) -> str:
+def search_books_by_title(title: str, mode: str = "like", limit: int | None = None, cursor: str | None = None) -> str:
     """
     Search the Hendrickson Book Collection by book title.
 
@@ -133,15 +150,22 @@ def search_books_by_title(title: str) -> str:
     - Performs partial string matching against the Title field in the books database
     - Case-insensitive search
     - Returns all books where the title contains the search string
+    - mode="fulltext" uses the Title FULLTEXT index (natural language matching) and
+      ranks results by a Relevance score; mode="boolean" accepts MySQL boolean syntax
+      such as +word -word "exact phrase" prefix*
+    - Words shorter than 4 characters fall back to partial string matching
 
     Args:
         title: Book title or partial title to search for
+        mode: "like" (default), "fulltext" or "boolean"
+        limit: Maximum number of books to return (default 100, at most 1000)
+        cursor: next_cursor value from a previous result, to fetch the following page
 
     Returns:
-        JSON string with count and array of matching books with full details
+        JSON string with count, array of matching books with full details and next_cursor
     """
-    logger.info(f"Search books by title: {title}")
-    return _execute_book_search({"Title": title})
+    logger.info(f"Search books by title: {title} (mode={mode})")
+    return _execute_book_search({"Title": title}, mode, limit, cursor)
 
 
 # ============================================================================
@@ -149,7 +173,7 @@ def search_books_by_title(title: str) -> str:
 # ============================================================================
 
 @mcp.tool()
-def search_books_by_author(author: str) -> str:
+def search_books_by_author(author: str, mode: str = "like", limit: int | None = None, cursor: str | None = None) -> str:
     """
     Search the Hendrickson Book Collection by author name.
 
@@ -164,15 +188,22 @@ def search_books_by_author(author: str) -> str:
     - Performs partial string matching against the Author field in the books database
     - Case-insensitive search
     - Returns all books where the author name contains the search string
+    - mode="fulltext" uses the Author FULLTEXT index (natural language matching) and
+      ranks results by a Relevance score; mode="boolean" accepts MySQL boolean syntax
+      such as +word -word "exact phrase" prefix*
+    - Words shorter than 4 characters fall back to partial string matching
 
     Args:
         author: Author name or partial name to search for
+        mode: "like" (default), "fulltext" or "boolean"
+        limit: Maximum number of books to return (default 100, at most 1000)
+        cursor: next_cursor value from a previous result, to fetch the following page
 
     Returns:
-        JSON string with count and array of matching books with full details
+        JSON string with count, array of matching books with full details and next_cursor
     """
-    logger.info(f"Search books by author: {author}")
-    return _execute_book_search({"Author": author})
+    logger.info(f"Search books by author: {author} (mode={mode})")
+    return _execute_book_search({"Author": author}, mode, limit, cursor)
 
 
 # ============================================================================
@@ -180,7 +211,7 @@ def search_books_by_author(author: str) -> str:
 # ============================================================================
 
 @mcp.tool()
-def search_books_by_isbn(isbn: str) -> str:
+def search_books_by_isbn(isbn: str, limit: int | None = None, cursor: str | None = None) -> str:
     """
     Search the Hendrickson Book Collection by ISBN-10 number.
 
@@ -198,12 +229,14 @@ def search_books_by_isbn(isbn: str) -> str:
 
     Args:
         isbn: ISBN-10 number (full or partial) to search for
+        limit: Maximum number of books to return (default 100, at most 1000)
+        cursor: next_cursor value from a previous result, to fetch the following page
 
     Returns:
-        JSON string with count and array of matching books with full details
+        JSON string with count, array of matching books with full details and next_cursor
     """
     logger.info(f"Search books by ISBN: {isbn}")
-    return _execute_book_search({"ISBNNumber": isbn})
+    return _execute_book_search({"ISBNNumber": isbn}, None, limit, cursor)
 
 
 # ============================================================================
@@ -211,7 +244,7 @@ def search_books_by_isbn(isbn: str) -> str:
 # ============================================================================
 
 @mcp.tool()
-def search_books_by_isbn13(isbn13: str) -> str:
+def search_books_by_isbn13(isbn13: str, limit: int | None = None, cursor: str | None = None) -> str:
     """
     Search the Hendrickson Book Collection by ISBN-13 number.
 
@@ -229,12 +262,14 @@ def search_books_by_isbn13(isbn13: str) -> str:
 
     Args:
         isbn13: ISBN-13 number (full or partial) to search for
+        limit: Maximum number of books to return (default 100, at most 1000)
+        cursor: next_cursor value from a previous result, to fetch the following page
 
     Returns:
-        JSON string with count and array of matching books with full details
+        JSON string with count, array of matching books with full details and next_cursor
     """
     logger.info(f"Search books by ISBN-13: {isbn13}")
-    return _execute_book_search({"ISBNNumber13": isbn13})
+    return _execute_book_search({"ISBNNumber13": isbn13}, None, limit, cursor)
 
 
 # ============================================================================
@@ -242,7 +277,7 @@ def search_books_by_isbn13(isbn13: str) -> str:
 # ============================================================================
 
 @mcp.tool()
-def search_books_by_publisher(publisher: str) -> str:
+def search_books_by_publisher(publisher: str, limit: int | None = None, cursor: str | None = None) -> str:
     """
     Search the Hendrickson Book Collection by publisher name.
 
@@ -260,12 +295,14 @@ def search_books_by_publisher(publisher: str) -> str:
 
     Args:
         publisher: Publisher name or partial name to search for
+        limit: Maximum number of books to return (default 100, at most 1000)
+        cursor: next_cursor value from a previous result, to fetch the following page
 
     Returns:
-        JSON string with count and array of matching books with full details
+        JSON string with count, array of matching books with full details and next_cursor
     """
     logger.info(f"Search books by publisher: {publisher}")
-    return _execute_book_search({"PublisherName": publisher})
+    return _execute_book_search({"PublisherName": publisher}, None, limit, cursor)
 
 
 # ============================================================================
@@ -273,7 +310,7 @@ def search_books_by_publisher(publisher: str) -> str:
 # ============================================================================
 
 @mcp.tool()
-def search_books_by_category(category: str) -> str:
+def search_books_by_category(category: str, limit: int | None = None, cursor: str | None = None) -> str:
     """
     Search the Hendrickson Book Collection by category.
 
@@ -291,12 +328,14 @@ def search_books_by_category(category: str) -> str:
 
     Args:
         category: Category name or partial name to search for
+        limit: Maximum number of books to return (default 100, at most 1000)
+        cursor: next_cursor value from a previous result, to fetch the following page
 
     Returns:
-        JSON string with count and array of matching books with full details
+        JSON string with count, array of matching books with full details and next_cursor
     """
     logger.info(f"Search books by category: {category}")
-    return _execute_book_search({"Category": category})
+    return _execute_book_search({"Category": category}, None, limit, cursor)
 
 
 # ============================================================================
@@ -304,7 +343,7 @@ def search_books_by_category(category: str) -> str:
 # ============================================================================
 
 @mcp.tool()
-def search_books_by_location(location: str) -> str:
+def search_books_by_location(location: str, limit: int | None = None, cursor: str | None = None) -> str:
     """
     Search the Hendrickson Book Collection by physical location.
 
@@ -322,12 +361,14 @@ def search_books_by_location(location: str) -> str:
 
     Args:
         location: Location name or partial name to search for
+        limit: Maximum number of books to return (default 100, at most 1000)
+        cursor: next_cursor value from a previous result, to fetch the following page
 
     Returns:
-        JSON string with count and array of matching books with full details
+        JSON string with count, array of matching books with full details and next_cursor
     """
     logger.info(f"Search books by location: {location}")
-    return _execute_book_search({"Location": location})
+    return _execute_book_search({"Location": location}, None, limit, cursor)
 
 
 # ============================================================================
@@ -335,7 +376,7 @@ def search_books_by_location(location: str) -> str:
 # ============================================================================
 
 @mcp.tool()
-def search_books_by_tags(tags: str) -> str:
+def search_books_by_tags(tags: str, limit: int | None = None, cursor: str | None = None) -> str:
     """
     Search the Hendrickson Book Collection by associated tags.
 
@@ -354,12 +395,14 @@ def search_books_by_tags(tags: str) -> str:
 
     Args:
         tags: Tag name or partial tag to search for
+        limit: Maximum number of books to return (default 100, at most 1000)
+        cursor: next_cursor value from a previous result, to fetch the following page
 
     Returns:
-        JSON string with count and array of matching books with full details
+        JSON string with count, array of matching books with full details and next_cursor
     """
     logger.info(f"Search books by tags: {tags}")
-    return _execute_book_search({"Tags": tags})
+    return _execute_book_search({"Tags": tags}, None, limit, cursor)
 
 
 # ============================================================================
@@ -367,7 +410,7 @@ def search_books_by_tags(tags: str) -> str:
 # ============================================================================
 
 @mcp.tool()
-def search_books_by_read_date(read_date: str) -> str:
+def search_books_by_read_date(read_date: str, limit: int | None = None, cursor: str | None = None) -> str:
     """
     Search the Hendrickson Book Collection by the date the book was read.
 
@@ -385,12 +428,14 @@ def search_books_by_read_date(read_date: str) -> str:
 
     Args:
         read_date: Date or partial date in YYYY-MM-DD format
+        limit: Maximum number of books to return (default 100, at most 1000)
+        cursor: next_cursor value from a previous result, to fetch the following page
 
     Returns:
-        JSON string with count and array of matching books with full details
+        JSON string with count, array of matching books with full details and next_cursor
     """
     logger.info(f"Search books by read date: {read_date}")
-    return _execute_book_search({"ReadDate": read_date})
+    return _execute_book_search({"ReadDate": read_date}, None, limit, cursor)
 
 
 # ============================================================================
@@ -414,47 +459,47 @@ async def server_info(request: Request) -> dict[str, Any]:
             {
                 "name": "search_books_by_title",
                 "description": "Search books by title",
-                "parameters": ["title"]
+                "parameters": ["title", "mode", "limit", "cursor"]
             },
             {
                 "name": "search_books_by_author",
                 "description": "Search books by author name",
-                "parameters": ["author"]
+                "parameters": ["author", "mode", "limit", "cursor"]
             },
             {
                 "name": "search_books_by_isbn",
                 "description": "Search books by ISBN-10",
-                "parameters": ["isbn"]
+                "parameters": ["isbn", "limit", "cursor"]
             },
             {
                 "name": "search_books_by_isbn13",
                 "description": "Search books by ISBN-13",
-                "parameters": ["isbn13"]
+                "parameters": ["isbn13", "limit", "cursor"]
             },
             {
                 "name": "search_books_by_publisher",
                 "description": "Search books by publisher name",
-                "parameters": ["publisher"]
+                "parameters": ["publisher", "limit", "cursor"]
             },
             {
                 "name": "search_books_by_category",
                 "description": "Search books by category",
-                "parameters": ["category"]
+                "parameters": ["category", "limit", "cursor"]
             },
             {
                 "name": "search_books_by_location",
                 "description": "Search books by physical location",
-                "parameters": ["location"]
+                "parameters": ["location", "limit", "cursor"]
             },
             {
                 "name": "search_books_by_tags",
                 "description": "Search books by associated tags",
-                "parameters": ["tags"]
+                "parameters": ["tags", "limit", "cursor"]
             },
             {
                 "name": "search_books_by_read_date",
                 "description": "Search books by read date",
-                "parameters": ["read_date"]
+                "parameters": ["read_date", "limit", "cursor"]
             }
         ],
         "examples": {
@@ -472,6 +517,17 @@ async def health_check(request: Request) -> PlainTextResponse:
     return PlainTextResponse("OK")
 
 
+@mcp.custom_route("/pool_stats", methods=["GET"])
+async def pool_stats(request: Request) -> JSONResponse:
+    """
+    Report database connection pool statistics.
+
+    Returns:
+        JSON object with pool size, open/idle/in-use counts and cumulative counters
+    """
+    return JSONResponse({"pool_stats": api_util.books_pool.stats()})
+
+
 # ============================================================================
 # Main Entry Point
 # ============================================================================
@@ -488,6 +544,7 @@ def main():
     logger.info("Endpoints:")
     logger.info(f"  GET  http://{host}:{port}/health - Health check")
     logger.info(f"  GET  http://{host}:{port}/info   - Server information")
+    logger.info(f"  GET  http://{host}:{port}/pool_stats - Database pool statistics")
     logger.info(f"  *    http://{host}:{port}/mcp    - MCP protocol endpoint")
     logger.info("")
     logger.info("Tools:")
@@ -502,6 +559,10 @@ def main():
     logger.info("  search_books_by_read_date - Search books by read date")
     logger.info("=" * 70)
 
+    if api_util.search_index is not None:
+        logger.info("Loading book search index (BOOKDB_SEARCH_INDEX=1)")
+        api_util.search_index.refresh()
+
     # Run with streamable HTTP transport
     mcp.run(transport="streamable-http")
 
@@ -1,8 +1,11 @@
 import datetime
+import json
 import unittest
 from decimal import Decimal
+from unittest import mock
 
 from booksdb import api_util as au
+from booksdb.search_index import BookSearchIndex
 
 
 class TestAppUtilityFunctions(unittest.TestCase):
@@ -27,6 +30,15 @@ class TestAppUtilityFunctions(unittest.TestCase):
         self.assertTrue(h[0] == 'Location')
         self.assertTrue(e is None)
 
+    def test_connection_pool(self):
+        before = au.books_pool.stats()
+        au.get_valid_locations()
+        au.get_valid_locations()
+        after = au.books_pool.stats()
+        self.assertEqual(after["in_use"], 0)
+        self.assertLessEqual(after["open"], after["max_size"])
+        self.assertGreater(after["reused"], before["reused"])
+
     def test_sort_by_indexes(self):
         lst = [1, 2, 3, 4, 5]
         indexes = [4, 3, 2, 1, 0]
@@ -51,6 +63,14 @@ class TestAppUtilityFunctions(unittest.TestCase):
         ]
         self.assertEqual(response_header, expected_header)
 
+    def test_table_fingerprint(self):
+        tables = ("book collection", "books read", "tag labels")
+        fingerprint = au.table_fingerprint(tables)
+        self.assertEqual(len(fingerprint.split("|")), 3)
+        self.assertEqual(au.table_fingerprint(tables), fingerprint)
+        with self.assertRaises(KeyError):
+            au.table_fingerprint(["no such table"])
+
     def test_summary_books_read_by_year(self):
         res, res1, header, error = au.summary_books_read_by_year_utility(target_year=1966)
         self.assertEqual(len(res[0]), 3)
@@ -58,6 +78,19 @@ class TestAppUtilityFunctions(unittest.TestCase):
         print(str(res[0]))
         self.assertEqual(str(res[0]), """(1966, Decimal('2527'), 13)""")
 
+    def test_reading_summary(self):
+        months, error = au.rebuild_reading_summary()
+        self.assertIsNone(error)
+        self.assertGreater(months, 0)
+        res, _, header, error = au.summary_books_read_by_year_utility(target_year=1966)
+        self.assertEqual(str(res[0]), """(1966, Decimal('2527'), 13)""")
+        # recomputing the months of a write is idempotent
+        self.assertIsNone(au.update_reading_summary(read_dates=["1966-03-01", "not a date"], book_id=155))
+        res, _, header, error = au.summary_books_read_by_year_utility(target_year=1966)
+        self.assertEqual(str(res[0]), """(1966, Decimal('2527'), 13)""")
+        res_all, _, _, _ = au.summary_books_read_by_year_utility()
+        self.assertGreater(len(res_all), 1)
+
     def test_books_read(self):
         res, res1, header, error = au.books_read_by_year_utility(target_year=1966)
         self.assertEqual(len(res), 13)
@@ -66,6 +99,53 @@ class TestAppUtilityFunctions(unittest.TestCase):
         self.assertEqual(str(res[0])[:64],
                          """(155, 'Letters To Children', 'Lewis, C S', datetime.datetime(198""")
 
+    def test_books_read_stream(self):
+        res, _, header, error = au.books_read_by_year_utility(target_year=1966)
+        rows, _, stream_header, _ = au.books_read_by_year_utility(target_year=1966, stream=True)
+        self.assertEqual(list(rows), list(res))
+        self.assertEqual(stream_header, header)
+        rows, _, header, _ = au.books_read_by_year_utility(target_year=1966, stream=True)
+        chunks = "".join(au.stream_serialized_rows(rows, header, "json"))
+        self.assertEqual(chunks, au.serialized_result_dict(res, header))
+        self.assertEqual(au.books_pool.stats()["in_use"], 0)
+        # small batches resume after the last row, with no connection held in between
+        with mock.patch.object(au, "STREAM_BATCH_ROWS", 4):
+            rows, _, _, _ = au.books_read_by_year_utility(target_year=1966, stream=True)
+            streamed = []
+            for row in rows:
+                streamed.append(row)
+                self.assertEqual(au.books_pool.stats()["in_use"], 0)
+        self.assertEqual(streamed, list(res))
+        rows, _, _, _ = au.tag_counts_utility(stream=True)
+        with mock.patch.object(au, "STREAM_BATCH_ROWS", 3):
+            self.assertEqual(list(au.tag_counts_utility(stream=True)[0]), list(rows))
+
+    def test_change_feed(self):
+        since = au.decode_change_token(None)
+        until, error = au.change_feed_snapshot()
+        self.assertIsNone(error)
+        lines = [json.loads(line) for line in "".join(au.stream_change_feed(since, until)).splitlines()]
+        self.assertEqual([line["table"] for line in lines if "table" in line],
+                         [table for table, _, _, _ in au.CHANGE_FEED_TABLES])
+        last = lines[-1]
+        self.assertGreater(last["counts"]["book collection"], 2000)
+        self.assertEqual(au.decode_change_token(last["next_token"]), until)
+        # reading on from the token sends only the overlap again
+        with mock.patch.object(au, "STREAM_BATCH_ROWS", 7):
+            lines = [json.loads(line) for line in "".join(au.stream_change_feed(until, until)).splitlines()]
+        counts = lines[-1]["counts"]
+        self.assertLessEqual(counts["images"], au.CHANGE_FEED_OVERLAP_IDS)
+        self.assertLess(counts["book collection"], last["counts"]["book collection"])
+        # small batches deliver each row once
+        with mock.patch.object(au, "STREAM_BATCH_ROWS", 7):
+            rows = [line for line in map(json.loads, "".join(au.stream_change_feed(since, until)).splitlines())
+                    if isinstance(line, list)]
+        self.assertEqual(len(rows), sum(last["counts"].values()))
+        self.assertEqual(au.decode_change_token("2024-05-01")["t"], "2024-05-01 00:00:00")
+        with self.assertRaises(ValueError):
+            au.decode_change_token("not a token")
+        self.assertEqual(au.books_pool.stats()["in_use"], 0)
+
     def test_tags_search(self):
         res = au.tags_search_utility("zander")
         self.assertEqual(len(res), 4)
@@ -84,6 +164,70 @@ class TestAppUtilityFunctions(unittest.TestCase):
         self.assertGreater(len(res2), 0)
         self.assertIsNone(error2)
 
+    def test_books_search_fulltext(self):
+        res, _, header, error = au.books_search_utility({"Author": "tolkien"}, "fulltext")
+        self.assertIsNone(error)
+        self.assertEqual(header[-1], "Relevance")
+        self.assertGreater(len(res), 0)
+        self.assertEqual([r[-1] for r in res], sorted([r[-1] for r in res], reverse=True))
+        res, _, header, error = au.books_search_utility({"Title": "+lord -zzzzzz"}, "boolean")
+        self.assertIsNone(error)
+        res, _, header, error = au.books_search_utility({"Title": "of"}, "fulltext")
+        self.assertIsNone(error)
+        self.assertGreater(len(res), 0)
+        res, _, header, error = au.books_search_utility({"Title": "lewis"}, "nosuchmode")
+        self.assertIsNotNone(error)
+
+    def test_books_search_paged(self):
+        res, _, header, error = au.books_search_utility({"Title": "the"})
+        self.assertIsNone(error)
+        paged, cursor = [], None
+        while True:
+            page, _, header, error = au.books_search_utility({"Title": "the"}, limit=7, cursor=cursor)
+            self.assertIsNone(error)
+            self.assertLessEqual(len(page), 7)
+            paged.extend(page)
+            if len(page) < 7:
+                break
+            cursor = au.encode_search_cursor(page[-1], header)
+        self.assertEqual(sorted((r[0], str(r[13])) for r in paged), sorted((r[0], str(r[13])) for r in res))
+        rows, header = au.project_search_rows(paged, header, "Title,BookCollectionID")
+        self.assertEqual(header, ["Title", "BookCollectionID"])
+        self.assertEqual(len(rows[0]), 2)
+        self.assertRaises(ValueError, au.project_search_rows, paged, header, "NoSuchField")
+
+    def test_books_search_paged_fulltext(self):
+        res, _, header, error = au.books_search_utility({"Title": "of"}, "fulltext")
+        self.assertIsNone(error)
+        paged, cursor = [], None
+        while True:
+            page, _, header, error = au.books_search_utility({"Title": "of"}, "fulltext", limit=5, cursor=cursor)
+            self.assertIsNone(error)
+            paged.extend(page)
+            if len(page) < 5:
+                break
+            cursor = au.encode_search_cursor(page[-1], header)
+        self.assertEqual(sorted((r[0], str(r[13])) for r in paged), sorted((r[0], str(r[13])) for r in res))
+
+    def test_search_cursor_relevance_exact(self):
+        header = ["BookCollectionID", "Title", "Author", "ReadDate", "Relevance"]
+        row = (155, "Letters To Children", "Lewis, C S", None, Decimal("0.123456789012345678"))
+        after = au.decode_search_cursor(au.encode_search_cursor(row, header))
+        self.assertEqual(after["relevance"], "0.123456789012345678")
+        self.assertEqual(after["key"], ["Lewis, C S", "Letters To Children", 155, "1000-01-01"])
+        self.assertRaises(ValueError, au.decode_search_cursor,
+                          au.encode_search_cursor(row[:4] + ("NaN",), header))
+
+    def test_search_index(self):
+        index = BookSearchIndex(au.books_pool)
+        self.assertTrue(index.refresh())
+        for args in [{"Title": "lewis"}, {"Tags": "science"}, {"Author": "tolkien", "ReadDate": "20"}, {}]:
+            rows = index.search(args)
+            res, _, _, error = au.books_search_utility(args)
+            self.assertIsNone(error)
+            self.assertEqual(sorted((r[0], str(r[13])) for r in rows), sorted((r[0], str(r[13])) for r in res))
+        self.assertIsNone(index.search({"Title": "lew%"}))
+
     def test_depending_on_daily_page_record_from_db(self):
         d, _ = au.daily_page_record_from_db(1)
         self.assertEqual(len(d), 4)
@@ -103,6 +247,27 @@ class TestAppUtilityFunctions(unittest.TestCase):
         self.assertEqual(res1[1], datetime.datetime(2022, 4, 25, 0, 0))
         self.assertEqual(res1[2], datetime.datetime(2022, 11, 6, 0, 0))
 
+    def test_estimate_values_batch(self):
+        x = [[10, 60, 120, 279], [0, 100, 150], [0, 50, 50, 150], [5, 5]]
+        y = [[0, 2, 5, 8], [0, 4, 5], [0, 1, 2, 4], [0, 1]]
+        res = au.estimate_values_batch(x, y, [788, 300, 300, 100])
+        self.assertEqual(res.shape, (4, 3))
+        # pair slopes 2/50, 3/60 and 3/159 extrapolated 509 pages from (279, 8)
+        self.assertAlmostEqual(res[0, 0], 22.831578176, places=6)
+        self.assertAlmostEqual(res[0, 1], 8 + 509 * 3 / 159)
+        self.assertAlmostEqual(res[0, 2], 8 + 509 * 3 / 60)
+        # least-squares slope 400/11666.67 and pair slopes 4/100 and 1/50, 150 pages from (150, 5)
+        self.assertAlmostEqual(res[1, 0], 5 + 150 * 0.24 / 7)
+        self.assertEqual(res[1, 1:].tolist(), [8.0, 11.0])
+        # repeated page count skipped
+        self.assertEqual(res[2, 1:].tolist(), [7.0, 7.0])
+        self.assertEqual(au._estimate_values(x[0], y[0], 788), [22, 17, 33])
+        # no two records with different page counts
+        self.assertEqual(res[3, 1], float("inf"))
+        self.assertEqual(res[3, 2], -float("inf"))
+        with self.assertRaises(ValueError):
+            au.estimate_values_batch([[1]], [[0]], [10])
+
     def test_calculate_estimates(self):
         res = au.calculate_estimates(1)
         self.assertEqual(len(res), 3)
@@ -110,6 +275,17 @@ class TestAppUtilityFunctions(unittest.TestCase):
         self.assertEqual(res[1], "2022-04-03")
         self.assertEqual(res[2], "2022-08-18")
 
+    def test_calculate_book_estimates(self):
+        with au.books_pool.connection() as db, db.cursor() as c:
+            c.execute(au.queries.ESTIMATE_BOOK, (1,))
+            book_id = c.fetchall()[0][0]
+        records, estimates, error = au.calculate_book_estimates(book_id)
+        self.assertIsNone(error)
+        self.assertEqual(len(records), len(estimates))
+        record_ids = [record_id for _, record_id in records]
+        self.assertIn(1, record_ids)
+        self.assertEqual(estimates[record_ids.index(1)], au.calculate_estimates(1))
+
     def test_get_next_book_id(self):
         next_id = au.get_next_book_id(1873)
         self.assertEqual(next_id, 1874)
@@ -140,6 +316,50 @@ class TestAppUtilityFunctions(unittest.TestCase):
         self.assertEqual(len(rec["tags"]["data"][0]), 8)
         self.assertEqual(len(rec["img"]["data"][0]), 0)
 
+    def test_complete_book_records(self):
+        recs = au.get_complete_book_records([1873, 155, 999999, "x", 1873])
+        self.assertEqual(len(recs), 5)
+        self.assertEqual(recs[0]["book"]["data"][0][0], 1873)
+        self.assertEqual(recs[0]["book"]["data"][0][7], 548)
+        self.assertEqual(len(recs[0]["reads"]["data"]), 1)
+        self.assertEqual(len(recs[0]["img"]["data"][0]), 0)
+        tags, _ = au.book_tags(1873)
+        self.assertEqual(sorted(recs[0]["tags"]["data"][0]), sorted(tags["tag_list"]))
+        self.assertEqual(recs[4], recs[0])  # duplicates preserved
+        self.assertEqual(recs[1]["book"]["data"][0][1], "Letters To Children")
+        reads, _, _, _ = au.status_read_utility(155)
+        self.assertEqual(len(recs[1]["reads"]["data"]), len(reads))
+        self.assertNotIn("error", recs[1])
+        # unknown id gives empty sections, an invalid id an error
+        self.assertEqual(recs[2]["book"]["data"], [])
+        self.assertEqual(recs[2]["reads"]["data"], [])
+        self.assertEqual(recs[2]["tags"]["data"], [[]])
+        self.assertIsNone(recs[3]["book"])
+        self.assertEqual(recs[3]["error"], ["Invalid BookCollectionID: x"])
+        self.assertEqual(au.get_complete_book_records([]), [])
+
+    def test_add_books_invalid_records(self):
+        res = au.add_books_utility([{"Title": "No Author"}, {"Title": "T", "Author": "A", "Location": "L",
+                                                             "Pages": "many"}])
+        self.assertEqual(len(res), 2)
+        self.assertIn("Author", res[0]["error"])
+        self.assertIn("Pages", res[1]["error"])
+
+    def test_add_books_rejected_row(self):
+        # Pages is a smallint: MySQL rejects the middle row after storing the first
+        recs = [{"Title": f"T{n}", "Author": "A", "Location": "L", "PublisherName": "Printerman", "Pages": pages}
+                for n, pages in enumerate([10, 70000, 30])]
+        res = au.add_books_utility(recs, chunk_size=3)
+        try:
+            self.assertIn("error", res[1])
+            self.assertEqual([r["book"]["data"][0][1] for r in
+                              au.get_complete_book_records([res[0]["BookCollectionID"], res[2]["BookCollectionID"]])],
+                             ["T0", "T2"])
+        finally:
+            with au.books_pool.connection() as db:
+                db.cursor().execute("DELETE FROM `book collection` WHERE PublisherName = 'Printerman'")
+                db.commit()
+
     def test_update_book_record_by_key(self):
         update_data = {
             "BookCollectionID": 1873,
@@ -158,14 +378,24 @@ class TestAppUtilityFunctions(unittest.TestCase):
         self.assertTrue(res)
         rec = au.get_complete_book_record(1873)
         self.assertEqual(rec["book"]["data"][0][1], "Demon Copperhead A Novel")
+        # the edit is logged, so the book is now the most recently touched
+        recent_books, _, _, error = au.get_recently_touched(limit=1)
+        self.assertIsNone(error)
+        self.assertEqual(recent_books[0][0], 1873)
 
     def test_get_recently_touched(self):
+        with au.books_pool.connection() as db:
+            with db.cursor() as c:
+                au.log_activity(c, [1873, 155, 1873], "add_tag", "test")
+            db.commit()
         recent_books, raw_rows, header, error = au.get_recently_touched(limit=5)
         self.assertIsNone(error)
         self.assertEqual(header, ["BookCollectionID", "LastUpdate", "Title"])
         self.assertGreater(len(recent_books), 0)
         self.assertLessEqual(len(recent_books), 5)
         self.assertEqual(len(recent_books), len(raw_rows))
+        # one row per book, the newest event first
+        self.assertEqual([row[0] for row in recent_books[:2]], [1873, 155])
         # Check structure of first result
         self.assertEqual(len(recent_books[0]), 3)
         self.assertIsInstance(int(recent_books[0][0]), int)  # BookCollectionID is int represented as string
@@ -473,6 +473,7 @@ class TestResponseFormat(unittest.TestCase):
             self.assertIn("query", result)
             self.assertIn("count", result)
             self.assertIn("results", result)
+            self.assertIn("next_cursor", result)
 
             # Type validation
             self.assertIsInstance(result["query"], dict)
@@ -0,0 +1,107 @@
+import os
+import sys
+import tempfile
+import unittest
+from io import StringIO
+from unittest import mock
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'books'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))  # bookdbtool
+
+from bookdbtool.isbn_cache import ISBNCache
+from bookdbtool.isbn_lookup_tools import ISBNLookup
+from fake_isbn_server import FakeISBNServer, synthetic_book
+from isbn_com import Endpoint
+
+KEY = "test-key"
+ISBNS = [f"{9780000000000 + 7919 * i}" for i in range(20)]
+
+
+class TestSyntheticBook(unittest.TestCase):
+
+    def test_deterministic_and_isbn10_isbn13_agree(self):
+        self.assertEqual(synthetic_book("0060929480"), synthetic_book("978-0-06-092948-0"))
+        record, _ = synthetic_book("0060929480")
+        self.assertEqual(record["book"]["isbn"], "0060929480")
+        self.assertEqual(record["book"]["isbn13"], "9780060929480")
+
+
+class TestFakeISBNServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeISBNServer(not_found_rate=0.25, key=KEY).start()
+        self.conf = {"url_isbn": self.server.url, "key": KEY}
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_endpoint_lookup(self):
+        endpoint = Endpoint(self.conf, max_concurrency=4, rate_limit=0, cache=False)
+        res = endpoint.get_books_by_isbn_list(ISBNS)
+        self.assertEqual(list(res), ISBNS)
+        not_found = [i for i in ISBNS if synthetic_book(i)[1] < 0.25]
+        self.assertTrue(not_found)
+        for isbn in ISBNS:
+            if isbn in not_found:
+                self.assertIn("404", res[isbn]["error"])
+            else:
+                self.assertEqual(res[isbn], synthetic_book(isbn)[0])
+                proto = endpoint._endpoint_to_collection_db(res[isbn])
+                self.assertEqual(proto["ISBNNumber13"], isbn)
+                self.assertEqual(len(proto["CopyrightDate"]), 10)
+        self.assertEqual(self.server.statuses[404], len(not_found))
+
+    def test_cached_endpoint_requests_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ISBNCache(os.path.join(tmp, "isbn.sqlite"))
+            endpoint = Endpoint(self.conf, max_concurrency=4, rate_limit=0, cache=cache)
+            first = endpoint.get_books_by_isbn_list(ISBNS)
+            second = endpoint.get_books_by_isbn_list(ISBNS)
+            cache.close()
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.requests, len(ISBNS))
+
+    def test_wrong_key(self):
+        endpoint = Endpoint({"url_isbn": self.server.url, "key": "wrong"}, rate_limit=0, cache=False)
+        self.assertIn("401", endpoint.get_book_by_isbn(ISBNS[0])["error"])
+
+    def test_isbn_lookup(self):
+        lookup = ISBNLookup(self.conf)
+        with mock.patch('sys.stdout', new=StringIO()):
+            lookup.lookup("0060929480")
+        self.assertEqual(lookup.result, synthetic_book("0060929480")[0])
+
+
+class TestFakeISBNServerFaults(unittest.TestCase):
+
+    def test_rate_limit(self):
+        now = [100.0]
+        with FakeISBNServer(rate_limit=5, clock=lambda: now[0]) as server:
+            statuses = [requests.get(server.url.format(isbn)).status_code for isbn in ISBNS[:8]]
+            now[0] += 1.0  # the window has moved on
+            statuses.append(requests.get(server.url.format(ISBNS[8])).status_code)
+        self.assertEqual(statuses, [200] * 5 + [429] * 3 + [200])
+
+    def test_rate_limited_endpoint_stays_within_quota(self):
+        with FakeISBNServer(rate_limit=20) as server:
+            # paced well under the quota so a loaded machine bunching requests stays within it
+            endpoint = Endpoint({"url_isbn": server.url, "key": KEY}, max_concurrency=4, rate_limit=15, cache=False)
+            res = endpoint.get_books_by_isbn_list(ISBNS)
+        self.assertEqual(server.statuses[429], 0)
+        self.assertTrue(all("book" in r for r in res.values()))
+
+    def test_errors_and_latency(self):
+        sleep = mock.Mock()
+        with FakeISBNServer(latency=0.05, jitter=0.01, error_rate=0.5, seed=1, sleep=sleep) as server:
+            statuses = [requests.get(server.url.format(isbn)).status_code for isbn in ISBNS[:6]]
+        self.assertEqual(set(statuses), {200, 503})
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(delays), 6)
+        self.assertTrue(all(0.05 <= d <= 0.06 for d in delays))
+
+
+if __name__ == '__main__':
+    unittest.main()
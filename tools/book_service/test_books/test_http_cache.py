@@ -0,0 +1,117 @@
+import gzip
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'books'))
+
+import http_cache
+from flask import Flask, Response
+from http_cache import conditional_response, make_etag, negotiate_encoding
+
+BODY = "x" * (http_cache.MIN_COMPRESS_BYTES * 2)
+
+
+class TestNegotiateEncoding(unittest.TestCase):
+
+    def test_no_header(self):
+        self.assertIsNone(negotiate_encoding(None))
+        self.assertIsNone(negotiate_encoding(""))
+        self.assertIsNone(negotiate_encoding("identity, deflate"))
+
+    @mock.patch.object(http_cache, "brotli", None)
+    def test_gzip_without_brotli(self):
+        self.assertEqual(negotiate_encoding("gzip, deflate, br"), "gzip")
+        self.assertIsNone(negotiate_encoding("br"))
+
+    @mock.patch.object(http_cache, "brotli", mock.Mock())
+    def test_brotli_preferred_on_tie(self):
+        self.assertEqual(negotiate_encoding("gzip, br"), "br")
+        self.assertEqual(negotiate_encoding("GZIP;q=1.0, br;q=0.5"), "gzip")
+
+    @mock.patch.object(http_cache, "brotli", None)
+    def test_q_values(self):
+        self.assertIsNone(negotiate_encoding("gzip;q=0"))
+        self.assertIsNone(negotiate_encoding("gzip;q=bad"))
+        self.assertEqual(negotiate_encoding("*;q=0.5"), "gzip")
+        self.assertIsNone(negotiate_encoding("*, gzip;q=0"))
+
+
+class TestMakeEtag(unittest.TestCase):
+
+    def test_depends_on_key_version_and_encoding(self):
+        tag = make_etag("/books?x=1", "10-20")
+        self.assertEqual(tag, make_etag("/books?x=1", "10-20"))
+        self.assertNotEqual(tag, make_etag("/books?x=2", "10-20"))
+        self.assertNotEqual(tag, make_etag("/books?x=1", "10-21"))
+        self.assertEqual(make_etag("/books?x=1", "10-20", "gzip"), f"{tag}-gzip")
+
+
+class TestConditionalResponse(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(http_cache, "table_fingerprint", return_value="10-20")
+        self.fingerprint = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = 0
+        app = Flask(__name__)
+
+        @app.route('/data')
+        @conditional_response("book collection")
+        def data():
+            self.calls += 1
+            return Response(response=BODY, status=200, mimetype="application/json")
+
+        @app.route('/year')
+        @app.route('/year/<year>')
+        @conditional_response("book collection", resolve=lambda year=None: year or self.default_year)
+        def year(year=None):
+            self.calls += 1
+            return Response(response=BODY, status=200)
+
+        self.default_year = 2025
+        self.client = app.test_client()
+
+    def test_not_modified_skips_view(self):
+        first = self.client.get('/data')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["Cache-Control"], http_cache.CACHE_CONTROL)
+        second = self.client.get('/data', headers={"If-None-Match": first.headers["ETag"]})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers["ETag"], first.headers["ETag"])
+        self.assertEqual(self.calls, 1)
+
+    def test_data_change_invalidates(self):
+        etag = self.client.get('/data').headers["ETag"]
+        self.fingerprint.return_value = "11-21"
+        response = self.client.get('/data', headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.calls, 2)
+
+    @mock.patch.object(http_cache, "brotli", None)
+    def test_gzip_body_and_identity_tag_accepted(self):
+        response = self.client.get('/data', headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.data).decode(), BODY)
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        identity = self.client.get('/data').headers["ETag"]
+        self.assertNotEqual(identity, response.headers["ETag"])
+        revalidated = self.client.get('/data', headers={"Accept-Encoding": "gzip", "If-None-Match": identity})
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_no_fingerprint_passes_through(self):
+        self.fingerprint.return_value = None
+        response = self.client.get('/data', headers={"If-None-Match": "*"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response.headers)
+
+    def test_resolved_default_in_etag(self):
+        etag = self.client.get('/year').headers["ETag"]
+        self.assertEqual(self.client.get('/year', headers={"If-None-Match": etag}).status_code, 304)
+        self.default_year = 2026
+        self.assertEqual(self.client.get('/year', headers={"If-None-Match": etag}).status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'books'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))  # bookdbtool
+
+from bookdbtool.isbn_cache import ISBNCache
+from isbn_com import Endpoint, TokenBucket
+
+CONF = {"url_isbn": "http://isbn.test/book/{}", "key": "test-key"}
+
+
+def book_response(isbn, delay=0.0):
+    time.sleep(delay)
+    response = mock.Mock()
+    response.json.return_value = {"book": {"title": f"Title {isbn}", "authors": ["Author, A"], "isbn": isbn,
+                                           "isbn13": f"978{isbn}", "pages": 100, "date_published": "1999"}}
+    return response
+
+
+class TestEndpoint(unittest.TestCase):
+
+    def test_get_book_by_isbn(self):
+        endpoint = Endpoint(CONF, rate_limit=0, timeout=3, cache=False)
+        with mock.patch.object(endpoint.session, "get", return_value=book_response("123")) as get:
+            res = endpoint.get_book_by_isbn("123")
+        get.assert_called_once_with("http://isbn.test/book/123", headers={"Authorization": "test-key"}, timeout=3)
+        self.assertEqual(res["book"]["title"], "Title 123")
+
+    def test_http_error(self):
+        endpoint = Endpoint(CONF, rate_limit=0, cache=False)
+        response = mock.Mock()
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Client Error")
+        with mock.patch.object(endpoint.session, "get", return_value=response):
+            self.assertEqual(endpoint.get_book_by_isbn("1"), {"error": "404 Client Error"})
+
+    def test_list_is_concurrent_and_in_input_order(self):
+        endpoint = Endpoint(CONF, max_concurrency=4, rate_limit=0, cache=False)
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def get(url, headers=None, timeout=None):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            isbn = url.rsplit("/", 1)[1]
+            try:
+                # the first ISBNs answer last
+                return book_response(isbn, delay=0.02 * (10 - int(isbn)))
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        isbns = [str(i) for i in range(10)]
+        with mock.patch.object(endpoint.session, "get", side_effect=get):
+            res = endpoint.get_books_by_isbn_list(isbns + ["3"])
+        self.assertEqual(list(res), isbns)
+        self.assertEqual([r["book"]["isbn"] for r in res.values()], isbns)
+        self.assertEqual(peak[0], 4)
+
+    def test_endpoint_to_collection_db(self):
+        proto = Endpoint(CONF, cache=False)._endpoint_to_collection_db(book_response("123").json())
+        self.assertEqual(proto["ISBNNumber13"], "978123")
+        self.assertEqual(proto["CopyrightDate"], "1999-01-01")
+        self.assertEqual(proto["PublisherName"], "unknown")
+
+
+class TestEndpointCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ISBNCache(os.path.join(self.tmp.name, "isbn.sqlite"))
+        self.endpoint = Endpoint(CONF, rate_limit=0, cache=self.cache)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def http_error(self, status):
+        response = mock.Mock(status_code=status)
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(f"{status} Error", response=response)
+        return response
+
+    def test_found_is_cached(self):
+        with mock.patch.object(self.endpoint.session, "get", return_value=book_response("0060929480")) as get:
+            first = self.endpoint.get_book_by_isbn("0060929480")
+            second = self.endpoint.get_book_by_isbn("9780060929480")
+        get.assert_called_once()
+        self.assertEqual(first, second)
+
+    def test_not_found_is_cached(self):
+        with mock.patch.object(self.endpoint.session, "get", return_value=self.http_error(404)) as get:
+            self.endpoint.get_book_by_isbn("1")
+            res = self.endpoint.get_book_by_isbn("1")
+        get.assert_called_once()
+        self.assertEqual(res, {"error": "404 Error"})
+
+    def test_transient_errors_are_not_cached(self):
+        with mock.patch.object(self.endpoint.session, "get",
+                               side_effect=[self.http_error(429), requests.exceptions.Timeout("timed out"),
+                                            book_response("1")]) as get:
+            self.assertIn("error", self.endpoint.get_book_by_isbn("1"))
+            self.assertIn("error", self.endpoint.get_book_by_isbn("1"))
+            self.assertEqual(self.endpoint.get_book_by_isbn("1")["book"]["isbn"], "1")
+        self.assertEqual(get.call_count, 3)
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_rate(self):
+        bucket = TokenBucket(20, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.24)
+
+    def test_unlimited(self):
+        bucket = TokenBucket(0)
+        self.assertEqual(sum(bucket.acquire() for _ in range(100)), 0)
+
+    def test_endpoint_does_not_burst(self):
+        endpoint = Endpoint(CONF, rate_limit=5, cache=False)
+        self.assertEqual(endpoint.rate_limiter.capacity, 1)
+        self.assertEqual(endpoint.rate_limiter.acquire(), 0.0)
+        self.assertGreater(endpoint.rate_limiter.acquire(), 0.0)  # a fresh bucket holds one token
+
+
+if __name__ == '__main__':
+    unittest.main()
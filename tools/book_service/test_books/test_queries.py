@@ -0,0 +1,31 @@
+import unittest
+
+from booksdb import queries
+
+
+class TestQueries(unittest.TestCase):
+
+    def test_in_list(self):
+        q = queries.in_list(queries.BOOKS_BY_ID, [1, 2, 3])
+        self.assertTrue(q.endswith("IN (%s, %s, %s)"))
+        self.assertEqual(q.count("%s"), 3)
+
+    def test_update_book(self):
+        q = queries.update_book(["Title", "Pages"])
+        self.assertEqual(q, "UPDATE `book collection` SET Title = %s, Pages = %s WHERE BookCollectionID = %s")
+
+    def test_update_book_rejects_columns(self):
+        for columns in ([], ["BookCollectionID"], ["LastUpdate"], ["Title", "Title = 'x' --"]):
+            with self.assertRaises(ValueError):
+                queries.update_book(columns)
+
+    def test_statements_are_parameterized(self):
+        for name in dir(queries):
+            value = getattr(queries, name)
+            if name.isupper() and isinstance(value, str):
+                self.assertNotIn('"', value, name)
+                self.assertNotIn("{", value.replace("{ids}", ""), name)
+
+
+if __name__ == '__main__':
+    unittest.main()
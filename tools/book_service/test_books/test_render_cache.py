@@ -0,0 +1,77 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'books'))
+
+from render_cache import RenderCache
+
+
+class Renderer:
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, arg):
+        self.calls.append(arg)
+        return f"png {arg} {len(self.calls)}".encode()
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def test_render_cached_per_version(self):
+        cache = RenderCache(max_entries=4, directory="")
+        renderer = Renderer()
+        first = cache.render("all_years", 2025, "v1", renderer)
+        self.assertEqual(cache.render("all_years", 2025, "v1", renderer), first)
+        self.assertNotEqual(cache.render("all_years", 2025, "v2", renderer), first)
+        self.assertEqual(renderer.calls, [2025, 2025])
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_no_version_not_cached(self):
+        cache = RenderCache(max_entries=4, directory="")
+        renderer = Renderer()
+        cache.render("all_years", 2025, None, renderer)
+        cache.render("all_years", 2025, None, renderer)
+        self.assertEqual(len(renderer.calls), 2)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_least_recently_used_evicted(self):
+        cache = RenderCache(max_entries=2, directory="")
+        cache.put(("r", 1, "v"), b"1")
+        cache.put(("r", 2, "v"), b"2")
+        self.assertEqual(cache.get(("r", 1, "v")), b"1")
+        cache.put(("r", 3, "v"), b"3")
+        self.assertIsNone(cache.get(("r", 2, "v")))
+        self.assertEqual(cache.get(("r", 1, "v")), b"1")
+        self.assertEqual(cache.recent_requests(), [("r", 1), ("r", 3)])
+
+    def test_disk_shared_and_evicted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = RenderCache(max_entries=2, directory=directory)
+            for arg in (1, 2, 3):
+                cache.put(("r", arg, "v"), str(arg).encode())
+                path = cache._path(("r", arg, "v"))
+                os.utime(path, (arg, arg))
+            self.assertEqual(len([name for name in os.listdir(directory) if name.endswith(".png")]), 2)
+
+            other = RenderCache(max_entries=2, directory=directory)
+            self.assertEqual(other.get(("r", 3, "v")), b"3")
+            self.assertIsNone(other.get(("r", 1, "v")))
+
+    def test_refresh_renders_recent_requests(self):
+        cache = RenderCache(max_entries=4, directory="")
+        renderer = Renderer()
+        cache.render("all_years", 2025, "v1", renderer)
+        cache.refresh_async(lambda: "v2", {"all_years": renderer})
+        thread = cache._refresh_thread
+        if thread is not None:  # None once the refresh has finished
+            thread.join(5)
+        self.assertEqual(renderer.calls, [2025, 2025])
+        self.assertEqual(cache.get(("all_years", 2025, "v2")), b"png 2025 2")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'books'))
+
+import render_pool
+from render_pool import RenderBroken, RenderBusy, RenderPool, RenderTimeout
+
+
+# stand-ins for render_pool._render_report, run in the spawned render processes
+
+def fake_render(report, rows, header, arg):
+    if arg == "sleep":
+        time.sleep(60)
+    elif arg == "exit":
+        os._exit(1)
+    return f"png {report} {arg}".encode()
+
+
+@mock.patch.object(render_pool, "_render_report", fake_render)
+class TestRenderPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = RenderPool(max_workers=1, timeout=30, max_queue=1)
+        self.addCleanup(self.shutdown)
+
+    def shutdown(self):
+        if self.pool._executor is not None:
+            self.pool._discard_executor(self.pool._executor)
+
+    def test_render(self):
+        self.assertEqual(self.pool.render("all_years", [], [], 2025), b"png all_years 2025")
+        self.assertEqual(self.pool.stats()["completed"], 1)
+
+    def test_busy_rejected(self):
+        self.pool.timeout = 2
+        errors = []
+
+        def hung_render():
+            try:
+                self.pool.render("r", [], [], "sleep")
+            except RenderTimeout as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=hung_render)
+        thread.start()
+        deadline = time.monotonic() + 5
+        while self.pool.stats()["queue_depth"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with self.assertRaises(RenderBusy):
+            self.pool.render("r", [], [], 1)
+        thread.join()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(self.pool.stats()["rejected"], 1)
+
+    def test_timeout_kills_pool_and_next_render_recovers(self):
+        self.pool.render("r", [], [], "warm")  # start the pool, so the timeout covers the render only
+        executor = self.pool._executor
+        processes = list(executor._processes.values())
+        self.pool.timeout = 0.5
+        with self.assertRaises(RenderTimeout):
+            self.pool.render("r", [], [], "sleep")
+        self.assertIsNone(self.pool._executor)
+        for process in processes:
+            process.join(5)
+            self.assertFalse(process.is_alive())
+        self.pool.timeout = 30
+        self.assertEqual(self.pool.render("r", [], [], 1), b"png r 1")
+        self.assertIsNot(self.pool._executor, executor)
+        self.assertEqual(self.pool.stats()["timeouts"], 1)
+
+    def test_broken_pool_and_next_render_recovers(self):
+        with self.assertRaises(RenderBroken):
+            self.pool.render("r", [], [], "exit")
+        self.assertIsNone(self.pool._executor)
+        self.assertEqual(self.pool.render("r", [], [], 1), b"png r 1")
+        self.assertEqual(self.pool.stats()["failed"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600  # book metadata rarely changes
+DEFAULT_NEGATIVE_TTL_SECONDS = 24 * 3600  # ISBNs the provider did not know may be added later
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "bookdb", "isbn_cache.sqlite")
+
+
+def normalize_isbn(isbn):
+    """
+    Cache key of an ISBN: the ISBN-13 digits.
+
+    Hyphens and spaces are dropped and an ISBN-10 is converted to its 978 ISBN-13,
+    so both forms of a book share one key.  Anything that is not 10 or 13 characters
+    long after cleaning is returned cleaned but otherwise unchanged.
+    """
+    cleaned = re.sub(r"[^0-9X]", "", str(isbn).upper())
+    if len(cleaned) == 10:
+        body = "978" + cleaned[:9]
+        total = sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(body))
+        return body + str((10 - total % 10) % 10)
+    return cleaned
+
+
+def isbn10(isbn):
+    """ISBN-10 of a 978 ISBN (10 or 13 digits), or ``None`` if there is none."""
+    key = normalize_isbn(isbn)
+    if len(key) != 13 or not key.startswith("978"):
+        return None
+    body = key[3:12]
+    check = (11 - sum(int(digit) * (10 - i) for i, digit in enumerate(body)) % 11) % 11
+    return body + ("X" if check == 10 else str(check))
+
+
+class ISBNCache:
+    """
+    Persistent cache of ISBN lookup results in a SQLite file, keyed by ``normalize_isbn``.
+
+    Books found are kept for ``ttl`` seconds.  ISBNs the provider does not know (a 404)
+    are kept as negative entries for the shorter ``negative_ttl``, so they are not paid
+    for again on every retry.  Transient failures should not be stored.  The file can
+    be shared by several processes; SQLite does the locking.  The connection is opened
+    on first use in each process, so a cache created before a fork (in the uWSGI
+    master) is never used through a connection inherited from the parent.
+
+    Parameters
+    ----------
+    path : str
+        SQLite database file; created if missing.
+    ttl : float, optional
+        Seconds a found book is kept.  Defaults to ``BOOKDB_ISBN_CACHE_TTL`` or 30 days.
+    negative_ttl : float, optional
+        Seconds a not-found entry is kept.  Defaults to ``BOOKDB_ISBN_CACHE_NEGATIVE_TTL``
+        or 1 day.
+    """
+
+    def __init__(self, path, ttl=None, negative_ttl=None):
+        self.path = path
+        self.ttl = float(ttl if ttl is not None else os.getenv("BOOKDB_ISBN_CACHE_TTL", DEFAULT_TTL_SECONDS))
+        self.negative_ttl = float(negative_ttl if negative_ttl is not None else
+                                  os.getenv("BOOKDB_ISBN_CACHE_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL_SECONDS))
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = None
+        # connections inherited across fork; kept referenced, since closing one would
+        # drop this process's SQLite file locks
+        self._inherited = []
+        self.hits = 0
+        self.misses = 0
+
+    def _connection(self):
+        """This process's connection, opened on first use.  Caller holds the lock."""
+        if self._pid != os.getpid():
+            if self._db is not None:
+                self._inherited.append(self._db)
+            self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS isbn_cache ("
+                             "isbn TEXT PRIMARY KEY, found INTEGER NOT NULL, record TEXT NOT NULL, "
+                             "fetched REAL NOT NULL)")
+            self._pid = os.getpid()
+        return self._db
+
+    @classmethod
+    def from_env(cls, default=False):
+        """
+        The cache at ``BOOKDB_ISBN_CACHE``.  If that is not set, the cache at
+        ``DEFAULT_CACHE_PATH`` with ``default=True``, ``None`` otherwise.
+        """
+        path = os.getenv("BOOKDB_ISBN_CACHE") or (DEFAULT_CACHE_PATH if default else None)
+        return cls(path) if path else None
+
+    def get(self, isbn):
+        """
+        Cached lookup result of ``isbn``.
+
+        Returns
+        -------
+        dict or None
+            The stored record (for a negative entry, the stored error), or ``None`` if
+            the ISBN is not cached or its entry has expired.
+        """
+        with self._lock:
+            row = self._connection().execute("SELECT found, record, fetched FROM isbn_cache WHERE isbn = ?",
+                                             (normalize_isbn(isbn),)).fetchone()
+            if row is None or time.time() - row[2] > (self.ttl if row[0] else self.negative_ttl):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[1])
+
+    def put(self, isbn, record, found=True):
+        """Store the lookup result ``record`` of ``isbn``; ``found=False`` for a negative entry."""
+        with self._lock:
+            row = (normalize_isbn(isbn), int(bool(found)), json.dumps(record), time.time())
+            self._connection().execute("INSERT OR REPLACE INTO isbn_cache (isbn, found, record, fetched) "
+                                       "VALUES (?, ?, ?, ?)", row)
+
+    def purge(self):
+        """Delete expired entries; returns the number deleted."""
+        now = time.time()
+        with self._lock:
+            return self._connection().execute("DELETE FROM isbn_cache WHERE (found = 1 AND fetched < ?) "
+                                              "OR (found = 0 AND fetched < ?)",
+                                              (now - self.ttl, now - self.negative_ttl)).rowcount
+
+    def close(self):
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._db.close()
+            self._db = None
+            self._pid = None
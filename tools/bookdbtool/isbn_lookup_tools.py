@@ -1,11 +1,24 @@
 from pprint import pprint
 import requests as req
 
+from bookdbtool.isbn_cache import isbn10, normalize_isbn
+
 
 class ISBNLookup:
+    """
+    Look up book metadata by ISBN.
+
+    Arguments
+        config: the isbn_com configuration, with url_isbn and key.
+        cache: optional ISBNCache; repeat lookups are read from it instead of the paid service.
+        book_service: optional (endpoint, api_key) of the book service; ISBNs already in the
+            collection are shown from it instead of being looked up.
+    """
 
-    def __init__(self, config):
+    def __init__(self, config, cache=None, book_service=None):
         self.config = config
+        self.cache = cache
+        self.book_service = book_service
         self.result = None
 
     def lookup(self, isbn=None):
@@ -23,8 +36,46 @@ class ISBNLookup:
             self._lookup(isbn)
 
     def _lookup(self, isbn):
+        owned = self._collection_lookup(isbn)
+        if owned:
+            pprint(owned, indent=3)
+            self.result = owned
+            return
+        cached = self.cache.get(isbn) if self.cache is not None else None
+        if cached is not None:
+            pprint(cached, indent=3)
+            self.result = cached
+            return
         headers = {'Authorization': self.config["key"]}
         url = self.config["url_isbn"].format(isbn)
         resp = req.get(url, headers=headers)
         pprint(resp.json(), indent=3)
         self.result = resp.json()
+        if self.cache is not None:
+            # a 404 is kept as a shorter-lived negative entry; other failures are not kept
+            if resp.status_code == 404:
+                self.cache.put(isbn, self.result, found=False)
+            elif resp.ok:
+                self.cache.put(isbn, self.result)
+
+    def _collection_lookup(self, isbn):
+        """Books of the collection with this ISBN, as {"book_collection": [record, ...]}, or None."""
+        if self.book_service is None:
+            return None
+        end_point, api_key = self.book_service
+        key = normalize_isbn(isbn)
+        queries = [("ISBNNumber13", key)] + ([("ISBNNumber", isbn10(key))] if isbn10(key) else [])
+        books = {}
+        for column, value in queries:
+            try:
+                r = req.get(f"{end_point}/books_search?{column}={value}", headers={"x-api-key": f"{api_key}"})
+                res = r.json()
+            except (req.RequestException, ValueError) as e:
+                print(f"Collection lookup failed: {e}")
+                return None
+            for row in res.get("data") or []:
+                book = dict(zip(res["header"], row))
+                # books_search matches substrings; keep exact matches only
+                if normalize_isbn(book.get(column) or "") == key:
+                    books[book["BookCollectionID"]] = book
+        return {"book_collection": list(books.values())} if books else None
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+DAYS_IN_YEAR = 366  # columns of the progress matrix, day 1 is column 0
+
+
+def year_progress_matrix(df, window=None):
+    """
+    Cumulative pages read through each day of each year, as a year x day matrix.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        One row per book read, with ``ReadDate`` (date, datetime or string) and
+        ``Pages`` columns.  Row order does not matter; missing page counts count as 0.
+    window : int, optional
+        Keep only the latest ``window`` years.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        ``years``, the sorted years with at least one book read, and a float matrix of
+        shape ``(len(years), 366)`` whose ``[i, d - 1]`` entry is the pages read in
+        ``years[i]`` up to and including day-of-year ``d``.  Days after the last book
+        read in a year are NaN, so plotted lines stop where the data does.
+    """
+    read_date = pd.to_datetime(df["ReadDate"])
+    year = read_date.dt.year.to_numpy()
+    day_index = read_date.dt.dayofyear.to_numpy() - 1
+    pages = np.nan_to_num(pd.to_numeric(df["Pages"], errors="coerce").to_numpy(dtype=float))
+
+    years, year_index = np.unique(year, return_inverse=True)
+    matrix = np.zeros((len(years), DAYS_IN_YEAR))
+    np.add.at(matrix, (year_index, day_index), pages)
+    np.cumsum(matrix, axis=1, out=matrix)
+
+    last_day = np.zeros(len(years), dtype=int)
+    np.maximum.at(last_day, year_index, day_index)
+    matrix[np.arange(DAYS_IN_YEAR)[None, :] > last_day[:, None]] = np.nan
+
+    if window is not None:
+        years, matrix = years[-window:], matrix[-window:]
+    return years, matrix
+
+
+def plot_year_progress(ax, years, matrix, current_lw=4):
+    """
+    Draw every row of a ``year_progress_matrix`` on ``ax`` with one ``plot`` call.
+
+    The latest year is drawn with line width ``current_lw``, the others with width 1.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        Target axes.
+    years, matrix : numpy.ndarray
+        Output of ``year_progress_matrix``.
+    current_lw : float, optional
+        Line width of the latest year.
+
+    Returns
+    -------
+    matplotlib.axes.Axes
+        ``ax``.
+
+    Raises
+    ------
+    ValueError
+        If there are no years to plot.
+    """
+    if len(years) == 0:
+        raise ValueError("No books read to plot")
+    days = np.arange(1, DAYS_IN_YEAR + 1)
+    lines = ax.plot(days, matrix.T, drawstyle="steps-post", lw=1)
+    for line, year in zip(lines, years):
+        line.set_label(str(year))
+    if len(lines):
+        lines[-1].set_linewidth(current_lw)
+    ax.set_xlim(0, 365)
+    ax.set_ylim(0, np.nanmax(matrix))
+    ax.set_xlabel("Day")
+    ax.legend()
+    return ax
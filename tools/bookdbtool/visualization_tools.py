@@ -1,28 +1,12 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 
+from bookdbtool.reading_progress import plot_year_progress, year_progress_matrix
+
 
 def running_total_comparison(df1, window=15):
-    df1["read_date"] = pd.to_datetime(df1["ReadDate"])
-    df1 = df1.set_index("ReadDate")
-    df1.index = pd.to_datetime(df1.index)
-    ds_pages = df1.groupby(df1.index.to_period('Y'))["Pages"].cumsum()
-    ds_day = df1.read_date.apply(lambda x: x.dayofyear)
-    ds_year = df1.read_date.apply(lambda x: x.year)
-    df1 = pd.concat([ds_pages, ds_day, ds_year], axis=1)
-    df1.columns = ["Pages", "Day", "Year"]
-    fig_size = [12, 12]
-    xlim = [0, 365]
-    ylim = [0, max(df1.Pages)]
-    years = df1.Year.unique()[-window:].tolist()
-    y = years.pop(0)
-    this_year = max(years)
-    _df = df1.loc[df1.Year == y]
-    ax = _df.plot("Day", "Pages", figsize=fig_size, xlim=xlim, ylim=ylim, label=y)
-    for y in years:
-        _df = df1.loc[df1.Year == y]
-        lw = 3 if y == this_year else 1
-        ax = _df.plot("Day", "Pages", figsize=fig_size, xlim=xlim, ylim=ylim, ax=ax, label=y, lw=lw)
+    years, matrix = year_progress_matrix(df1, window)
+    ax = plt.figure(figsize=[12, 12]).add_subplot()
+    plot_year_progress(ax, years, matrix, current_lw=3)
     plt.show()
 
 
@@ -15,6 +15,28 @@
 /*!40101 SET @OLD_SQL_MODE=@@SQL_MODE, SQL_MODE='NO_AUTO_VALUE_ON_ZERO' */;
 /*!40111 SET @OLD_SQL_NOTES=@@SQL_NOTES, SQL_NOTES=0 */;
 
+--
+-- Table structure for table `activity log`
+--
+-- Append-only record of changes made through the API, read newest first through
+-- ActivityTime_idx for GET /recent.
+--
+
+DROP TABLE IF EXISTS `activity log`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `activity log` (
+  `ActivityID` bigint unsigned NOT NULL AUTO_INCREMENT,
+  `BookCollectionID` int NOT NULL,
+  `Action` varchar(32) NOT NULL,
+  `Detail` varchar(255) DEFAULT NULL,
+  `ActivityTime` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`ActivityID`),
+  KEY `ActivityTime_idx` (`ActivityTime`),
+  KEY `BookCollectionID_idx` (`BookCollectionID`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `book collection`
 --
@@ -56,7 +78,8 @@ CREATE TABLE `books read` (
   `ReadDate` date NOT NULL,
   `ReadNote` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci,
   `LastUpdate` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-  PRIMARY KEY (`BookCollectionID`,`ReadDate`)
+  PRIMARY KEY (`BookCollectionID`,`ReadDate`),
+  KEY `ReadDate` (`ReadDate`)
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -126,6 +149,29 @@ CREATE TABLE `images` (
 ) ENGINE=InnoDB AUTO_INCREMENT=11 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
+--
+-- Table structure for table `reading summary`
+--
+-- Pages and books read per month, maintained by the API on writes to `books read` and
+-- `book collection`.Pages; rebuild with GET /summary_maintenance, which also writes the
+-- row Year 0, Month 0 (Version = time of the rebuild) that marks the summary as built.
+--
+
+DROP TABLE IF EXISTS `reading summary`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `reading summary` (
+  `Year` smallint NOT NULL,
+  `Month` tinyint NOT NULL,
+  `Pages` bigint NOT NULL DEFAULT '0',
+  `Books` int NOT NULL DEFAULT '0',
+  `ReadCount` int NOT NULL DEFAULT '0',
+  `Version` varchar(255) DEFAULT NULL,
+  `LastUpdate` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`Year`,`Month`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `tag labels`
 --
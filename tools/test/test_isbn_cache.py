@@ -0,0 +1,162 @@
+import os
+import sys
+import tempfile
+import unittest
+from io import StringIO
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bookdbtool.isbn_cache import ISBNCache, isbn10, normalize_isbn
+from bookdbtool.isbn_lookup_tools import ISBNLookup
+
+
+class TestNormalizeISBN(unittest.TestCase):
+
+    def test_isbn10_to_isbn13(self):
+        self.assertEqual(normalize_isbn("0060929480"), "9780060929480")
+        self.assertEqual(normalize_isbn("0-06-092948-0"), "9780060929480")
+        self.assertEqual(normalize_isbn("080442957X"), "9780804429573")
+
+    def test_isbn13_unchanged(self):
+        self.assertEqual(normalize_isbn("978-0-06-092948-0"), "9780060929480")
+
+    def test_other_lengths_cleaned(self):
+        self.assertEqual(normalize_isbn(" 12-34 "), "1234")
+
+    def test_isbn10(self):
+        self.assertEqual(isbn10("9780060929480"), "0060929480")
+        self.assertEqual(isbn10("9780804429573"), "080442957X")
+        self.assertIsNone(isbn10("9791034749874"))
+        self.assertIsNone(isbn10("1234"))
+
+
+class TestISBNCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache", "isbn.sqlite")
+        self.cache = ISBNCache(self.path, ttl=100, negative_ttl=10)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.get("0060929480"))
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_hit_shared_by_isbn10_and_isbn13(self):
+        self.cache.put("0060929480", {"book": {"title": "T"}})
+        self.assertEqual(self.cache.get("978-0060929480"), {"book": {"title": "T"}})
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_persistent(self):
+        self.cache.put("0060929480", {"book": {"title": "T"}})
+        other = ISBNCache(self.path)
+        self.assertEqual(other.get("0060929480"), {"book": {"title": "T"}})
+        other.close()
+
+    @patch('bookdbtool.isbn_cache.time.time')
+    def test_ttl_and_negative_ttl(self, mock_time):
+        mock_time.return_value = 1000.0
+        self.cache.put("1111111111", {"book": {}})
+        self.cache.put("2222222222", {"error": "Not Found"}, found=False)
+        mock_time.return_value = 1050.0
+        self.assertIsNotNone(self.cache.get("1111111111"))
+        self.assertIsNone(self.cache.get("2222222222"))
+        self.assertEqual(self.cache.purge(), 1)
+        mock_time.return_value = 1101.0
+        self.assertIsNone(self.cache.get("1111111111"))
+
+    def test_from_env(self):
+        with patch.dict(os.environ, {"BOOKDB_ISBN_CACHE": ""}):
+            self.assertIsNone(ISBNCache.from_env())
+        with patch.dict(os.environ, {"BOOKDB_ISBN_CACHE": self.path}):
+            cache = ISBNCache.from_env()
+            self.assertEqual(cache.path, self.path)
+            cache.close()
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork")
+    def test_connection_per_process(self):
+        self.cache.put("0060929480", {"book": {"title": "T"}})
+        parent_db = self.cache._db
+        pid = os.fork()
+        if pid == 0:
+            ok = False
+            try:
+                ok = (self.cache.get("0060929480") == {"book": {"title": "T"}}
+                      and self.cache._db is not parent_db and self.cache._inherited == [parent_db])
+                self.cache.put("1111111111", {"book": {}})
+            finally:
+                os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        self.assertIs(self.cache._db, parent_db)
+        self.assertEqual(self.cache.get("1111111111"), {"book": {}})
+
+
+class TestISBNLookupCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ISBNCache(os.path.join(self.tmp.name, "isbn.sqlite"))
+        self.config = {"key": "test-key", "url_isbn": "http://api.test.com/{}"}
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    @patch('bookdbtool.isbn_lookup_tools.req.get')
+    @patch('bookdbtool.isbn_lookup_tools.pprint')
+    def test_repeat_lookup_is_cached(self, mock_pprint, mock_get):
+        response = Mock(status_code=200, ok=True)
+        response.json.return_value = {"book": {"title": "Cached"}}
+        mock_get.return_value = response
+        lookup = ISBNLookup(self.config, cache=self.cache)
+
+        lookup.lookup("0060929480")
+        lookup.lookup("978-0-06-092948-0")
+
+        mock_get.assert_called_once()
+        self.assertEqual(lookup.result, {"book": {"title": "Cached"}})
+
+    @patch('bookdbtool.isbn_lookup_tools.req.get')
+    @patch('bookdbtool.isbn_lookup_tools.pprint')
+    def test_not_found_cached_server_error_not(self, mock_pprint, mock_get):
+        not_found = Mock(status_code=404, ok=False)
+        not_found.json.return_value = {"errorMessage": "Not Found"}
+        server_error = Mock(status_code=503, ok=False)
+        server_error.json.return_value = {"message": "Service Unavailable"}
+        mock_get.side_effect = [not_found, server_error, server_error]
+        lookup = ISBNLookup(self.config, cache=self.cache)
+
+        lookup.lookup("1111111111")
+        lookup.lookup("1111111111")
+        self.assertEqual(lookup.result, {"errorMessage": "Not Found"})
+        lookup.lookup("2222222222")
+        lookup.lookup("2222222222")
+
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch('bookdbtool.isbn_lookup_tools.req.get')
+    @patch('bookdbtool.isbn_lookup_tools.pprint')
+    def test_collection_checked_first(self, mock_pprint, mock_get):
+        search = Mock()
+        search.json.return_value = {
+            "header": ["BookCollectionID", "Title", "ISBNNumber", "ISBNNumber13"],
+            "data": [[7, "Owned", "0060929480", ""], [8, "Other", "10060929480", ""]]}
+        mock_get.return_value = search
+        lookup = ISBNLookup(self.config, cache=self.cache, book_service=("http://books.test", "k"))
+
+        with patch('sys.stdout', new=StringIO()):
+            lookup.lookup("0060929480")
+
+        urls = [c[0][0] for c in mock_get.call_args_list]
+        self.assertTrue(all(url.startswith("http://books.test/books_search?") for url in urls))
+        self.assertEqual([b["BookCollectionID"] for b in lookup.result["book_collection"]], [7])
+        self.assertIsNone(self.cache.get("0060929480"))
+
+
+if __name__ == '__main__':
+    unittest.main()
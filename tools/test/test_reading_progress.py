@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bookdbtool.reading_progress import DAYS_IN_YEAR, plot_year_progress, year_progress_matrix
+
+
+class TestYearProgressMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'ReadDate': ['2019-01-03', '2019-01-03', '2019-02-01', '2020-12-31', '2021-01-10'],
+            'Pages': [100, 50, 200, 300, None]
+        })
+
+    def test_shape_and_years(self):
+        years, matrix = year_progress_matrix(self.df)
+        self.assertEqual(years.tolist(), [2019, 2020, 2021])
+        self.assertEqual(matrix.shape, (3, DAYS_IN_YEAR))
+
+    def test_cumulative_pages(self):
+        years, matrix = year_progress_matrix(self.df)
+        self.assertEqual(matrix[0, 0], 0)
+        self.assertEqual(matrix[0, 2], 150)  # both books read on day 3
+        self.assertEqual(matrix[0, 30], 150)
+        self.assertEqual(matrix[0, 31], 350)  # February 1st
+        self.assertEqual(matrix[1, 365], 300)  # leap year day 366
+        self.assertEqual(matrix[2, 9], 0)  # missing page count
+
+    def test_nan_after_last_read(self):
+        years, matrix = year_progress_matrix(self.df)
+        self.assertFalse(np.isnan(matrix[0, 31]))
+        self.assertTrue(np.isnan(matrix[0, 32:]).all())
+        self.assertTrue(np.isnan(matrix[2, 10:]).all())
+
+    def test_row_order_does_not_matter(self):
+        _, matrix = year_progress_matrix(self.df)
+        _, shuffled = year_progress_matrix(self.df.iloc[::-1])
+        np.testing.assert_array_equal(matrix, shuffled)
+
+    def test_window(self):
+        years, matrix = year_progress_matrix(self.df, window=2)
+        self.assertEqual(years.tolist(), [2020, 2021])
+        self.assertEqual(matrix.shape, (2, DAYS_IN_YEAR))
+
+    def test_matches_running_total_at_each_read(self):
+        dates = pd.date_range('2015-01-01', '2020-12-31', freq='5D')
+        df = pd.DataFrame({'ReadDate': dates, 'Pages': np.arange(len(dates)) % 400})
+        years, matrix = year_progress_matrix(df)
+        running = df.groupby(dates.year)['Pages'].cumsum()
+        for d, total in zip(dates, running):
+            row = years.tolist().index(d.year)
+            self.assertEqual(matrix[row, d.dayofyear - 1], total)
+
+
+class TestPlotYearProgress(unittest.TestCase):
+
+    def tearDown(self):
+        plt.close('all')
+
+    def test_one_line_per_year(self):
+        df = pd.DataFrame({'ReadDate': ['2019-01-03', '2020-02-01'], 'Pages': [100, 200]})
+        years, matrix = year_progress_matrix(df)
+        ax = plot_year_progress(plt.figure().add_subplot(), years, matrix, current_lw=3)
+        self.assertEqual([line.get_label() for line in ax.get_lines()], ['2019', '2020'])
+        self.assertEqual(ax.get_lines()[-1].get_linewidth(), 3)
+        self.assertEqual(ax.get_ylim(), (0, 200))
+
+    def test_empty(self):
+        years, matrix = year_progress_matrix(pd.DataFrame({'ReadDate': [], 'Pages': []}))
+        with self.assertRaises(ValueError):
+            plot_year_progress(plt.figure().add_subplot(), years, matrix)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,215 @@
+import json
+import os
+import socket
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bin'))
+
+import upload_images
+
+
+def response(status_code, body=None):
+    r = Mock()
+    r.status_code = status_code
+    r.text = "{}" if body is None else str(body)
+    r.json.return_value = body or {}
+    return r
+
+
+def closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@patch('upload_images.time.sleep')
+class TestPostWithRetries(unittest.TestCase):
+
+    def test_retries_5xx_and_timeouts(self, mock_sleep):
+        session = Mock()
+        session.post.side_effect = [response(503), requests.exceptions.ReadTimeout(), response(200)]
+        r = upload_images.post_with_retries("http://x/upload_image", session, retries=3, backoff=1)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(session.post.call_count, 3)
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [1, 2])
+
+    def test_gives_up_after_retries(self, mock_sleep):
+        session = Mock()
+        session.post.side_effect = [response(500), response(502)]
+        r = upload_images.post_with_retries("http://x/upload_image", session, retries=1)
+        self.assertEqual(r.status_code, 502)
+
+    def test_not_idempotent_is_not_repeated_once_sent(self, mock_sleep):
+        session = Mock()
+        session.post.side_effect = [response(500), response(200)]
+        r = upload_images.post_with_retries("http://x/add_image", session, retries=3, idempotent=False)
+        self.assertEqual(r.status_code, 500)
+        session.post.side_effect = [requests.exceptions.ReadTimeout(), response(200)]
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            upload_images.post_with_retries("http://x/add_image", session, retries=3, idempotent=False)
+
+    def test_not_idempotent_retries_429(self, mock_sleep):
+        session = Mock()
+        session.post.side_effect = [response(429), response(200)]
+        r = upload_images.post_with_retries("http://x/add_image", session, retries=3, idempotent=False)
+        self.assertEqual(r.status_code, 200)
+
+    def test_not_idempotent_retries_refused_connection(self, mock_sleep):
+        url = f"http://127.0.0.1:{closed_port()}/add_image"
+        with self.assertRaises(requests.exceptions.ConnectionError) as refused:
+            requests.post(url, timeout=5)
+        self.assertTrue(upload_images._not_sent(refused.exception))
+        session = Mock()
+        session.post.side_effect = [refused.exception, response(200)]
+        r = upload_images.post_with_retries(url, session, retries=3, idempotent=False)
+        self.assertEqual(r.status_code, 200)
+
+    def test_add_image_to_book_is_not_repeated(self, mock_sleep):
+        session = Mock()
+        session.post.side_effect = [response(503), response(200, {"add_image": {"id": 7}})]
+        success, body = upload_images.add_image_to_book("http://x", "key", 124, "124_cover.png",
+                                                        session=session, retries=3)
+        self.assertFalse(success)
+        self.assertEqual(session.post.call_count, 1)
+
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.path = self.root / upload_images.MANIFEST_NAME
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def image(self, name, content=b"image"):
+        file_path = self.root / name
+        file_path.write_bytes(content)
+        return file_path
+
+    def manifest(self):
+        manifest = upload_images.Manifest(self.path, self.root)
+        manifest.load()
+        self.addCleanup(self.close, manifest)
+        return manifest
+
+    @staticmethod
+    def close(manifest):
+        if manifest._file is not None:
+            manifest.close()
+
+    def test_torn_last_line_ignored(self):
+        file_path = self.image("124_cover.png")
+        manifest = self.manifest()
+        manifest.sha256(file_path)
+        manifest.record(file_path, status="done", remote_name="124_cover.png", book_id=124, image_id=7)
+        manifest.close()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"path": "125_cover.png", "status": "do')
+
+        manifest = self.manifest()
+        self.assertEqual(list(manifest.entries), ["124_cover.png"])
+        self.assertEqual(manifest.get(file_path)["status"], "done")
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual([json.loads(line)["path"] for line in f], ["124_cover.png"])
+
+    def test_changed_file_resets_state(self):
+        file_path = self.image("124_cover.png", b"old")
+        manifest = self.manifest()
+        old = manifest.sha256(file_path)
+        manifest.record(file_path, status="done", remote_name="124_cover.png", book_id=124, image_id=7)
+        manifest.close()
+        file_path.write_bytes(b"new content")
+
+        manifest = self.manifest()
+        self.assertNotEqual(manifest.sha256(file_path), old)
+        self.assertEqual(set(manifest.get(file_path)), {"path", "sha256", "size", "mtime_ns"})
+        tasks, later, done, duplicates = upload_images.plan_uploads(manifest, [file_path])
+        self.assertEqual(tasks, [(file_path, None)])
+
+    def test_unchanged_file_not_rehashed(self):
+        file_path = self.image("124_cover.png")
+        manifest = self.manifest()
+        manifest.sha256(file_path)
+        manifest.record(file_path, status="done", remote_name="124_cover.png", book_id=124, image_id=7)
+        manifest.close()
+
+        manifest = self.manifest()
+        with patch('upload_images.file_sha256') as mock_hash:
+            tasks, later, done, duplicates = upload_images.plan_uploads(manifest, [file_path])
+        mock_hash.assert_not_called()
+        self.assertEqual((tasks, later, done, duplicates), ([], [], 1, []))
+
+    def test_touched_file_keeps_state(self):
+        file_path = self.image("124_cover.png")
+        manifest = self.manifest()
+        manifest.sha256(file_path)
+        manifest.record(file_path, status="done", remote_name="124_cover.png", book_id=124, image_id=7)
+        manifest.close()
+        stat = file_path.stat()
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        manifest = self.manifest()
+        tasks, later, done, duplicates = upload_images.plan_uploads(manifest, [file_path])
+        self.assertEqual((tasks, done), ([], 1))
+        self.assertEqual(manifest.get(file_path)["mtime_ns"], stat.st_mtime_ns + 10**9)
+        self.assertEqual(manifest.get(file_path)["image_id"], 7)
+
+    def test_duplicate_content_deferred(self):
+        first = self.image("124_cover.png", b"same")
+        second = self.image("125_cover.png", b"same")
+        manifest = self.manifest()
+        tasks, later, done, duplicates = upload_images.plan_uploads(manifest, [first, second])
+        self.assertEqual((tasks, later, done, duplicates), ([(first, None)], [second], 0, []))
+
+        upload_images.record_result(manifest, {
+            "file": first, "uploaded": True, "remote_name": "124_cover_1.png", "book_id": 124,
+            "associated": True, "image_id": 7, "assoc_response": {}, "upload_response": {}})
+        tasks, later, done, duplicates = upload_images.plan_uploads(manifest, later)
+        self.assertEqual((tasks, later), ([(second, "124_cover_1.png")], []))
+
+    def test_duplicate_for_same_book_not_sent(self):
+        first = self.image("124_cover.png", b"same")
+        copy = self.image("124_back.png", b"same")
+        manifest = self.manifest()
+        manifest.sha256(first)
+        manifest.record(first, status="done", remote_name="124_cover.png", book_id=124, image_id=7)
+        tasks, later, done, duplicates = upload_images.plan_uploads(manifest, [first, copy])
+        self.assertEqual((tasks, later, done, duplicates), ([], [], 1, [copy]))
+        self.assertEqual(manifest.get(copy)["status"], "done")
+
+    @patch('upload_images.time.sleep')
+    def test_failed_association_only_registered(self, mock_sleep):
+        file_path = self.image("124_cover.png")
+        manifest = self.manifest()
+        manifest.sha256(file_path)
+        upload_images.record_result(manifest, {
+            "file": file_path, "uploaded": True, "remote_name": "124_cover_1.png", "book_id": 124,
+            "associated": False, "image_id": None, "assoc_response": {"error": "HTTP 500"},
+            "upload_response": {}})
+        manifest.close()
+
+        manifest = self.manifest()
+        self.assertEqual(manifest.get(file_path)["status"], "uploaded")
+        tasks, later, done, duplicates = upload_images.plan_uploads(manifest, [file_path])
+        self.assertEqual(tasks, [(file_path, "124_cover_1.png")])
+
+        session = Mock()
+        session.post.return_value = response(200, {"add_image": {"id": 9}})
+        result = upload_images.process_file("http://x", "key", file_path, session, remote_name=tasks[0][1])
+        self.assertEqual(session.post.call_count, 1)
+        self.assertTrue(session.post.call_args.args[0].endswith("/add_image"))
+        upload_images.record_result(manifest, result)
+        self.assertEqual(manifest.get(file_path)["status"], "done")
+        self.assertEqual(manifest.get(file_path)["image_id"], 9)
+
+
+if __name__ == '__main__':
+    unittest.main()